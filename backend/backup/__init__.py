@@ -0,0 +1 @@
+# Backup app
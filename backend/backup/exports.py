@@ -0,0 +1,196 @@
+"""
+Account Export
+Stream a user's notes, flashcards and study sessions as a zip of NDJSON or CSV files.
+
+The zip is written to a write-only buffer that is drained after every few
+rows, so the response starts with the manifest before any query runs and
+memory use stays flat however many rows the account has. Rows are read
+with QuerySet.iterator(), which uses server-side cursors on PostgreSQL.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from flashcards.models import Flashcard, FlashcardSet, StudySession
+from notes.models import Category, Note, Tag
+
+EXPORT_VERSION = 1
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+CHUNK_SIZE = 2000
+# Yield compressed output once this much has been buffered
+FLUSH_SIZE = 64 * 1024
+
+# Exported tables in dependency order: (name, model, columns). Every
+# model has a user foreign key; notes also get their tag ids.
+EXPORT_TABLES = (
+    ('categories', Category, ('id', 'name', 'color', 'created_at', 'updated_at')),
+    ('tags', Tag, ('id', 'name', 'created_at')),
+    ('notes', Note, (
+        'id', 'title', 'content', 'category_id', 'source_url', 'created_at', 'updated_at',
+    )),
+    ('flashcard_sets', FlashcardSet, (
+        'id', 'name', 'description', 'category_id', 'scheduler', 'created_at', 'updated_at',
+    )),
+    ('flashcards', Flashcard, (
+        'id', 'flashcard_set_id', 'front', 'back', 'difficulty', 'ease_factor',
+        'review_count', 'correct_count', 'last_studied', 'next_review',
+        'stability', 'fsrs_difficulty', 'created_at', 'updated_at',
+    )),
+    ('study_sessions', StudySession, (
+        'id', 'flashcard_set_id', 'mode', 'started_at', 'ended_at',
+        'cards_studied', 'cards_correct', 'updated_at',
+    )),
+)
+
+# Separator of list values (note tag ids) in CSV cells
+CSV_LIST_SEPARATOR = ';'
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that keeps microseconds, so timestamps restore exactly"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ZipBuffer:
+    """Write-only file object that collects zip output until it is drained"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written so far"""
+        data = b''.join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+def export_columns(name, columns):
+    """Return the columns written for a table"""
+    return columns + ('tag_ids',) if name == 'notes' else columns
+
+
+def with_tag_ids(notes, links):
+    """
+    Append the tag ids to each note row.
+
+    Both iterators are ordered by note id, so they are merged in one pass
+    instead of loading every note's tags.
+    """
+    link = next(links, None)
+    for row in notes:
+        tag_ids = []
+        while link is not None and link[0] <= row[0]:
+            if link[0] == row[0]:
+                tag_ids.append(link[1])
+            link = next(links, None)
+        yield (*row, tag_ids)
+
+
+def iter_table(user, name, model, columns):
+    """Yield a user's rows of one table as tuples, ordered by id"""
+    rows = (
+        model.objects.filter(user=user)
+        .order_by('id')
+        .values_list(*columns)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    if name != 'notes':
+        return rows
+    links = (
+        Note.tags.through.objects.filter(note__user=user)
+        .order_by('note_id', 'tag_id')
+        .values_list('note_id', 'tag_id')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    return with_tag_ids(rows, links)
+
+
+def csv_cell(value):
+    """Format one value for a CSV cell"""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(str(item) for item in value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_manifest(user, file_format, now):
+    """Describe the export: format version and the file and columns of each table"""
+    return {
+        'version': EXPORT_VERSION,
+        'format': file_format,
+        'exported_at': now.isoformat(),
+        'username': user.get_username(),
+        'tables': [
+            {
+                'name': name,
+                'file': f'{name}.{file_format}',
+                'columns': list(export_columns(name, columns)),
+            }
+            for name, model, columns in EXPORT_TABLES
+        ],
+    }
+
+
+def stream_export(user, file_format):
+    """
+    Generate the zip export of a user's account in chunks of bytes.
+
+    Args:
+        user: Account to export
+        file_format (str): 'ndjson' or 'csv'
+
+    Yields:
+        bytes: Consecutive pieces of the zip file
+    """
+    buffer = ZipBuffer()
+    # The buffer cannot seek, so zipfile writes sizes after each member
+    archive = zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED)
+    archive.writestr(
+        'manifest.json',
+        json.dumps(export_manifest(user, file_format, timezone.now()), indent=2)
+    )
+    yield buffer.drain()
+
+    for name, model, columns in EXPORT_TABLES:
+        header = export_columns(name, columns)
+        with archive.open(f'{name}.{file_format}', 'w', force_zip64=True) as member:
+            text = io.TextIOWrapper(member, encoding='utf-8', newline='')
+            if file_format == 'csv':
+                writer = csv.writer(text)
+                writer.writerow(header)
+            for row in iter_table(user, name, model, columns):
+                if file_format == 'csv':
+                    writer.writerow([csv_cell(value) for value in row])
+                else:
+                    text.write(json.dumps(dict(zip(header, row)), cls=ExportJSONEncoder))
+                    text.write('\n')
+                if buffer.size >= FLUSH_SIZE:
+                    yield buffer.drain()
+            text.close()
+        yield buffer.drain()
+
+    archive.close()
+    yield buffer.drain()
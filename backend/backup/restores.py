@@ -0,0 +1,322 @@
+"""
+Account Restore
+Load an export archive into an account, giving every row a new primary key.
+
+Tables are restored in dependency order from the archive's members, which
+are read as streams. Old ids are mapped to new ones so foreign keys (note
+and set categories, note tags, cards and sessions of a set) point at the
+restored rows. Rows are inserted in chunks, and the note/tag links are
+written with one bulk insert into the through table.
+
+Categories and tags that already exist in the account (same name) are
+reused rather than duplicated.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from flashcards.cache import bump_cards_version, bump_schedule_version
+from flashcards.models import Flashcard, FlashcardSet, StudySession
+from flashcards.stats import rebuild_daily_rollups
+from notes.cache import bump_list_version
+from notes.models import Category, Note, Tag
+from search.cache import bump_text_version
+from .exports import CSV_LIST_SEPARATOR, EXPORT_FORMATS, EXPORT_TABLES, EXPORT_VERSION
+
+CHUNK_SIZE = 2000
+
+# Notes can be longer than the csv module's default field limit
+csv.field_size_limit(max(csv.field_size_limit(), 16 * 1024 * 1024))
+
+
+class RestoreError(ValueError):
+    """Raised when an archive cannot be restored"""
+
+
+def insert_objects(model, objs, returning=False):
+    """
+    Insert unsaved objects in batches, keeping their timestamps as given.
+
+    bulk_create() resets auto_now and auto_now_add fields to the current
+    time, so the restored values are written back with one bulk_update() per
+    batch. On databases that cannot return the ids of a bulk insert, objects
+    are saved one at a time, since the update needs their ids.
+
+    Returns:
+        list: New primary keys in the order of objs (only if returning)
+    """
+    if not objs:
+        return []
+    timestamp_fields = [
+        field.name for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    timestamps = [[getattr(obj, name) for name in timestamp_fields] for obj in objs]
+
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objs, batch_size=CHUNK_SIZE)
+    else:
+        for obj in objs:
+            obj.save()
+
+    if timestamp_fields:
+        for obj, values in zip(objs, timestamps):
+            for name, value in zip(timestamp_fields, values):
+                setattr(obj, name, value)
+        model.objects.bulk_update(objs, timestamp_fields, batch_size=CHUNK_SIZE)
+    return [obj.pk for obj in objs] if returning else []
+
+
+def read_manifest(archive):
+    """
+    Read and check the manifest of an export archive.
+
+    Returns:
+        tuple: (file format, {table name: member name})
+    """
+    try:
+        manifest = json.loads(archive.read('manifest.json'))
+        version = manifest['version']
+        file_format = manifest['format']
+        files = {table['name']: table['file'] for table in manifest['tables']}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise RestoreError('The archive has no valid manifest.json.') from exc
+    if not isinstance(version, int) or version > EXPORT_VERSION:
+        raise RestoreError(f'Unsupported export version: {version}.')
+    if file_format not in EXPORT_FORMATS:
+        raise RestoreError(f'Unsupported export format: {file_format}.')
+    return file_format, files
+
+
+def iter_records(archive, member, file_format):
+    """Yield the rows of one archive member as dicts"""
+    with archive.open(member) as source:
+        text = io.TextIOWrapper(source, encoding='utf-8', newline='')
+        if file_format == 'csv':
+            yield from csv.DictReader(text)
+        else:
+            for line in text:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_id(value):
+    """Parse an exported id (None or '' when missing)"""
+    if value in (None, ''):
+        return None
+    return int(value)
+
+
+def parse_id_list(value):
+    """Parse exported tag ids (a list in NDJSON, a separated string in CSV)"""
+    if isinstance(value, list):
+        return [int(item) for item in value]
+    if not value:
+        return []
+    return [int(item) for item in value.split(CSV_LIST_SEPARATOR)]
+
+
+class AccountRestore:
+    """
+    Restore the tables of one archive into a user's account.
+
+    Holds the old-to-new id maps of the tables that others refer to.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.category_ids = {}
+        self.tag_ids = {}
+        self.set_ids = {}
+        self.note_tags = []
+        self.session_dates = set()
+        self.counts = {}
+
+    def build(self, model, record, columns, **values):
+        """
+        Build an unsaved instance from an exported record.
+
+        Plain columns are converted and validated by their model field; ids
+        and foreign keys are passed in by the caller.
+        """
+        for name in columns:
+            if name in values or name == 'id' or name.endswith('_id') or name not in record:
+                continue
+            field = model._meta.get_field(name)
+            value = record[name]
+            if value == '' and field.null:
+                value = None
+            value = field.clean(value, None)
+            if isinstance(value, datetime) and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values[name] = value
+        obj = model(user=self.user, **values)
+        # Timestamps are written back as given, so fill those missing from the archive here
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, timezone.now())
+        return obj
+
+    def restore_table(self, name, model, records, columns):
+        """Restore one table, building its rows with build_<name>()"""
+        build = getattr(self, f'build_{name}')
+        id_map = {
+            'categories': self.category_ids,
+            'tags': self.tag_ids,
+            'flashcard_sets': self.set_ids,
+        }.get(name)
+
+        created = 0
+        chunk = []
+        old_ids = []
+        tag_lists = []
+        for row_number, record in enumerate(records, start=1):
+            try:
+                old_id = parse_id(record.get('id'))
+                obj = build(record, columns)
+                if name == 'notes':
+                    tag_lists.append(parse_id_list(record.get('tag_ids')))
+            except (ValidationError, ValueError, TypeError, AttributeError) as exc:
+                message = '; '.join(exc.messages) if isinstance(exc, ValidationError) else str(exc)
+                raise RestoreError(f'{name} row {row_number}: {message}') from exc
+            if obj is None:
+                continue
+            chunk.append(obj)
+            old_ids.append(old_id)
+            if len(chunk) >= CHUNK_SIZE:
+                created += self.flush(model, chunk, old_ids, tag_lists, id_map)
+                chunk, old_ids, tag_lists = [], [], []
+        created += self.flush(model, chunk, old_ids, tag_lists, id_map)
+        self.counts[name] = created
+
+    def flush(self, model, chunk, old_ids, tag_lists, id_map):
+        """Insert a chunk and record the new ids of tables that others refer to"""
+        returning = id_map is not None or model is Note
+        new_ids = insert_objects(model, chunk, returning=returning)
+        if id_map is not None:
+            id_map.update(zip(old_ids, new_ids))
+        if model is Note:
+            for note_id, tags in zip(new_ids, tag_lists):
+                self.note_tags.extend(
+                    (note_id, self.tag_ids[tag_id]) for tag_id in tags if tag_id in self.tag_ids
+                )
+        return len(chunk)
+
+    def reuse_by_name(self, model, id_map, record, columns):
+        """Map a category or tag onto an existing one with the same name, or build it"""
+        existing = getattr(self, f'existing_{model._meta.model_name}')
+        if record.get('name') in existing:
+            id_map[parse_id(record.get('id'))] = existing[record['name']]
+            return None
+        return self.build(model, record, columns)
+
+    def build_categories(self, record, columns):
+        return self.reuse_by_name(Category, self.category_ids, record, columns)
+
+    def build_tags(self, record, columns):
+        return self.reuse_by_name(Tag, self.tag_ids, record, columns)
+
+    def build_notes(self, record, columns):
+        return self.build(
+            Note, record, columns,
+            category_id=self.category_ids.get(parse_id(record.get('category_id')))
+        )
+
+    def build_flashcard_sets(self, record, columns):
+        return self.build(
+            FlashcardSet, record, columns,
+            category_id=self.category_ids.get(parse_id(record.get('category_id')))
+        )
+
+    def build_flashcards(self, record, columns):
+        old_set_id = parse_id(record.get('flashcard_set_id'))
+        if old_set_id not in self.set_ids:
+            raise ValueError(f'unknown flashcard set {old_set_id}')
+        return self.build(Flashcard, record, columns, flashcard_set_id=self.set_ids[old_set_id])
+
+    def build_study_sessions(self, record, columns):
+        session = self.build(
+            StudySession, record, columns,
+            flashcard_set_id=self.set_ids.get(parse_id(record.get('flashcard_set_id')))
+        )
+        self.session_dates.add(timezone.localdate(session.started_at))
+        return session
+
+    def restore(self, archive):
+        """Restore every table of the archive in dependency order"""
+        file_format, files = read_manifest(archive)
+        self.existing_category = dict(
+            Category.objects.filter(user=self.user).values_list('name', 'id')
+        )
+        self.existing_tag = dict(Tag.objects.filter(user=self.user).values_list('name', 'id'))
+
+        for name, model, columns in EXPORT_TABLES:
+            if name not in files:
+                self.counts[name] = 0
+                continue
+            self.restore_table(
+                name, model, iter_records(archive, files[name], file_format), columns
+            )
+
+        Note.tags.through.objects.bulk_create(
+            [
+                Note.tags.through(note_id=note_id, tag_id=tag_id)
+                for note_id, tag_id in self.note_tags
+            ],
+            batch_size=CHUNK_SIZE
+        )
+        self.counts['note_tags'] = len(self.note_tags)
+        return self.counts
+
+
+def restore_archive(user, upload):
+    """
+    Restore an export archive into a user's account in one transaction.
+
+    Args:
+        user: Account to restore into
+        upload: File object of the zip archive (must be seekable)
+
+    Returns:
+        dict: Number of rows created per table, plus 'note_tags'
+
+    Raises:
+        RestoreError: If the archive is invalid; nothing is restored
+    """
+    try:
+        archive = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile as exc:
+        raise RestoreError('The file is not an export archive (.zip).') from exc
+
+    restore = AccountRestore(user)
+    with archive:
+        try:
+            with transaction.atomic():
+                counts = restore.restore(archive)
+        except KeyError as exc:
+            raise RestoreError(f'The archive is missing {exc}.') from exc
+        except (UnicodeDecodeError, csv.Error, json.JSONDecodeError) as exc:
+            raise RestoreError(f'Could not read the archive: {exc}') from exc
+        except DatabaseError as exc:
+            raise RestoreError(f'The archive contains invalid data: {exc}') from exc
+
+    user_id = user.pk
+    dates = restore.session_dates
+    set_ids = list(restore.set_ids.values())
+    transaction.on_commit(lambda: bump_schedule_version(user_id))
+    # Categories and tags are inserted in bulk, which sends no signals
+    transaction.on_commit(lambda: bump_list_version('categories', user_id))
+    transaction.on_commit(lambda: bump_list_version('tags', user_id))
+    transaction.on_commit(lambda: bump_cards_version(*set_ids))
+    transaction.on_commit(lambda: bump_text_version(user_id))
+    if dates:
+        # Restored sessions may fall on days the daily rollup already covers
+        transaction.on_commit(lambda: rebuild_daily_rollups(user_id, dates))
+    return counts
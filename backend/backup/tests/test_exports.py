@@ -0,0 +1,128 @@
+"""
+Test: Account Export
+Purpose: Verify the streaming zip export of a user's account
+Coverage: NDJSON and CSV output, tag ids on notes, per-user scoping, lazy streaming
+"""
+
+import csv
+import io
+import json
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.models import Flashcard, FlashcardSet, StudySession
+from notes.models import Category, Note, Tag
+
+User = get_user_model()
+
+
+class ExportAPITest(TestCase):
+    """Test the account export endpoint"""
+
+    url = '/api/export/'
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.category = Category.objects.create(name='Python', user=self.user)
+        self.tags = [Tag.objects.create(name=name, user=self.user) for name in ('django', 'orm')]
+        self.first_note = Note.objects.create(
+            title='Querysets', content='Lazy,\n"quoted"', user=self.user, category=self.category
+        )
+        self.first_note.tags.set(self.tags)
+        self.second_note = Note.objects.create(title='Untagged', content='Plain', user=self.user)
+        self.flashcard_set = FlashcardSet.objects.create(
+            name='Python Basics', user=self.user, category=self.category
+        )
+        Flashcard.objects.create(flashcard_set=self.flashcard_set, front='Q1', back='A1')
+        StudySession.objects.create(user=self.user, flashcard_set=self.flashcard_set)
+
+        Note.objects.create(title='Private', content='Other', user=self.other_user)
+
+    def download(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def read_ndjson(self, archive, name):
+        return [json.loads(line) for line in archive.read(name).decode('utf-8').splitlines()]
+
+    def test_ndjson_export(self):
+        """Test every table is exported as NDJSON with a manifest"""
+        archive = self.download()
+
+        self.assertEqual(archive.namelist(), [
+            'manifest.json', 'categories.ndjson', 'tags.ndjson', 'notes.ndjson',
+            'flashcard_sets.ndjson', 'flashcards.ndjson', 'study_sessions.ndjson',
+        ])
+        manifest = json.loads(archive.read('manifest.json'))
+        self.assertEqual(manifest['format'], 'ndjson')
+        self.assertEqual(manifest['tables'][2]['columns'][-1], 'tag_ids')
+
+        notes = self.read_ndjson(archive, 'notes.ndjson')
+        self.assertEqual([note['title'] for note in notes], ['Querysets', 'Untagged'])
+        self.assertEqual(notes[0]['content'], 'Lazy,\n"quoted"')
+        self.assertEqual(notes[0]['category_id'], self.category.id)
+        self.assertEqual(notes[0]['tag_ids'], [tag.id for tag in self.tags])
+        self.assertEqual(notes[1]['tag_ids'], [])
+
+        flashcards = self.read_ndjson(archive, 'flashcards.ndjson')
+        self.assertEqual(flashcards[0]['flashcard_set_id'], self.flashcard_set.id)
+        self.assertEqual(flashcards[0]['ease_factor'], 2.5)
+        self.assertEqual(len(self.read_ndjson(archive, 'study_sessions.ndjson')), 1)
+
+    def test_csv_export(self):
+        """Test the CSV export has a header row and round-trips multi-line values"""
+        archive = self.download(file_format='csv')
+
+        rows = list(csv.DictReader(io.StringIO(archive.read('notes.csv').decode('utf-8'))))
+        self.assertEqual(rows[0]['content'], 'Lazy,\n"quoted"')
+        self.assertEqual(rows[0]['tag_ids'], ';'.join(str(tag.id) for tag in self.tags))
+        self.assertEqual(rows[1]['category_id'], '')
+
+    def test_export_excludes_other_users(self):
+        """Test only the current user's rows are exported"""
+        archive = self.download()
+
+        titles = [note['title'] for note in self.read_ndjson(archive, 'notes.ndjson')]
+        self.assertNotIn('Private', titles)
+
+    def test_export_streams_lazily(self):
+        """Test the manifest is sent before any query runs"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        content = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            first_chunk = next(content)
+        self.assertTrue(first_chunk.startswith(b'PK'))
+        b''.join(content)
+
+    def test_invalid_format(self):
+        """Test an unknown file_format returns 400"""
+        response = self.client.get(self.url, {'file_format': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        """Test anonymous users cannot export"""
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.url)
+
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
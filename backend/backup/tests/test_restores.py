@@ -0,0 +1,185 @@
+"""
+Test: Account Restore
+Purpose: Verify export archives are restored into an account with new ids
+Coverage: Id remapping, note tags, timestamps, name reuse, daily rollups, invalid archives
+"""
+
+import io
+import json
+import zipfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from backup.exports import stream_export
+from flashcards.models import DailyStudyRollup, Flashcard, FlashcardSet, RollupWatermark, StudySession
+from flashcards.stats import DAILY_ROLLUP
+from notes.models import Category, Note, Tag
+
+User = get_user_model()
+
+
+class RestoreAPITest(TestCase):
+    """Test the account restore endpoint"""
+
+    url = '/api/restore/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.source = User.objects.create_user(
+            username='source',
+            email='source@example.com',
+            password='testpass123'
+        )
+        self.target = User.objects.create_user(
+            username='target',
+            email='target@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.target)
+
+        self.created_at = timezone.now() - timedelta(days=30)
+        self.category = Category.objects.create(name='Python', user=self.source)
+        tags = [Tag.objects.create(name=name, user=self.source) for name in ('django', 'orm')]
+        note = Note.objects.create(
+            title='Querysets', content='Lazy', user=self.source, category=self.category
+        )
+        note.tags.set(tags)
+        Note.objects.filter(pk=note.pk).update(created_at=self.created_at)
+        Note.objects.create(title='Untagged', content='Plain', user=self.source)
+
+        flashcard_set = FlashcardSet.objects.create(
+            name='Python Basics', user=self.source, category=self.category
+        )
+        self.next_review = timezone.now() + timedelta(days=3)
+        Flashcard.objects.create(
+            flashcard_set=flashcard_set, front='Q1', back='A1',
+            ease_factor=2.1, review_count=4, correct_count=3, next_review=self.next_review
+        )
+        self.session = StudySession.objects.create(
+            user=self.source, flashcard_set=flashcard_set, cards_studied=4, cards_correct=3
+        )
+        self.started_at = timezone.now() - timedelta(days=5)
+        StudySession.objects.filter(pk=self.session.pk).update(started_at=self.started_at)
+
+    def export(self, file_format='ndjson'):
+        return b''.join(stream_export(self.source, file_format))
+
+    def upload(self, content):
+        upload = SimpleUploadedFile('export.zip', content, content_type='application/zip')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {'file': upload}, format='multipart')
+
+    def assert_restored(self):
+        note = Note.objects.get(user=self.target, title='Querysets')
+        self.assertNotEqual(note.category.id, self.category.id)
+        self.assertEqual(note.category.user, self.target)
+        self.assertEqual(sorted(note.tags.values_list('name', flat=True)), ['django', 'orm'])
+        self.assertEqual(note.created_at, self.created_at)
+        self.assertFalse(Note.objects.get(user=self.target, title='Untagged').tags.exists())
+
+        flashcard_set = FlashcardSet.objects.get(user=self.target)
+        self.assertEqual(flashcard_set.category, note.category)
+        card = Flashcard.objects.get(flashcard_set=flashcard_set)
+        self.assertEqual(card.user, self.target)
+        self.assertEqual((card.ease_factor, card.review_count, card.correct_count), (2.1, 4, 3))
+        self.assertEqual(card.next_review, self.next_review)
+
+        session = StudySession.objects.get(user=self.target)
+        self.assertEqual(session.flashcard_set, flashcard_set)
+        self.assertEqual(session.started_at, self.started_at)
+
+    def test_restore_ndjson(self):
+        """Test an NDJSON archive is restored with remapped ids"""
+        response = self.upload(self.export())
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data'], {
+            'categories': 1, 'tags': 2, 'notes': 2, 'flashcard_sets': 1,
+            'flashcards': 1, 'study_sessions': 1, 'note_tags': 2,
+        })
+        self.assert_restored()
+
+    def test_restore_csv(self):
+        """Test a CSV archive is restored the same way"""
+        response = self.upload(self.export('csv'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assert_restored()
+
+    def test_restore_reuses_existing_names(self):
+        """Test categories and tags with existing names are reused"""
+        category = Category.objects.create(name='Python', user=self.target)
+        tag = Tag.objects.create(name='django', user=self.target)
+
+        response = self.upload(self.export())
+
+        self.assertEqual(response.data['data']['categories'], 0)
+        self.assertEqual(response.data['data']['tags'], 1)
+        note = Note.objects.get(user=self.target, title='Querysets')
+        self.assertEqual(note.category, category)
+        self.assertIn(tag, note.tags.all())
+
+    def test_restore_invalidates_cached_lists(self):
+        """Test cached category and tag lists are refreshed after a restore"""
+        url = '/api/tags/'
+        self.assertEqual(self.client.get(url).data['data'], [])
+
+        self.upload(self.export())
+
+        self.assertEqual([tag['name'] for tag in self.client.get(url).data['data']], ['django', 'orm'])
+
+    def test_restore_in_few_queries(self):
+        """Test rows are inserted per chunk, not per object"""
+        for index in range(50):
+            Note.objects.create(title=f'Note {index}', content='Body', user=self.source)
+        upload = SimpleUploadedFile('export.zip', self.export(), content_type='application/zip')
+
+        with self.assertNumQueries(17):
+            # Savepoint pair, existing names, one insert and one timestamp
+            # update per table, and the tag links
+            self.client.post(self.url, {'file': upload}, format='multipart')
+
+    def test_restore_updates_daily_rollup(self):
+        """Test restored sessions on rolled-up days are added to the rollup"""
+        RollupWatermark.objects.create(name=DAILY_ROLLUP, watermark=timezone.now())
+
+        self.upload(self.export())
+
+        rollup = DailyStudyRollup.objects.get(user=self.target)
+        self.assertEqual(rollup.date, timezone.localdate(self.started_at))
+        self.assertEqual(rollup.cards_studied, 4)
+
+    def test_restore_rejects_invalid_rows(self):
+        """Test an invalid row rejects the whole archive"""
+        archive = zipfile.ZipFile(io.BytesIO(self.export()))
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, 'w') as broken:
+            for name in archive.namelist():
+                content = archive.read(name)
+                if name == 'flashcards.ndjson':
+                    card = json.loads(content)
+                    card['difficulty'] = 'impossible'
+                    content = json.dumps(card).encode('utf-8')
+                broken.writestr(name, content)
+
+        response = self.upload(package.getvalue())
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('flashcards row 1', response.data['error'])
+        self.assertFalse(Note.objects.filter(user=self.target).exists())
+
+    def test_restore_rejects_non_archive(self):
+        """Test a file without a manifest returns 400"""
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, 'w') as archive:
+            archive.writestr('notes.ndjson', '{}')
+
+        self.assertEqual(self.upload(b'not a zip').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload(package.getvalue()).status_code, status.HTTP_400_BAD_REQUEST)
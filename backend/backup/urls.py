@@ -0,0 +1,12 @@
+"""
+URL configuration for Backup app.
+"""
+from django.urls import path
+from .views import ExportView, RestoreView
+
+app_name = 'backup'
+
+urlpatterns = [
+    path('export/', ExportView.as_view(), name='export'),
+    path('restore/', RestoreView.as_view(), name='restore'),
+]
@@ -0,0 +1,72 @@
+"""
+Backup API Views
+ExportView, RestoreView
+"""
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .exports import EXPORT_FORMATS, stream_export
+from .restores import RestoreError, restore_archive
+
+
+class ExportView(APIView):
+    """
+    Download a zip export of the current user's account.
+    GET /api/export/?file_format=ndjson|csv
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """Stream the export as it is generated"""
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        response = StreamingHttpResponse(
+            stream_export(request.user, file_format),
+            content_type='application/zip'
+        )
+        filename = f'study-export-{timezone.localdate().isoformat()}.zip'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Ask reverse proxies not to buffer, so the download starts at once
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+class RestoreView(APIView):
+    """
+    Restore an export archive into the current user's account.
+    POST /api/restore/ (multipart, archive in the 'file' field)
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        """Restore the uploaded archive; every restored row gets a new id"""
+        upload = request.data.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'No file uploaded.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            counts = restore_archive(request.user, upload)
+        except RestoreError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'data': counts,
+            'status': 'success'
+        }, status=status.HTTP_201_CREATED)
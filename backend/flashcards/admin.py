@@ -1,14 +1,27 @@
 from django.contrib import admin
-from .models import FlashcardSet, Flashcard, StudySession
+from django.utils import timezone
+from .models import (
+    DailyStudyRollup,
+    FlashcardSet,
+    Flashcard,
+    ReviewLog,
+    SchedulerParameters,
+    StudySession
+)
 
 
 @admin.register(FlashcardSet)
 class FlashcardSetAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'category', 'card_count', 'created_at', 'updated_at')
+    list_display = ('name', 'user', 'category', 'scheduler', 'card_count', 'created_at', 'updated_at')
     search_fields = ('name', 'description')
-    list_filter = ('user', 'category', 'created_at')
+    list_filter = ('user', 'category', 'scheduler', 'created_at')
     raw_id_fields = ('user', 'category')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            **FlashcardSet.summary_aggregates(timezone.now())
+        )
+
 
 @admin.register(Flashcard)
 class FlashcardAdmin(admin.ModelAdmin):
@@ -19,6 +32,21 @@ class FlashcardAdmin(admin.ModelAdmin):
     readonly_fields = ('review_count', 'correct_count', 'ease_factor', 'last_studied', 'next_review')
 
 
+@admin.register(ReviewLog)
+class ReviewLogAdmin(admin.ModelAdmin):
+    list_display = ('card', 'user', 'quality', 'previous_interval', 'new_interval', 'new_ease', 'reviewed_at')
+    list_filter = ('quality', 'reviewed_at')
+    raw_id_fields = ('card', 'user')
+
+
+@admin.register(SchedulerParameters)
+class SchedulerParametersAdmin(admin.ModelAdmin):
+    list_display = ('user', 'scheduler', 'review_count', 'loss', 'fitted_at')
+    list_filter = ('scheduler',)
+    raw_id_fields = ('user',)
+    readonly_fields = ('fitted_at',)
+
+
 @admin.register(StudySession)
 class StudySessionAdmin(admin.ModelAdmin):
     list_display = ('user', 'flashcard_set', 'mode', 'cards_studied', 'cards_correct', 'started_at', 'ended_at')
@@ -26,3 +54,10 @@ class StudySessionAdmin(admin.ModelAdmin):
     raw_id_fields = ('user', 'flashcard_set')
     readonly_fields = ('started_at', 'ended_at')
 
+
+@admin.register(DailyStudyRollup)
+class DailyStudyRollupAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'flashcard_set', 'sessions', 'cards_studied', 'cards_correct', 'minutes')
+    list_filter = ('date',)
+    raw_id_fields = ('user', 'flashcard_set')
+    date_hierarchy = 'date'
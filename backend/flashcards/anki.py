@@ -0,0 +1,309 @@
+"""
+Anki Import
+Import an Anki package (.apkg) into FlashcardSets, one set per Anki deck.
+
+An .apkg is a zip holding the deck as a SQLite collection plus media files.
+The collection is copied out of the zip to a temporary file and read with a
+cursor, one card at a time, so decks with tens of thousands of cards are
+never held in memory. Cards are written in chunks with FlashcardWriter and
+keep their Anki scheduling, mapped onto the SM-2 fields.
+
+Media files are not imported; fields are converted to plain text.
+"""
+
+import html
+import json
+import re
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils.html import strip_tags
+from .cache import bump_schedule_version
+from .imports import MAX_IMPORT_ROWS, FlashcardWriter, ImportFormatError
+from .models import FlashcardSet
+
+# Collection file names, preferred first. collection.anki21b (zstd
+# compressed, newer schema) is only written when legacy export is disabled.
+COLLECTION_NAMES = ('collection.anki21', 'collection.anki2')
+MAX_COLLECTION_SIZE = 2 * 1024 ** 3
+
+# Anki separates note fields with the unit separator
+FIELD_SEPARATOR = '\x1f'
+
+# Card type of cards that were never studied
+ANKI_NEW = 0
+
+# Note type kinds
+ANKI_STANDARD = 0
+ANKI_CLOZE = 1
+
+# Learning cards store due as a Unix timestamp, review cards as a day number
+# relative to the collection creation date
+TIMESTAMP_DUE_THRESHOLD = 1_000_000_000
+
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+
+CARD_QUERY = """
+    SELECT c.did, c.ord, c.type, c.due, c.ivl, c.factor, c.reps, c.lapses, n.mid, n.flds
+    FROM cards c JOIN notes n ON n.id = c.nid
+    ORDER BY c.did, c.id
+"""
+
+BLOCK_TAG_RE = re.compile(r'<\s*(br|/div|/p|/li|/tr)\b[^>]*>', re.IGNORECASE)
+SOUND_RE = re.compile(r'\[sound:[^\]]*\]')
+FIELD_REF_RE = re.compile(r'{{\s*([^#/^!{}][^{}]*?)\s*}}')
+CLOZE_RE = re.compile(r'{{c(\d+)::(.*?)(?:::(.*?))?}}', re.DOTALL)
+
+
+@contextmanager
+def open_collection(upload):
+    """
+    Open the SQLite collection inside an .apkg read-only.
+
+    SQLite needs a file on disk, so the collection is streamed out of the
+    zip into a temporary file that is removed on exit.
+
+    Raises:
+        ImportFormatError: If the upload is not an Anki package we can read
+    """
+    try:
+        package = zipfile.ZipFile(upload)
+    except zipfile.BadZipFile as exc:
+        raise ImportFormatError('The file is not an Anki package (.apkg).') from exc
+
+    with package:
+        names = set(package.namelist())
+        member = next((name for name in COLLECTION_NAMES if name in names), None)
+        if member is None:
+            if 'collection.anki21b' in names:
+                raise ImportFormatError(
+                    'This package uses the newest Anki format; export it again with '
+                    '"Support older Anki versions" enabled.'
+                )
+            raise ImportFormatError('The package does not contain an Anki collection.')
+        if package.getinfo(member).file_size > MAX_COLLECTION_SIZE:
+            raise ImportFormatError('The Anki collection is too large to import.')
+
+        with tempfile.NamedTemporaryFile(suffix='.anki2') as collection_file:
+            with package.open(member) as source:
+                shutil.copyfileobj(source, collection_file)
+            collection_file.flush()
+
+            connection = sqlite3.connect(f'file:{collection_file.name}?mode=ro', uri=True)
+            try:
+                yield connection
+            except sqlite3.DatabaseError as exc:
+                raise ImportFormatError(f'Could not read the Anki collection: {exc}') from exc
+            finally:
+                connection.close()
+
+
+def field_text(value):
+    """Convert an Anki field (HTML with media references) to plain text"""
+    value = BLOCK_TAG_RE.sub('\n', value)
+    value = SOUND_RE.sub('', value)
+    value = html.unescape(strip_tags(value)).replace('\xa0', ' ')
+    return '\n'.join(line.strip() for line in value.splitlines() if line.strip())
+
+
+def template_fields(template, field_names):
+    """Return the names of note fields a card template shows, in order"""
+    shown = []
+    for reference in FIELD_REF_RE.findall(template):
+        # Strip filters such as {{type:Back}} or {{hint:Notes}}
+        name = reference.split(':')[-1].strip()
+        if name in field_names and name not in shown:
+            shown.append(name)
+    return shown
+
+
+def cloze_sides(text, number):
+    """
+    Render one cloze deletion of a cloze note.
+
+    Returns:
+        tuple: (front, back) with deletion `number` hidden on the front
+    """
+    def front(match):
+        if int(match.group(1)) != number:
+            return match.group(2)
+        return f'[{match.group(3) or "..."}]'
+
+    return CLOZE_RE.sub(front, text), CLOZE_RE.sub(lambda match: match.group(2), text)
+
+
+class NoteTypes:
+    """Field layout of the collection's note types, for rendering cards"""
+
+    def __init__(self, models):
+        self.models = {}
+        for model_id, model in models.items():
+            field_names = [field['name'] for field in sorted(model['flds'], key=lambda f: f['ord'])]
+            templates = {
+                template['ord']: (
+                    template_fields(template.get('qfmt', ''), field_names),
+                    template_fields(template.get('afmt', ''), field_names),
+                )
+                for template in model.get('tmpls', [])
+            }
+            self.models[int(model_id)] = (model.get('type', ANKI_STANDARD), field_names, templates)
+
+    def render(self, model_id, card_ord, fields):
+        """
+        Return the (front, back) plain text of a card.
+
+        Standard cards show the fields their template puts on the question
+        side on the front and the remaining answer fields on the back, so
+        reversed cards come out reversed. Cloze cards hide their deletion.
+        Unknown note types fall back to the first two fields.
+        """
+        if model_id not in self.models:
+            return field_text(fields[0]), field_text(FIELD_SEPARATOR.join(fields[1:2]))
+
+        kind, field_names, templates = self.models[model_id]
+        values = dict(zip(field_names, fields))
+        if kind == ANKI_CLOZE:
+            front, back = cloze_sides(fields[0], card_ord + 1)
+            extra = [values[name] for name in field_names[1:] if values.get(name)]
+            return field_text(front), field_text('<br>'.join([back, *extra]))
+
+        question, answer = templates.get(card_ord, (field_names[:1], field_names[1:2]))
+        answer = [name for name in answer if name not in question]
+        return (
+            field_text('<br>'.join(values.get(name, '') for name in question)),
+            field_text('<br>'.join(values.get(name, '') for name in answer)),
+        )
+
+
+def schedule_fields(card_type, due, interval, factor, reps, lapses, collection_created):
+    """
+    Map an Anki card's scheduling onto the SM-2 fields of Flashcard.
+
+    Anki's ease factor is stored in permille and its interval in days
+    (negative values are seconds, for learning steps). Review cards are due
+    on a day number counted from the collection creation date, learning
+    cards at a Unix timestamp. New cards stay new.
+
+    Returns:
+        dict: ease_factor, review_count, correct_count, last_studied, next_review
+    """
+    fields = {
+        'ease_factor': max(MIN_EASE_FACTOR, factor / 1000.0) if factor else DEFAULT_EASE_FACTOR,
+        'review_count': reps,
+        'correct_count': max(reps - lapses, 0),
+        'last_studied': None,
+        'next_review': None,
+    }
+    if card_type == ANKI_NEW:
+        return fields
+
+    if due >= TIMESTAMP_DUE_THRESHOLD:
+        next_review = datetime.fromtimestamp(due, tz=dt_timezone.utc)
+    else:
+        next_review = collection_created + timedelta(days=due)
+    gap = timedelta(days=interval) if interval >= 0 else timedelta(seconds=-interval)
+
+    fields['next_review'] = next_review
+    fields['last_studied'] = next_review - gap
+    return fields
+
+
+def read_collection(connection):
+    """
+    Read the collection header.
+
+    Returns:
+        tuple: (creation datetime, {deck id: name}, NoteTypes)
+    """
+    created, decks, models = connection.execute('SELECT crt, decks, models FROM col').fetchone()
+    try:
+        deck_names = {
+            int(deck_id): deck['name'] for deck_id, deck in json.loads(decks or '{}').items()
+        }
+        note_types = NoteTypes(json.loads(models or '{}'))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ImportFormatError('The Anki collection has invalid deck or note type data.') from exc
+    return datetime.fromtimestamp(created, tz=dt_timezone.utc), deck_names, note_types
+
+
+def import_anki_package(user, upload, max_cards=MAX_IMPORT_ROWS):
+    """
+    Import every card of an .apkg into new flashcard sets, one per deck.
+
+    Cards are streamed from the collection ordered by deck, so only one
+    deck's pending chunk is buffered at a time. Cards without any text
+    (for example image-only cards) are skipped.
+
+    Args:
+        user: Owner of the new sets
+        upload: File object of the .apkg (must be seekable)
+        max_cards (int): Stop with an error after this many cards
+
+    Returns:
+        dict: 'sets' created (id, name, cards), total 'created' and 'skipped'
+
+    Raises:
+        ImportFormatError: If the package cannot be read or is too large
+    """
+    name_length = FlashcardSet._meta.get_field('name').max_length
+    sets = []
+    created = 0
+    skipped = 0
+
+    with open_collection(upload) as connection, transaction.atomic():
+        collection_created, deck_names, note_types = read_collection(connection)
+        deck_id = None
+        writer = None
+
+        for row_number, row in enumerate(connection.execute(CARD_QUERY), start=1):
+            if row_number > max_cards:
+                raise ImportFormatError(f'Imports are limited to {max_cards} cards.')
+            did, card_ord, card_type, due, interval, factor, reps, lapses, model_id, fields = row
+
+            front, back = note_types.render(model_id, card_ord, fields.split(FIELD_SEPARATOR))
+            if not front or not back:
+                skipped += 1
+                continue
+
+            if did != deck_id:
+                if writer is not None:
+                    writer.flush()
+                deck_id = did
+                name = deck_names.get(did) or f'Anki deck {did}'
+                writer = FlashcardWriter(
+                    FlashcardSet.objects.create(user=user, name=name[:name_length])
+                )
+                sets.append(writer)
+
+            writer.add({
+                'front': front,
+                'back': back,
+                **schedule_fields(
+                    card_type, due, interval, factor, reps, lapses, collection_created
+                ),
+            })
+
+        if writer is not None:
+            writer.flush()
+        created = sum(writer.written for writer in sets)
+        if created:
+            transaction.on_commit(lambda: bump_schedule_version(user.pk))
+
+    return {
+        'sets': [
+            {
+                'id': writer.flashcard_set.id,
+                'name': writer.flashcard_set.name,
+                'cards': writer.written,
+            }
+            for writer in sets
+        ],
+        'created': created,
+        'skipped': skipped,
+    }
@@ -5,3 +5,5 @@ class FlashcardsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'flashcards'
 
+    def ready(self):
+        from . import signals  # noqa: F401
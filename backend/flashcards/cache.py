@@ -0,0 +1,82 @@
+"""
+Flashcard Cache Keys
+Versions used to invalidate cached flashcard data.
+
+Anything computed from a user's card schedule (for example the workload
+forecast) is cached under a key that embeds the user's current schedule
+version, serialized card lists under a key that embeds their set's cards
+version, and study statistics under a key that embeds the user's stats
+version. Changing the schedule or the cards bumps the version, so stale
+entries are never read again and simply expire; no key scanning or explicit
+deletes are needed. Versions and cached values are read through the two-tier
+cache (see study_app.cache).
+"""
+
+from django.db import transaction
+from study_app.cache import two_tier
+
+SCHEDULE_VERSION_KEY = 'flashcards:schedule-version:{user_id}'
+CARDS_VERSION_KEY = 'flashcards:cards-version:{set_id}'
+STATS_VERSION_KEY = 'flashcards:stats-version:{user_id}'
+
+# Cached card pages expire after an hour even if nothing changes
+CARDS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_schedule_version(user_id):
+    """Return the current schedule version for a user"""
+    return two_tier.get_version(SCHEDULE_VERSION_KEY.format(user_id=user_id))
+
+
+def bump_schedule_version(user_id):
+    """Invalidate everything cached from a user's schedule"""
+    two_tier.bump_version(SCHEDULE_VERSION_KEY.format(user_id=user_id))
+
+
+def schedule_cache_key(user_id, name, *parts):
+    """Build a cache key that is invalidated when the user's schedule changes"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'flashcards:{name}:{user_id}:{get_schedule_version(user_id)}:{suffix}'
+
+
+def get_cards_version(set_id):
+    """Return the current cards version of a flashcard set"""
+    return two_tier.get_version(CARDS_VERSION_KEY.format(set_id=set_id))
+
+
+def bump_cards_version(*set_ids):
+    """Invalidate the cached card lists of flashcard sets"""
+    for set_id in set_ids:
+        two_tier.bump_version(CARDS_VERSION_KEY.format(set_id=set_id))
+
+
+def invalidate_cards(set_id):
+    """
+    Bump a set's cards version now, so the rest of this request sees the
+    change, and again on commit, so a list another request cached from the
+    old rows while the transaction was open is not kept.
+    """
+    bump_cards_version(set_id)
+    transaction.on_commit(lambda: bump_cards_version(set_id))
+
+
+def get_stats_version(user_id):
+    """Return the current study stats version for a user"""
+    return two_tier.get_version(STATS_VERSION_KEY.format(user_id=user_id))
+
+
+def bump_stats_version(user_id):
+    """Invalidate a user's cached study statistics"""
+    two_tier.bump_version(STATS_VERSION_KEY.format(user_id=user_id))
+
+
+def invalidate_stats(user_id):
+    """Bump a user's stats version now and again on commit, as invalidate_cards() does"""
+    bump_stats_version(user_id)
+    transaction.on_commit(lambda: bump_stats_version(user_id))
+
+
+def cards_cache_key(set_id, name, *parts):
+    """Build a cache key that is invalidated when the set's cards change"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'flashcards:{name}:set:{set_id}:{get_cards_version(set_id)}:{suffix}'
@@ -0,0 +1,368 @@
+"""
+Flashcard Import
+Streaming bulk import of cards into a FlashcardSet from CSV, TSV, JSON or NDJSON.
+
+Input is parsed incrementally from the request body or uploaded file, each
+row is validated with FlashcardSerializer, and valid rows are written in
+chunks (COPY on PostgreSQL, bulk_create elsewhere), so memory use does not
+grow with the size of the file.
+"""
+
+import csv
+import io
+import json
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+from search.cache import bump_text_version
+from .cache import bump_cards_version
+from .models import Flashcard
+from .serializers import FlashcardSerializer
+
+IMPORT_FORMATS = ('csv', 'tsv', 'json', 'ndjson')
+
+CONTENT_TYPE_FORMATS = {
+    'text/csv': 'csv',
+    'text/tab-separated-values': 'tsv',
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+EXTENSION_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.txt': 'tsv',
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+# Columns read from delimited files without a header row
+DEFAULT_COLUMNS = ('front', 'back', 'difficulty')
+
+MAX_IMPORT_ROWS = 200_000
+MAX_REPORTED_ERRORS = 100
+MAX_JSON_ITEM_SIZE = 1024 * 1024
+READ_SIZE = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """Raised when the input cannot be parsed at all"""
+
+
+def detect_format(content_type=None, filename=None, requested=None):
+    """
+    Work out the input format from an explicit request, file name or content type.
+
+    Raises:
+        ImportFormatError: If the format is unknown or cannot be detected
+    """
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise ImportFormatError(f"Format must be one of: {', '.join(IMPORT_FORMATS)}.")
+        return requested
+    if filename:
+        for extension, file_format in EXTENSION_FORMATS.items():
+            if filename.lower().endswith(extension):
+                return file_format
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type in CONTENT_TYPE_FORMATS:
+        return CONTENT_TYPE_FORMATS[media_type]
+    raise ImportFormatError('Could not detect the import format; pass file_format.')
+
+
+class ReadableStream(io.RawIOBase):
+    """Adapt any object with read() (request body, uploaded file) to io buffering"""
+
+    def __init__(self, source):
+        self.source = source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def text_stream(source):
+    """Open a binary source as UTF-8 text (a leading BOM is skipped)"""
+    return io.TextIOWrapper(
+        io.BufferedReader(ReadableStream(source), READ_SIZE),
+        encoding='utf-8-sig',
+        newline=''
+    )
+
+
+def iter_delimited_rows(stream, delimiter):
+    """
+    Yield one dict per CSV/TSV row.
+
+    A first row naming a 'front' and 'back' column is used as the header;
+    otherwise columns are read as front, back, difficulty.
+    """
+    reader = csv.reader(stream, delimiter=delimiter)
+    columns = DEFAULT_COLUMNS
+    for index, row in enumerate(reader):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if index == 0:
+            header = [cell.strip().lower() for cell in row]
+            if 'front' in header and 'back' in header:
+                columns = header
+                continue
+        yield dict(zip(columns, row))
+
+
+def iter_json_array(stream):
+    """
+    Yield the items of a top-level JSON array without reading the whole document.
+
+    Items are decoded one at a time from a sliding buffer, so only the
+    current item has to fit in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    opened = False
+    expect_item = True
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+        if position >= len(buffer):
+            if eof:
+                raise ImportFormatError('Unexpected end of JSON input.')
+            fill()
+            continue
+
+        char = buffer[position]
+        if not opened:
+            if char != '[':
+                raise ImportFormatError('JSON input must be an array of cards.')
+            opened = True
+            position += 1
+        elif char == ']':
+            return
+        elif char == ',' and not expect_item:
+            expect_item = True
+            position += 1
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                item, end = None, None
+            # An item that reaches the end of the buffer may be cut short
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise ImportFormatError('Invalid JSON input.')
+                if len(buffer) - position > MAX_JSON_ITEM_SIZE:
+                    raise ImportFormatError('JSON item is too large.')
+                fill()
+                continue
+            yield item
+            position = end
+            expect_item = False
+
+
+def iter_ndjson(stream):
+    """Yield one item per non-empty line of newline-delimited JSON"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # Reported as a row error by the importer
+            yield line
+
+
+def iter_rows(stream, file_format):
+    """Yield raw row data for a format"""
+    if file_format == 'csv':
+        return iter_delimited_rows(stream, ',')
+    if file_format == 'tsv':
+        return iter_delimited_rows(stream, '\t')
+    if file_format == 'json':
+        return iter_json_array(stream)
+    return iter_ndjson(stream)
+
+
+def copy_value(value):
+    """Format a value for PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class FlashcardWriter:
+    """
+    Insert flashcards into one set in fixed-size chunks.
+
+    Rows are buffered as plain dicts and written with COPY on PostgreSQL or
+    bulk_create on other databases. Call flush() once after the last add().
+    """
+    COLUMNS = (
+        'flashcard_set_id', 'user_id', 'front', 'back', 'difficulty',
+        'ease_factor', 'review_count', 'correct_count',
+        'last_studied', 'next_review', 'created_at', 'updated_at',
+    )
+    DEFAULTS = {
+        'difficulty': 'medium',
+        'ease_factor': 2.5,
+        'review_count': 0,
+        'correct_count': 0,
+        'last_studied': None,
+        'next_review': None,
+    }
+
+    def __init__(self, flashcard_set, chunk_size=2000):
+        self.flashcard_set = flashcard_set
+        self.chunk_size = chunk_size
+        self.pending = []
+        self.written = 0
+        self.invalidating = False
+        self.now = timezone.now()
+        self.use_copy = connection.vendor == 'postgresql'
+
+    def add(self, fields):
+        """Queue one card; fields are validated Flashcard field values"""
+        row = {
+            **self.DEFAULTS,
+            **fields,
+            'flashcard_set_id': self.flashcard_set.pk,
+            'user_id': self.flashcard_set.user_id,
+            'created_at': self.now,
+            'updated_at': self.now,
+        }
+        self.pending.append(row)
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write all queued cards; the set's cached card lists are dropped on commit"""
+        if not self.pending:
+            return
+        if self.use_copy:
+            self.copy(self.pending)
+        else:
+            Flashcard.objects.bulk_create(
+                [Flashcard(**row) for row in self.pending],
+                batch_size=self.chunk_size
+            )
+        self.written += len(self.pending)
+        self.pending = []
+        if not self.invalidating:
+            # Bulk inserts send no signals
+            set_id = self.flashcard_set.pk
+            user_id = self.flashcard_set.user_id
+            transaction.on_commit(lambda: bump_cards_version(set_id))
+            transaction.on_commit(lambda: bump_text_version(user_id))
+            self.invalidating = True
+
+    def copy(self, rows):
+        """Stream rows into the table with COPY FROM STDIN"""
+        data = io.StringIO()
+        for row in rows:
+            data.write('\t'.join(copy_value(row[column]) for column in self.COLUMNS))
+            data.write('\n')
+        data.seek(0)
+
+        quote = connection.ops.quote_name
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            quote(Flashcard._meta.db_table),
+            ', '.join(quote(column) for column in self.COLUMNS)
+        )
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy_expert'):
+                # psycopg2
+                raw_cursor.copy_expert(sql, data)
+            else:
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(data.getvalue())
+
+
+def parse_errors_as_format_errors(rows):
+    """Re-raise decoding and CSV errors from a row iterator as ImportFormatError"""
+    try:
+        yield from rows
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError('Import files must be UTF-8 encoded.') from exc
+    except csv.Error as exc:
+        raise ImportFormatError(f'Could not parse the import file: {exc}') from exc
+
+
+def import_flashcards(flashcard_set, rows, max_rows=MAX_IMPORT_ROWS):
+    """
+    Validate and insert rows as flashcards in one transaction.
+
+    Rows that fail validation are skipped and reported; the rest are
+    imported. Only the first MAX_REPORTED_ERRORS errors are returned in
+    detail.
+
+    Args:
+        flashcard_set: Set to import into
+        rows: Iterable of row data (dicts with front, back and optional difficulty)
+        max_rows (int): Stop with an error after this many rows
+
+    Returns:
+        dict: 'rows' read, 'created' cards, 'error_count' and 'errors'
+
+    Raises:
+        ImportFormatError: If the input stops being parseable part way through
+    """
+    serializer = FlashcardSerializer()
+    writer = FlashcardWriter(flashcard_set)
+    errors = []
+    error_count = 0
+    row_count = 0
+
+    with transaction.atomic():
+        for row_number, data in enumerate(parse_errors_as_format_errors(rows), start=1):
+            if row_number > max_rows:
+                raise ImportFormatError(f'Imports are limited to {max_rows} rows.')
+            row_count = row_number
+            try:
+                if not isinstance(data, dict):
+                    raise serializers.ValidationError('Each row must be an object.')
+                validated = serializer.run_validation(data)
+            except serializers.ValidationError as exc:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'errors': exc.detail})
+                continue
+            writer.add({
+                'front': validated['front'],
+                'back': validated['back'],
+                'difficulty': validated.get('difficulty', 'medium'),
+            })
+        writer.flush()
+
+    return {
+        'rows': row_count,
+        'created': writer.written,
+        'error_count': error_count,
+        'errors': errors,
+    }
@@ -0,0 +1,119 @@
+"""
+Fit per-user FSRS weights from review history.
+
+Usage:
+    python manage.py fit_fsrs [--user ID] [--workers N] [--min-reviews N]
+
+Review logs are streamed from the database ordered by user; each user's
+history is fitted in a worker process and the results are written back in
+batches. Fitting itself is pure NumPy, so workers never touch the database.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import groupby
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from flashcards.models import ReviewLog, SchedulerParameters
+from flashcards.scheduling import FSRSScheduler, fit_fsrs_weights, to_datetime64
+
+
+def fit_user(user_id, card_ids, quality, reviewed_at):
+    """Fit one user's weights; runs in a worker process"""
+    _, card_index = np.unique(card_ids, return_inverse=True)
+    weights, loss = fit_fsrs_weights(card_index, quality, reviewed_at)
+    return user_id, weights, loss, len(quality)
+
+
+class Command(BaseCommand):
+    help = 'Fit per-user FSRS scheduler weights from ReviewLog history'
+
+    CHUNK_SIZE = 5000
+    WRITE_BATCH_SIZE = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only fit this user')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (0 fits in this process)'
+        )
+        parser.add_argument(
+            '--min-reviews',
+            type=int,
+            default=50,
+            help='Skip users with fewer reviews than this'
+        )
+
+    def handle(self, *args, **options):
+        self.fitted = []
+        self.fitted_count = 0
+
+        logs = ReviewLog.objects.order_by('user_id', 'reviewed_at')
+        if options['user']:
+            logs = logs.filter(user_id=options['user'])
+        rows = logs.values_list('user_id', 'card_id', 'quality', 'reviewed_at').iterator(
+            chunk_size=self.CHUNK_SIZE
+        )
+        histories = self.user_histories(rows, options['min_reviews'])
+
+        workers = options['workers']
+        if workers <= 0:
+            for history in histories:
+                self.collect(fit_user(*history))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for history in histories:
+                    # Bound the number of histories held in memory at once
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self.collect(future.result())
+                    pending.add(executor.submit(fit_user, *history))
+                for future in pending:
+                    self.collect(future.result())
+
+        self.flush()
+        self.stdout.write(self.style.SUCCESS(f'Fitted FSRS weights for {self.fitted_count} users.'))
+
+    def user_histories(self, rows, min_reviews):
+        """Group streamed log rows into per-user NumPy arrays"""
+        for user_id, user_rows in groupby(rows, key=lambda row: row[0]):
+            user_rows = list(user_rows)
+            if len(user_rows) < min_reviews:
+                continue
+            yield (
+                user_id,
+                np.array([row[1] for row in user_rows], dtype=np.int64),
+                np.array([row[2] for row in user_rows], dtype=np.int64),
+                to_datetime64(row[3] for row in user_rows),
+            )
+
+    def collect(self, result):
+        """Queue a fitted result for writing"""
+        user_id, weights, loss, review_count = result
+        self.fitted.append(SchedulerParameters(
+            user_id=user_id,
+            scheduler=FSRSScheduler.name,
+            weights=weights,
+            loss=loss,
+            review_count=review_count
+        ))
+        if len(self.fitted) >= self.WRITE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Upsert queued results in one statement"""
+        if not self.fitted:
+            return
+        SchedulerParameters.objects.bulk_create(
+            self.fitted,
+            update_conflicts=True,
+            unique_fields=['user', 'scheduler'],
+            update_fields=['weights', 'loss', 'review_count', 'fitted_at']
+        )
+        self.fitted_count += len(self.fitted)
+        self.fitted = []
@@ -0,0 +1,200 @@
+"""
+Rebuild flashcard schedules by replaying their review history.
+
+Usage:
+    python manage.py replay_reviews [--user ID] [--set ID] [--dry-run]
+"""
+
+from itertools import islice
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from flashcards.cache import bump_cards_version, bump_schedule_version
+from flashcards.models import Flashcard, ReviewLog
+from flashcards.reviews import PARAMETERIZED_SCHEDULERS, load_scheduler_parameters
+from flashcards.scheduling import ONE_DAY, none_if_nan, replay_reviews, to_datetime, to_datetime64
+
+# Columns read from each review log, with the array dtype of each
+HISTORY_FIELDS = {
+    'card_id': np.int64,
+    'quality': np.int64,
+    'reviewed_at': 'datetime64[us]',
+    'previous_ease': np.float64,
+    'previous_interval': np.int64,
+    'card__review_count': np.int64,
+    'card__correct_count': np.int64,
+    'card__flashcard_set__scheduler': object,
+    'card__flashcard_set__user_id': np.int64,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute flashcard schedules from their ReviewLog history, "
+        "with each set's scheduler"
+    )
+
+    CHUNK_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only replay cards owned by this user')
+        parser.add_argument('--set', type=int, dest='flashcard_set', help='Only replay cards in this set')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute the new schedules without saving them'
+        )
+
+    def load_history(self, logs):
+        """
+        Stream the review logs into one array per column, CHUNK_SIZE rows at a
+        time, so no list of every row is held in memory.
+
+        Returns:
+            dict: Arrays keyed by HISTORY_FIELDS, or None without any logs
+        """
+        rows = logs.order_by().values_list(*HISTORY_FIELDS).iterator(chunk_size=self.CHUNK_SIZE)
+        chunks = {field: [] for field in HISTORY_FIELDS}
+        while chunk := list(islice(rows, self.CHUNK_SIZE)):
+            for field, column in zip(HISTORY_FIELDS, zip(*chunk)):
+                if field == 'reviewed_at':
+                    chunks[field].append(to_datetime64(column))
+                else:
+                    chunks[field].append(np.array(column, dtype=HISTORY_FIELDS[field]))
+        if not chunks['card_id']:
+            return None
+        return {field: np.concatenate(parts) for field, parts in chunks.items()}
+
+    def seed_state(self, history, positions, earliest):
+        """
+        Starting state of each card, taken from its earliest log.
+
+        The first log records the ease the card had before it, and reviews
+        made before review logging (or imported from Anki) show up as the
+        card's counts exceeding its logs. Those are kept instead of starting
+        every card over from a new card's state.
+        """
+        card_count = len(earliest)
+        logged = np.bincount(positions, minlength=card_count)
+        logged_correct = np.bincount(positions, weights=history['quality'] >= 3, minlength=card_count)
+        review_count = np.maximum(0, history['card__review_count'][earliest] - logged)
+        correct_count = np.maximum(
+            0, history['card__correct_count'][earliest] - logged_correct.astype(np.int64)
+        )
+
+        # The interval before the first log dates the review that set it
+        previous_interval = history['previous_interval'][earliest]
+        seen = (review_count > 0) & (previous_interval > 0)
+        last_studied = np.full(card_count, np.datetime64('NaT'), dtype='datetime64[us]')
+        last_studied[seen] = history['reviewed_at'][earliest][seen] - previous_interval[seen] * ONE_DAY
+        next_review = last_studied + previous_interval * ONE_DAY
+
+        return {
+            'ease_factor': history['previous_ease'][earliest],
+            'review_count': review_count,
+            'correct_count': correct_count,
+            'last_studied': last_studied,
+            'next_review': next_review,
+        }
+
+    def replay(self, positions, quality, reviewed_at, seed, schedulers, owners):
+        """
+        Replay every card with its set's scheduler.
+
+        Cards are replayed in one batch per scheduler, and per owner for
+        schedulers with per-user parameters (FSRS).
+        """
+        card_count = len(schedulers)
+        state = {}
+        for name in np.unique(schedulers):
+            uses_scheduler = schedulers == name
+            if name in PARAMETERIZED_SCHEDULERS:
+                groups = [
+                    (uses_scheduler & (owners == owner),
+                     load_scheduler_parameters(int(owner), [name]).get(name))
+                    for owner in np.unique(owners[uses_scheduler])
+                ]
+            else:
+                groups = [(uses_scheduler, None)]
+
+            for in_group, parameters in groups:
+                cards = np.flatnonzero(in_group)
+                group_index = np.full(card_count, -1, dtype=np.int64)
+                group_index[cards] = np.arange(len(cards))
+                reviews = in_group[positions]
+                result = replay_reviews(
+                    group_index[positions[reviews]],
+                    quality[reviews],
+                    reviewed_at[reviews],
+                    len(cards),
+                    scheduler=name,
+                    parameters=parameters,
+                    **{field: values[cards] for field, values in seed.items()}
+                )
+                for field, values in result.items():
+                    if field not in state:
+                        state[field] = np.empty(card_count, dtype=values.dtype)
+                    state[field][cards] = values
+        return state
+
+    def handle(self, *args, **options):
+        logs = ReviewLog.objects.all()
+        if options['user']:
+            logs = logs.filter(user_id=options['user'])
+        if options['flashcard_set']:
+            logs = logs.filter(card__flashcard_set_id=options['flashcard_set'])
+
+        history = self.load_history(logs)
+        if history is None:
+            self.stdout.write('No review history to replay.')
+            return
+
+        card_ids, positions = np.unique(history['card_id'], return_inverse=True)
+        reviewed_at = history['reviewed_at']
+        quality = history['quality']
+        order = np.lexsort((reviewed_at, positions))
+        earliest = order[np.searchsorted(positions[order], np.arange(len(card_ids)))]
+        seed = self.seed_state(history, positions, earliest)
+        schedulers = history['card__flashcard_set__scheduler'][earliest]
+        owners = history['card__flashcard_set__user_id'][earliest]
+        del history
+
+        state = self.replay(positions, quality, reviewed_at, seed, schedulers, owners)
+        self.stdout.write(
+            f'Replayed {len(positions)} reviews for {len(card_ids)} flashcards.'
+        )
+
+        if options['dry_run']:
+            return
+
+        now = timezone.now()
+        with transaction.atomic():
+            for start in range(0, len(card_ids), self.CHUNK_SIZE):
+                stop = start + self.CHUNK_SIZE
+                cards = [
+                    Flashcard(
+                        pk=int(card_id),
+                        ease_factor=float(state['ease_factor'][index]),
+                        review_count=int(state['review_count'][index]),
+                        correct_count=int(state['correct_count'][index]),
+                        last_studied=to_datetime(state['last_studied'][index]),
+                        next_review=to_datetime(state['next_review'][index]),
+                        stability=none_if_nan(state['stability'][index]),
+                        fsrs_difficulty=none_if_nan(state['difficulty'][index]),
+                        updated_at=now
+                    )
+                    for index, card_id in enumerate(card_ids[start:stop], start=start)
+                ]
+                Flashcard.objects.bulk_update(
+                    cards,
+                    ['ease_factor', 'review_count', 'correct_count', 'last_studied',
+                     'next_review', 'stability', 'fsrs_difficulty', 'updated_at']
+                )
+
+        for user_id in logs.order_by().values_list('user_id', flat=True).distinct():
+            bump_schedule_version(user_id)
+        bump_cards_version(*logs.order_by().values_list('card__flashcard_set_id', flat=True).distinct())
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {len(card_ids)} flashcards.'))
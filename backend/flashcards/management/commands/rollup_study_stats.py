@@ -0,0 +1,83 @@
+"""
+Fold new and changed study sessions into DailyStudyRollup.
+
+Usage:
+    python manage.py rollup_study_stats [--full] [--lag SECONDS]
+
+Only the (user, day) groups touched by sessions updated since the stored
+watermark are recomputed, so a run costs O(changed days), not O(sessions).
+With --full, every (user, day) that has sessions is rebuilt, including
+sessions still inside the lag window, so no history is dropped for them.
+"""
+
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from flashcards.models import DailyStudyRollup, RollupWatermark, StudySession
+from flashcards.stats import DAILY_ROLLUP, rebuild_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Incrementally materialize per-day study statistics from StudySession'
+
+    CHUNK_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Ignore the watermark and rebuild every rollup'
+        )
+        parser.add_argument(
+            '--lag',
+            type=int,
+            default=60,
+            help='Leave sessions updated in the last SECONDS for the next run, '
+                 'so transactions still in flight are not skipped'
+        )
+
+    def handle(self, *args, **options):
+        watermark = None if options['full'] else RollupWatermark.get(DAILY_ROLLUP)
+        high_watermark = timezone.now() - timedelta(seconds=options['lag'])
+
+        sessions = StudySession.objects.all()
+        if not options['full']:
+            sessions = sessions.filter(updated_at__lte=high_watermark)
+        if watermark is not None:
+            sessions = sessions.filter(updated_at__gt=watermark)
+        changed = (
+            sessions.annotate(date=TruncDate('started_at'))
+            .values_list('user_id', 'date')
+            .distinct()
+            .order_by('user_id')
+            .iterator(chunk_size=self.CHUNK_SIZE)
+        )
+
+        users = days = rows = 0
+        for user_id, user_days in groupby(changed, key=lambda row: row[0]):
+            dates = [date for _, date in user_days]
+            # A full rebuild replaces each user's rows in one transaction, so
+            # readers never see a user's history missing
+            rows += rebuild_daily_rollups(user_id, dates, replace_all=options['full'])
+            users += 1
+            days += len(dates)
+
+        if options['full']:
+            # Only users left without any sessions have nothing rebuilt
+            DailyStudyRollup.objects.exclude(
+                user_id__in=StudySession.objects.values('user_id')
+            ).delete()
+
+        with transaction.atomic():
+            RollupWatermark.objects.update_or_create(
+                name=DAILY_ROLLUP,
+                defaults={'watermark': high_watermark}
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {days} days for {users} users ({rows} rows).'
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quality', models.PositiveSmallIntegerField()),
+                ('previous_interval', models.IntegerField(default=0)),
+                ('new_interval', models.IntegerField()),
+                ('previous_ease', models.FloatField()),
+                ('new_ease', models.FloatField()),
+                ('reviewed_at', models.DateTimeField()),
+                ('response_time_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_logs', to='flashcards.flashcard')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-reviewed_at'],
+                'indexes': [models.Index(fields=['user', 'reviewed_at'], name='flashcards__user_id_df3c54_idx'), models.Index(fields=['card', 'reviewed_at'], name='flashcards__card_id_f3d622_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('quality__lte', 5)), name='review_log_quality_range')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_flashcard_user(apps, schema_editor):
+    """Copy the owner of each flashcard's set onto the flashcard"""
+    Flashcard = apps.get_model('flashcards', 'Flashcard')
+    FlashcardSet = apps.get_model('flashcards', 'FlashcardSet')
+    owner = FlashcardSet.objects.filter(
+        pk=models.OuterRef('flashcard_set_id')
+    ).values('user_id')[:1]
+    Flashcard.objects.update(user_id=models.Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0002_review_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flashcard',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(populate_flashcard_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='flashcard',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'next_review'], name='flashcards__user_id_2800b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(condition=models.Q(('next_review__isnull', True)), fields=['user', 'created_at'], name='flashcard_user_new_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0003_flashcard_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flashcard',
+            name='fsrs_difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flashcard',
+            name='stability',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flashcardset',
+            name='scheduler',
+            field=models.CharField(choices=[('sm2', 'SM-2'), ('leitner', 'Leitner'), ('fsrs', 'FSRS')], default='sm2', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='SchedulerParameters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduler', models.CharField(choices=[('sm2', 'SM-2'), ('leitner', 'Leitner'), ('fsrs', 'FSRS')], max_length=10)),
+                ('weights', models.JSONField()),
+                ('review_count', models.IntegerField(default=0)),
+                ('loss', models.FloatField(blank=True, null=True)),
+                ('fitted_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scheduler_parameters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'scheduler')},
+            },
+        ),
+    ]
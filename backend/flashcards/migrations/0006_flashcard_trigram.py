@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# GIN trigram indexes for fuzzy search (search.fuzzy); PostgreSQL only
+POSTGRESQL_INSTALL = [
+    'CREATE INDEX flashcards_flashcard_front_trgm ON flashcards_flashcard USING gin (front gin_trgm_ops)',
+    'CREATE INDEX flashcards_flashcard_back_trgm ON flashcards_flashcard USING gin (back gin_trgm_ops)',
+]
+
+POSTGRESQL_UNINSTALL = [
+    'DROP INDEX IF EXISTS flashcards_flashcard_front_trgm',
+    'DROP INDEX IF EXISTS flashcards_flashcard_back_trgm',
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_INSTALL:
+            schema_editor.execute(statement)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_UNINSTALL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0005_daily_study_rollup'),
+        # Installs the pg_trgm extension
+        ('notes', '0003_note_trigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
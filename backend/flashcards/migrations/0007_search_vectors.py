@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:50
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Full-text indexes for search.fulltext: (table, title column, body column)
+SEARCHABLE_TABLES = [
+    ('flashcards_flashcard', 'front', 'back'),
+    ('flashcards_flashcardset', 'name', 'description'),
+]
+
+
+def postgresql_install(table, title, body):
+    return [
+        f"""
+        CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.{title}, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.{body}, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER {table}_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF {title}, {body} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """,
+        # Fires the trigger for existing rows
+        f'UPDATE {table} SET {title} = {title}',
+        f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)',
+    ]
+
+
+def postgresql_uninstall(table, title, body):
+    return [
+        f'DROP INDEX IF EXISTS {table}_search_vector_gin',
+        f'DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}',
+        f'DROP FUNCTION IF EXISTS {table}_search_vector_update()',
+    ]
+
+
+# External-content FTS5 tables, as for notes_note (notes 0002). The triggers
+# are dropped if SQLite rebuilds the table for a schema change, so a
+# migration that alters these tables must run sqlite_install again.
+def sqlite_install(table, title, body):
+    fts = f'{table}_fts'
+    return [
+        f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {title}, {body}, content='{table}', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {title}, {body})
+            VALUES ('delete', old.id, old.{title}, old.{body});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_update AFTER UPDATE OF {title}, {body} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {title}, {body})
+            VALUES ('delete', old.id, old.{title}, old.{body});
+            INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body});
+        END
+        """,
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_uninstall(table, title, body):
+    fts = f'{table}_fts'
+    return [
+        f'DROP TRIGGER IF EXISTS {fts}_insert',
+        f'DROP TRIGGER IF EXISTS {fts}_delete',
+        f'DROP TRIGGER IF EXISTS {fts}_update',
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+
+
+def run_for_vendor(builders):
+    """Build a RunPython function running each table's statements for the current database"""
+    def run(apps, schema_editor):
+        build = builders.get(schema_editor.connection.vendor)
+        if build is None:
+            return
+        for columns in SEARCHABLE_TABLES:
+            for statement in build(*columns):
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0006_flashcard_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flashcard',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='flashcardset',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor({'postgresql': postgresql_install, 'sqlite': sqlite_install}),
+            run_for_vendor({'postgresql': postgresql_uninstall, 'sqlite': sqlite_uninstall}),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicates(apps, schema_editor):
+    """Keep one rollup per user, day and set; the next run recomputes it anyway"""
+    DailyStudyRollup = apps.get_model('flashcards', 'DailyStudyRollup')
+    duplicates = (
+        DailyStudyRollup.objects.values('user_id', 'date', 'flashcard_set_id')
+        .annotate(keep=Max('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in duplicates:
+        DailyStudyRollup.objects.filter(
+            user_id=group['user_id'],
+            date=group['date'],
+            flashcard_set_id=group['flashcard_set_id']
+        ).exclude(pk=group['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flashcards', '0007_search_vectors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailystudyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('flashcard_set__isnull', False)), fields=('user', 'date', 'flashcard_set'), name='daily_rollup_unique_set_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystudyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('flashcard_set__isnull', True)), fields=('user', 'date'), name='daily_rollup_unique_unsorted_day'),
+        ),
+    ]
@@ -1,18 +1,22 @@
 """
 Flashcard Models
-FlashcardSet, Flashcard (with SM-2 algorithm), StudySession
+FlashcardSet, Flashcard (with pluggable scheduling, SM-2 by default), ReviewLog,
+SchedulerParameters, StudySession
 
 Created by: Database Agent
 Date: 2025-01-27
 """
 
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
-from django.db.models import CheckConstraint, Q
+from django.db.models import Avg, CheckConstraint, Count, F, Q, UniqueConstraint
 from django.utils import timezone
 from datetime import timedelta
 from notes.models import Category
+from .cache import bump_schedule_version, invalidate_cards
+from .scheduling import DEFAULT_SCHEDULER, SCHEDULER_CHOICES, get_scheduler
 
 User = get_user_model()
 
@@ -32,6 +36,14 @@ class FlashcardSet(models.Model):
         blank=True,
         related_name='flashcard_sets'
     )
+    scheduler = models.CharField(
+        max_length=10,
+        choices=SCHEDULER_CHOICES,
+        default=DEFAULT_SCHEDULER
+    )
+    # Weighted name/description tsvector, maintained by a database trigger on
+    # PostgreSQL (see search.fulltext); unused on other databases
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -42,13 +54,86 @@ class FlashcardSet(models.Model):
         ]
         ordering = ['-updated_at']
 
+    # Cards scheduled this many days apart or more count as mastered
+    MASTERED_INTERVAL_DAYS = 21
+    SUMMARY_FIELDS = ('card_count', 'due_count', 'new_count', 'mastered_count', 'average_ease')
+
     def __str__(self):
         return self.name
 
+    @classmethod
+    def summary_aggregates(cls, now, prefix='flashcards__'):
+        """
+        Build the aggregates for the per-set card summary.
+        
+        With the default prefix the aggregates annotate a FlashcardSet queryset,
+        so a whole page of sets is summarized by one grouped query. With an
+        empty prefix they aggregate a Flashcard queryset directly.
+        
+        Due cards have been reviewed before and are scheduled at or before
+        `now`; new cards have never been reviewed.
+        """
+        mastered_gap = timedelta(days=cls.MASTERED_INTERVAL_DAYS)
+        return {
+            'summary_card_count': Count(prefix + 'id'),
+            'summary_due_count': Count(
+                prefix + 'id',
+                filter=Q(**{prefix + 'next_review__lte': now})
+            ),
+            'summary_new_count': Count(
+                prefix + 'id',
+                filter=Q(**{prefix + 'next_review__isnull': True})
+            ),
+            'summary_mastered_count': Count(
+                prefix + 'id',
+                filter=Q(**{
+                    prefix + 'next_review__gte': F(prefix + 'last_studied') + mastered_gap
+                })
+            ),
+            'summary_average_ease': Avg(prefix + 'ease_factor'),
+        }
+
+    def get_summary(self):
+        """
+        Return the card summary for this set.
+        
+        Uses the values annotated by summary_aggregates() when the set was
+        loaded that way, otherwise runs a single aggregate query.
+        
+        Returns:
+            dict: card_count, due_count, new_count, mastered_count, average_ease
+        """
+        if not hasattr(self, 'summary_card_count'):
+            aggregates = FlashcardSet.summary_aggregates(timezone.now(), prefix='')
+            values = Flashcard.objects.filter(flashcard_set=self).aggregate(**aggregates)
+            for name, value in values.items():
+                setattr(self, name, value)
+        return {field: getattr(self, 'summary_' + field) for field in self.SUMMARY_FIELDS}
+
     @property
     def card_count(self):
         """Return the number of flashcards in this set"""
-        return self.flashcards.count()
+        return self.get_summary()['card_count']
+
+    @property
+    def due_count(self):
+        """Return the number of reviewed flashcards that are due now"""
+        return self.get_summary()['due_count']
+
+    @property
+    def new_count(self):
+        """Return the number of flashcards that were never reviewed"""
+        return self.get_summary()['new_count']
+
+    @property
+    def mastered_count(self):
+        """Return the number of flashcards with a long review interval"""
+        return self.get_summary()['mastered_count']
+
+    @property
+    def average_ease(self):
+        """Return the average ease factor of the set's flashcards (None if empty)"""
+        return self.get_summary()['average_ease']
 
 
 class Flashcard(models.Model):
@@ -67,6 +152,8 @@ class Flashcard(models.Model):
         on_delete=models.CASCADE,
         related_name='flashcards'
     )
+    # Denormalized owner of the flashcard set, so per-user queries need no join
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='flashcards')
     front = models.TextField()  # Question side
     back = models.TextField()  # Answer side
     difficulty = models.CharField(
@@ -85,6 +172,14 @@ class Flashcard(models.Model):
     last_studied = models.DateTimeField(null=True, blank=True)
     next_review = models.DateTimeField(null=True, blank=True)
     
+    # FSRS memory state (only set for cards reviewed with the FSRS scheduler)
+    stability = models.FloatField(null=True, blank=True)
+    fsrs_difficulty = models.FloatField(null=True, blank=True)
+
+    # Weighted front/back tsvector, maintained by a database trigger on
+    # PostgreSQL (see search.fulltext); unused on other databases
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -93,6 +188,12 @@ class Flashcard(models.Model):
             models.Index(fields=['flashcard_set', 'next_review']),
             models.Index(fields=['flashcard_set']),
             models.Index(fields=['next_review']),
+            models.Index(fields=['user', 'next_review']),
+            models.Index(
+                fields=['user', 'created_at'],
+                condition=Q(next_review__isnull=True),
+                name='flashcard_user_new_idx'
+            ),
         ]
         ordering = ['created_at']
         constraints = [
@@ -105,6 +206,26 @@ class Flashcard(models.Model):
     def __str__(self):
         return self.front[:50]  # First 50 characters of front
 
+    def save(self, *args, **kwargs):
+        """Keep the denormalized owner in sync with the flashcard set"""
+        if self.user_id is None and self.flashcard_set_id is not None:
+            self.user_id = self.flashcard_set.user_id
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the card and invalidate its set's card lists and its owner's
+        schedule-derived data.
+
+        Cascades from a set or user delete do not call this, so they stay
+        free of per-card work; the set's post_delete receiver covers them.
+        """
+        result = super().delete(*args, **kwargs)
+        user_id = self.user_id
+        transaction.on_commit(lambda: bump_schedule_version(user_id))
+        invalidate_cards(self.flashcard_set_id)
+        return result
+
     def update_review(self, quality):
         """
         Update flashcard based on SM-2 spaced repetition algorithm.
@@ -117,52 +238,41 @@ class Flashcard(models.Model):
                 - 4: Correct after hesitation
                 - 5: Perfect response
         
+        Returns:
+            dict: Updated values including interval, next_review, ease_factor
+        """
+        result = self.apply_review(quality)
+        
+        # Save the changes (only the scheduling columns)
+        self.save(update_fields=[
+            'ease_factor', 'review_count', 'correct_count', 'last_studied',
+            'next_review', 'stability', 'fsrs_difficulty', 'updated_at'
+        ])
+        
+        return result
+
+    def apply_review(self, quality, now=None, scheduler=None, parameters=None):
+        """
+        Apply a scheduling algorithm to this flashcard in memory without saving.
+        
+        Used directly by bulk review paths, which persist many cards at once.
+        
+        Args:
+            quality (int): User's performance rating (0-5)
+            now (datetime): Time of the review (defaults to the current time)
+            scheduler (str): Name of the scheduler to use (defaults to SM-2)
+            parameters (list): Per-user scheduler parameters (optional)
+        
         Returns:
             dict: Updated values including interval, next_review, ease_factor
         """
         if not (0 <= quality <= 5):
             raise ValueError("Quality must be between 0 and 5")
         
-        now = timezone.now()
-        
-        # Update ease factor based on quality
-        if quality <= 1:
-            # Quality 0-1: Decrease by 0.20
-            self.ease_factor = max(1.3, self.ease_factor - 0.20)
-        elif quality == 2:
-            # Quality 2: Decrease by 0.10
-            self.ease_factor = max(1.3, self.ease_factor - 0.10)
-        elif quality == 3:
-            # Quality 3: No change
-            pass
-        elif quality == 4:
-            # Quality 4: Increase by 0.05
-            self.ease_factor += 0.05
-        else:  # quality == 5
-            # Quality 5: Increase by 0.10
-            self.ease_factor += 0.10
+        if now is None:
+            now = timezone.now()
         
-        # Calculate interval based on review count
-        if self.review_count == 0:
-            # First review: always 1 day
-            interval = 1
-        elif self.review_count == 1:
-            # Second review: 6 days if quality >= 3, else 1 day
-            interval = 6 if quality >= 3 else 1
-        else:
-            # Subsequent reviews
-            if quality >= 3:
-                # Calculate days since last review
-                if self.last_studied:
-                    days_since = (now - self.last_studied).days
-                    # Use previous interval (approximate from days_since) or calculate new
-                    previous_interval = max(1, days_since)
-                    interval = int(previous_interval * self.ease_factor)
-                else:
-                    interval = int(6 * self.ease_factor)  # Fallback
-            else:
-                # Failed review: reset to 1 day
-                interval = 1
+        interval = get_scheduler(scheduler).review(self, quality, now, parameters)
         
         # Update card statistics
         self.review_count += 1
@@ -173,9 +283,6 @@ class Flashcard(models.Model):
         self.last_studied = now
         self.next_review = now + timedelta(days=interval)
         
-        # Save the changes
-        self.save()
-        
         return {
             'interval': interval,
             'next_review': self.next_review,
@@ -212,6 +319,80 @@ class Flashcard(models.Model):
         delta = self.next_review - now
         return delta.days
 
+    def get_scheduled_interval(self):
+        """
+        Get the interval (in days) the card was last scheduled with.
+        
+        Returns:
+            int: Days between the last review and the next review (0 if never reviewed)
+        """
+        if self.last_studied is None or self.next_review is None:
+            return 0
+        
+        return (self.next_review - self.last_studied).days
+
+
+class ReviewLog(models.Model):
+    """
+    Append-only record of a single flashcard review.
+    Captures the scheduling state before and after each SM-2 update.
+    """
+    card = models.ForeignKey(
+        Flashcard,
+        on_delete=models.CASCADE,
+        related_name='review_logs'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='review_logs')
+    quality = models.PositiveSmallIntegerField()
+    previous_interval = models.IntegerField(default=0)
+    new_interval = models.IntegerField()
+    previous_ease = models.FloatField()
+    new_ease = models.FloatField()
+    reviewed_at = models.DateTimeField()
+    response_time_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'reviewed_at']),
+            models.Index(fields=['card', 'reviewed_at']),
+        ]
+        ordering = ['-reviewed_at']
+        constraints = [
+            CheckConstraint(
+                check=Q(quality__lte=5),
+                name='review_log_quality_range'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Review of card {self.card_id} ({self.quality}) at {self.reviewed_at}"
+
+
+class SchedulerParameters(models.Model):
+    """
+    Per-user parameters for a scheduler, fitted from the user's review history.
+    Currently used for FSRS weights (see the fit_fsrs management command).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scheduler_parameters')
+    scheduler = models.CharField(max_length=10, choices=SCHEDULER_CHOICES)
+    weights = models.JSONField()
+    review_count = models.IntegerField(default=0)
+    loss = models.FloatField(null=True, blank=True)
+    fitted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['user', 'scheduler']]
+
+    def __str__(self):
+        return f"{self.scheduler} parameters for user {self.user_id}"
+
+    @classmethod
+    def get_weights(cls, user, scheduler):
+        """Return the user's fitted weights for a scheduler, or None if not fitted"""
+        return cls.objects.filter(user=user, scheduler=scheduler).values_list(
+            'weights', flat=True
+        ).first()
+
 
 class StudySession(models.Model):
     """
@@ -239,6 +420,8 @@ class StudySession(models.Model):
     ended_at = models.DateTimeField(null=True, blank=True)
     cards_studied = models.IntegerField(default=0)
     cards_correct = models.IntegerField(default=0)
+    # Watermark column for the daily rollup; queryset updates must set it too
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         indexes = [
@@ -295,3 +478,62 @@ class StudySession(models.Model):
         
         return (self.cards_correct / self.cards_studied) * 100.0
 
+
+class DailyStudyRollup(models.Model):
+    """
+    Study session totals per user, day and flashcard set.
+    Maintained by the rollup_study_stats management command so statistics
+    read one row per day instead of one row per session.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_study_rollups')
+    date = models.DateField()
+    flashcard_set = models.ForeignKey(
+        FlashcardSet,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='daily_study_rollups'
+    )
+    sessions = models.IntegerField(default=0)
+    cards_studied = models.IntegerField(default=0)
+    cards_correct = models.IntegerField(default=0)
+    minutes = models.FloatField(default=0.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+        ordering = ['-date']
+        constraints = [
+            # One row per user, day and set; NULL sets need their own constraint
+            UniqueConstraint(
+                fields=['user', 'date', 'flashcard_set'],
+                condition=Q(flashcard_set__isnull=False),
+                name='daily_rollup_unique_set_day'
+            ),
+            UniqueConstraint(
+                fields=['user', 'date'],
+                condition=Q(flashcard_set__isnull=True),
+                name='daily_rollup_unique_unsorted_day'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Study rollup for user {self.user_id} on {self.date}"
+
+
+class RollupWatermark(models.Model):
+    """
+    High-water mark of StudySession.updated_at already folded into a rollup.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} up to {self.watermark}"
+
+    @classmethod
+    def get(cls, name):
+        """Return the stored watermark, or None if the rollup never ran"""
+        return cls.objects.filter(name=name).values_list('watermark', flat=True).first()
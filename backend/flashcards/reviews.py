@@ -0,0 +1,257 @@
+"""
+Flashcard Review Persistence
+Write paths that record reviews for one or many flashcards, scheduled with
+the scheduler selected on each card's set.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .cache import bump_cards_version, bump_schedule_version, invalidate_stats
+from .models import Flashcard, ReviewLog, SchedulerParameters, StudySession
+from .scheduling import FSRSScheduler
+
+# Columns touched by a review; everything else on the row is left alone
+REVIEW_FIELDS = [
+    'ease_factor', 'review_count', 'correct_count', 'last_studied',
+    'next_review', 'stability', 'fsrs_difficulty', 'updated_at'
+]
+
+# Schedulers that use per-user fitted parameters
+PARAMETERIZED_SCHEDULERS = [FSRSScheduler.name]
+
+
+def load_scheduler_parameters(user, schedulers):
+    """Return {scheduler name: weights} for the parameterized schedulers in use"""
+    return {
+        name: SchedulerParameters.get_weights(user, name)
+        for name in set(schedulers) if name in PARAMETERIZED_SCHEDULERS
+    }
+
+
+def record_session_reviews(user, session_id, studied, correct, now):
+    """
+    Add reviews to an open study session's counters.
+
+    The counters are incremented with F() expressions in the caller's
+    transaction, so reviews from several devices never overwrite each other.
+    The update sends no signals, so the user's stats version is bumped here.
+
+    Raises:
+        StudySession.DoesNotExist: If the session does not belong to the user
+            or has already ended
+    """
+    updated = StudySession.objects.filter(
+        pk=session_id, user=user, ended_at__isnull=True
+    ).update(
+        cards_studied=F('cards_studied') + studied,
+        cards_correct=F('cards_correct') + correct,
+        updated_at=now
+    )
+    if not updated:
+        raise StudySession.DoesNotExist
+    invalidate_stats(user.pk)
+
+
+def get_open_session(user, session_id):
+    """
+    Lock an open study session of the user, so it cannot end before its
+    reviews are counted.
+
+    Raises:
+        StudySession.DoesNotExist: If the session does not belong to the user
+            or has already ended
+    """
+    return StudySession.objects.select_for_update().only('pk').get(
+        pk=session_id, user=user, ended_at__isnull=True
+    )
+
+
+def build_review_log(card, user, quality, previous_interval, previous_ease, result,
+                     reviewed_at, response_time_ms=None):
+    """Build an unsaved ReviewLog entry for a review that was just applied"""
+    return ReviewLog(
+        card=card,
+        user=user,
+        quality=quality,
+        previous_interval=previous_interval,
+        new_interval=result['interval'],
+        previous_ease=previous_ease,
+        new_ease=result['ease_factor'],
+        reviewed_at=reviewed_at,
+        response_time_ms=response_time_ms
+    )
+
+
+def review_card(user, card_id, quality, flashcard_set_id=None, response_time_ms=None,
+                session_id=None):
+    """
+    Apply a single review with one read and one narrow UPDATE.
+
+    The card is read once (ownership is checked in the same query) and locked
+    for the rest of the transaction, so concurrent reviews of the same card
+    from two devices are applied one after the other. Only the scheduling
+    columns are written; the counters are incremented with F() expressions.
+    A ReviewLog row is inserted in the same transaction, and cached schedule
+    data is invalidated once it commits. Sets using a
+    scheduler with per-user parameters cost one extra read for the weights.
+    When a study session is given, its counters are incremented in the same
+    transaction with one more UPDATE.
+
+    Args:
+        user: Owner of the flashcard
+        card_id (int): Primary key of the flashcard
+        quality (int): User's performance rating (0-5)
+        flashcard_set_id (int): Restrict the lookup to this set (optional)
+        response_time_ms (int): Time the user took to answer (optional)
+        session_id (int): Open study session to count the review in (optional)
+
+    Returns:
+        tuple: (flashcard with the new values applied, review result dict)
+
+    Raises:
+        Flashcard.DoesNotExist: If the card does not exist or belongs to another user
+        StudySession.DoesNotExist: If the session is not an open session of the user
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        queryset = Flashcard.objects.filter(user=user)
+        if flashcard_set_id is not None:
+            queryset = queryset.filter(flashcard_set_id=flashcard_set_id)
+        card = queryset.annotate(
+            scheduler=F('flashcard_set__scheduler')
+        ).select_for_update(of=('self',)).get(pk=card_id)
+        parameters = load_scheduler_parameters(user, [card.scheduler])
+
+        previous_interval = card.get_scheduled_interval()
+        previous_ease = card.ease_factor
+        result = card.apply_review(
+            quality,
+            now=now,
+            scheduler=card.scheduler,
+            parameters=parameters.get(card.scheduler)
+        )
+        card.updated_at = now
+        Flashcard.objects.filter(pk=card.pk).update(
+            ease_factor=card.ease_factor,
+            review_count=F('review_count') + 1,
+            correct_count=F('correct_count') + (1 if quality >= 3 else 0),
+            last_studied=card.last_studied,
+            next_review=card.next_review,
+            stability=card.stability,
+            fsrs_difficulty=card.fsrs_difficulty,
+            updated_at=now
+        )
+        build_review_log(
+            card, user, quality, previous_interval, previous_ease, result,
+            now, response_time_ms
+        ).save()
+        if session_id is not None:
+            record_session_reviews(user, session_id, 1, 1 if quality >= 3 else 0, now)
+        transaction.on_commit(lambda: bump_schedule_version(user.pk))
+        transaction.on_commit(lambda: bump_cards_version(card.flashcard_set_id))
+
+    return card, result
+
+
+def review_cards(user, reviews, flashcard_set_id=None, session_id=None):
+    """
+    Apply many reviews in a single transaction.
+
+    Ownership of every card is checked with one query, the scheduling math runs in
+    memory and all modified cards are written back with one bulk_update.
+    The matching ReviewLog rows are written with one bulk_create, and the
+    study session (if any) is checked before any review is applied and
+    credited with one UPDATE.
+    Reviews of the same card are applied in the order they were given.
+
+    Args:
+        user: Owner of the flashcards
+        reviews (list): Dicts with 'card_id', 'quality' and optional
+            'reviewed_at' and 'response_time_ms'
+        flashcard_set_id (int): Restrict the reviews to this set (optional)
+        session_id (int): Open study session to count the reviews in (optional)
+
+    Returns:
+        list: One result dict per review, in request order
+
+    Raises:
+        StudySession.DoesNotExist: If the session is not an open session of the user
+    """
+    now = timezone.now()
+    card_ids = {review['card_id'] for review in reviews}
+
+    with transaction.atomic():
+        # Fail the whole batch for a bad session, even if no card matches
+        if session_id is not None:
+            get_open_session(user, session_id)
+
+        queryset = Flashcard.objects.filter(user=user, pk__in=card_ids)
+        if flashcard_set_id is not None:
+            queryset = queryset.filter(flashcard_set_id=flashcard_set_id)
+        cards = {
+            card.pk: card
+            for card in queryset.annotate(
+                scheduler=F('flashcard_set__scheduler')
+            ).select_for_update(of=('self',))
+        }
+        parameters = load_scheduler_parameters(
+            user, [card.scheduler for card in cards.values()]
+        )
+
+        results = []
+        reviewed = {}
+        logs = []
+        for review in reviews:
+            card = cards.get(review['card_id'])
+            if card is None:
+                results.append({
+                    'card_id': review['card_id'],
+                    'status': 'error',
+                    'error': 'Flashcard not found or does not belong to you.'
+                })
+                continue
+
+            # Reviews can be recorded offline, but never in the future
+            reviewed_at = min(review.get('reviewed_at') or now, now)
+            previous_interval = card.get_scheduled_interval()
+            previous_ease = card.ease_factor
+            result = card.apply_review(
+                review['quality'],
+                now=reviewed_at,
+                scheduler=card.scheduler,
+                parameters=parameters.get(card.scheduler)
+            )
+            card.updated_at = now
+            reviewed[card.pk] = card
+            logs.append(build_review_log(
+                card, user, review['quality'], previous_interval, previous_ease,
+                result, reviewed_at, review.get('response_time_ms')
+            ))
+            results.append({
+                'card_id': card.pk,
+                'status': 'success',
+                'interval': result['interval'],
+                'next_review': result['next_review'].isoformat(),
+                'ease_factor': result['ease_factor'],
+                'review_count': result['review_count'],
+                'correct_count': result['correct_count']
+            })
+
+        if reviewed:
+            Flashcard.objects.bulk_update(reviewed.values(), REVIEW_FIELDS)
+            ReviewLog.objects.bulk_create(logs)
+            set_ids = {card.flashcard_set_id for card in reviewed.values()}
+            transaction.on_commit(lambda: bump_schedule_version(user.pk))
+            transaction.on_commit(lambda: bump_cards_version(*set_ids))
+            if session_id is not None:
+                record_session_reviews(
+                    user,
+                    session_id,
+                    len(logs),
+                    sum(1 for log in logs if log.quality >= 3),
+                    now
+                )
+
+    return results
@@ -0,0 +1,577 @@
+"""
+Scheduling Engine
+Pure scheduling functions shared by the review endpoints and bulk jobs.
+
+sm2_review() schedules a single card with SM-2. sm2_review_batch() applies
+the same rules to NumPy arrays, so hundreds of thousands of cards can be
+rescheduled in one vectorized pass, and replay_reviews() rebuilds card state
+from review history with any scheduler. Both give results identical to the
+scalar path.
+
+Schedulers (SM-2, Leitner, FSRS) are registered in SCHEDULERS and share one
+batch interface; Flashcard.apply_review picks one by name. fit_fsrs_weights()
+fits per-user FSRS parameters from review history.
+"""
+
+from datetime import timezone as dt_timezone
+
+import numpy as np
+
+MIN_EASE_FACTOR = 1.3
+DEFAULT_EASE_FACTOR = 2.5
+
+# Ease factor change per quality rating (0-5)
+EASE_DELTAS = (-0.20, -0.20, -0.10, 0.0, 0.05, 0.10)
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+def sm2_review(ease_factor, review_count, last_studied, quality, now):
+    """
+    Schedule a single review with the SM-2 algorithm.
+
+    Args:
+        ease_factor (float): Ease factor before the review
+        review_count (int): Number of reviews before this one
+        last_studied (datetime): Time of the previous review (None if never)
+        quality (int): User's performance rating (0-5)
+        now (datetime): Time of this review
+
+    Returns:
+        tuple: (new ease factor, interval in days)
+    """
+    if not (0 <= quality <= 5):
+        raise ValueError("Quality must be between 0 and 5")
+
+    # Update ease factor based on quality
+    delta = EASE_DELTAS[quality]
+    if delta < 0:
+        ease_factor = max(MIN_EASE_FACTOR, ease_factor + delta)
+    elif delta > 0:
+        ease_factor += delta
+
+    # Calculate interval based on review count
+    if review_count == 0:
+        # First review: always 1 day
+        interval = 1
+    elif review_count == 1:
+        # Second review: 6 days if quality >= 3, else 1 day
+        interval = 6 if quality >= 3 else 1
+    elif quality >= 3:
+        if last_studied:
+            # Use previous interval (approximated from days since last review)
+            previous_interval = max(1, (now - last_studied).days)
+            interval = int(previous_interval * ease_factor)
+        else:
+            interval = int(6 * ease_factor)  # Fallback
+    else:
+        # Failed review: reset to 1 day
+        interval = 1
+
+    return ease_factor, interval
+
+
+def to_datetime64(values):
+    """
+    Convert aware datetimes to a UTC datetime64[us] array.
+
+    None becomes NaT, which the batch functions treat as "never studied".
+    """
+    return np.array(
+        [
+            np.datetime64(value.astimezone(dt_timezone.utc).replace(tzinfo=None), 'us')
+            if value is not None else np.datetime64('NaT')
+            for value in values
+        ],
+        dtype='datetime64[us]'
+    )
+
+
+def to_datetime(value):
+    """Convert a datetime64 value back to an aware UTC datetime (None for NaT)"""
+    if np.isnat(value):
+        return None
+    return value.astype('datetime64[us]').item().replace(tzinfo=dt_timezone.utc)
+
+
+def sm2_review_batch(ease_factor, review_count, last_studied, quality, now):
+    """
+    Schedule many reviews at once with the SM-2 algorithm.
+
+    Every argument is an array with one entry per card (now may also be a
+    single datetime64 shared by all cards). The result matches sm2_review()
+    applied to each card, including float rounding and interval truncation.
+
+    Args:
+        ease_factor (array): Ease factors before the review (float)
+        review_count (array): Number of reviews before this one (int)
+        last_studied (array): Previous review times (datetime64, NaT if never)
+        quality (array): Performance ratings 0-5 (int)
+        now (array or datetime64): Review times
+
+    Returns:
+        dict: Arrays 'ease_factor', 'interval', 'next_review', 'review_count'
+            and 'correct' (whether each review counts as correct)
+    """
+    ease_factor = np.asarray(ease_factor, dtype=np.float64)
+    review_count = np.asarray(review_count, dtype=np.int64)
+    last_studied = np.asarray(last_studied, dtype='datetime64[us]')
+    quality = np.asarray(quality, dtype=np.int64)
+    now = np.broadcast_to(np.asarray(now, dtype='datetime64[us]'), quality.shape)
+
+    if quality.size and (quality.min() < 0 or quality.max() > 5):
+        raise ValueError("Quality must be between 0 and 5")
+
+    delta = np.asarray(EASE_DELTAS)[quality]
+    new_ease = np.where(
+        delta < 0,
+        np.maximum(MIN_EASE_FACTOR, ease_factor + delta),
+        np.where(delta > 0, ease_factor + delta, ease_factor)
+    )
+
+    correct = quality >= 3
+    studied = ~np.isnat(last_studied)
+    days_since = np.zeros(quality.shape, dtype=np.int64)
+    days_since[studied] = (now[studied] - last_studied[studied]) // ONE_DAY
+    previous_interval = np.where(studied, np.maximum(1, days_since), 6)
+
+    interval = np.select(
+        [review_count == 0, review_count == 1, correct],
+        [1, np.where(correct, 6, 1), np.trunc(previous_interval * new_ease).astype(np.int64)],
+        default=1
+    )
+
+    return {
+        'ease_factor': new_ease,
+        'interval': interval,
+        'next_review': now + interval * ONE_DAY,
+        'review_count': review_count + 1,
+        'correct': correct,
+    }
+
+
+def history_steps(card_index, reviewed_at):
+    """
+    Group a review history into steps for vectorized replay.
+
+    Yields (cards, selected) once per step k: `selected` picks the k-th review
+    (in time order) of every card that has one, and `cards` holds the matching
+    card positions. Each card appears at most once per step.
+    """
+    card_index = np.asarray(card_index, dtype=np.int64)
+    reviewed_at = np.asarray(reviewed_at, dtype='datetime64[us]')
+    if card_index.size == 0:
+        return
+
+    # Sort by card, then time, and number each card's reviews 0, 1, 2, ...
+    order = np.lexsort((reviewed_at, card_index))
+    sorted_cards = card_index[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cards[1:] != sorted_cards[:-1]])
+    lengths = np.diff(np.r_[starts, sorted_cards.size])
+    rank = np.empty(card_index.size, dtype=np.int64)
+    rank[order] = np.arange(card_index.size) - np.repeat(starts, lengths)
+
+    for step in range(int(rank.max()) + 1):
+        selected = np.flatnonzero(rank == step)
+        yield card_index[selected], selected
+
+
+def replay_reviews(card_index, quality, reviewed_at, card_count,
+                   ease_factor=DEFAULT_EASE_FACTOR, review_count=0, correct_count=0,
+                   last_studied=None, next_review=None, scheduler=None, parameters=None):
+    """
+    Rebuild card state for many cards by replaying their review history.
+
+    Reviews are replayed in time order per card. Each pass applies the k-th
+    review of every card at once, so the number of passes is the length of
+    the longest history rather than the total number of reviews.
+
+    Args:
+        card_index (array): Position (0..card_count-1) of the card for each review
+        quality (array): Rating of each review (0-5)
+        reviewed_at (array): Time of each review (datetime64)
+        card_count (int): Number of cards being replayed
+        ease_factor (float or array): Starting ease factor of each card
+        review_count (int or array): Reviews of each card before its history
+        correct_count (int or array): Correct reviews before the history
+        last_studied (array): Time of the last review before the history
+            (datetime64, NaT if none); defaults to none for every card
+        next_review (array): Due time set by that review (datetime64, NaT if none)
+        scheduler (str): Name of the scheduler to replay with (defaults to SM-2)
+        parameters (sequence): Per-user scheduler parameters (optional)
+
+    Returns:
+        dict: Per-card arrays 'ease_factor', 'review_count', 'correct_count',
+            'last_studied', 'next_review', 'interval', 'stability' and
+            'difficulty' (NaN unless set by the scheduler)
+    """
+    scheduler = get_scheduler(scheduler)
+    quality = np.asarray(quality, dtype=np.int64)
+    reviewed_at = np.asarray(reviewed_at, dtype='datetime64[us]')
+
+    def times(values):
+        if values is None:
+            return np.full(card_count, np.datetime64('NaT'), dtype='datetime64[us]')
+        return np.array(values, dtype='datetime64[us]')
+
+    state = {
+        'ease_factor': np.broadcast_to(
+            np.asarray(ease_factor, dtype=np.float64), (card_count,)
+        ).copy(),
+        'review_count': np.broadcast_to(
+            np.asarray(review_count, dtype=np.int64), (card_count,)
+        ).copy(),
+        'correct_count': np.broadcast_to(
+            np.asarray(correct_count, dtype=np.int64), (card_count,)
+        ).copy(),
+        'last_studied': times(last_studied),
+        'next_review': times(next_review),
+        'interval': np.zeros(card_count, dtype=np.int64),
+        'stability': np.full(card_count, np.nan),
+        'difficulty': np.full(card_count, np.nan),
+    }
+    for cards, selected in history_steps(card_index, reviewed_at):
+        now = reviewed_at[selected]
+        result = scheduler.review_batch(
+            {field: values[cards] for field, values in state.items()},
+            quality[selected],
+            now,
+            parameters
+        )
+        state['ease_factor'][cards] = result['ease_factor']
+        state['stability'][cards] = result['stability']
+        state['difficulty'][cards] = result['difficulty']
+        state['review_count'][cards] += 1
+        state['correct_count'][cards] += quality[selected] >= 3
+        state['last_studied'][cards] = now
+        state['next_review'][cards] = now + result['interval'] * ONE_DAY
+        state['interval'][cards] = result['interval']
+
+    return state
+
+
+# Leitner boxes: a correct answer moves a card up one box, a miss sends it
+# back to the first box. The scheduled interval identifies the current box.
+LEITNER_INTERVALS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def leitner_review_batch(last_studied, next_review, quality, now):
+    """
+    Schedule many reviews at once with the Leitner box system.
+
+    Returns:
+        dict: Arrays 'interval' and 'box' (0-based box after the review)
+    """
+    last_studied = np.asarray(last_studied, dtype='datetime64[us]')
+    next_review = np.asarray(next_review, dtype='datetime64[us]')
+    quality = np.asarray(quality, dtype=np.int64)
+
+    scheduled = ~(np.isnat(last_studied) | np.isnat(next_review))
+    previous_interval = np.zeros(quality.shape, dtype=np.int64)
+    previous_interval[scheduled] = (next_review[scheduled] - last_studied[scheduled]) // ONE_DAY
+    box = np.searchsorted(LEITNER_INTERVALS, previous_interval, side='right') - 1
+
+    box = np.where(quality >= 3, np.minimum(box + 1, len(LEITNER_INTERVALS) - 1), 0)
+    return {
+        'interval': np.asarray(LEITNER_INTERVALS)[box],
+        'box': box,
+    }
+
+
+# FSRS (Free Spaced Repetition Scheduler, v4) default weights
+FSRS_DEFAULT_WEIGHTS = (
+    0.4, 0.6, 2.4, 5.8, 4.93, 0.94, 0.86, 0.01, 1.49,
+    0.14, 0.94, 2.18, 0.05, 0.34, 1.26, 0.29, 2.61,
+)
+FSRS_DESIRED_RETENTION = 0.9
+FSRS_MAX_INTERVAL = 36500
+
+# Quality 0-2 is a lapse ("again"); 3, 4 and 5 map to hard, good and easy
+QUALITY_TO_GRADE = np.array([1, 1, 1, 2, 3, 4])
+
+
+def fsrs_retrievability(elapsed_days, stability):
+    """Probability of recall after `elapsed_days` for a memory of given stability"""
+    return 1.0 / (1.0 + elapsed_days / (9.0 * stability))
+
+
+def fsrs_review_batch(stability, difficulty, elapsed_days, quality, weights=FSRS_DEFAULT_WEIGHTS):
+    """
+    Update FSRS memory state for many reviews at once.
+
+    Cards without a stability (NaN) get their initial state from the grade.
+
+    Args:
+        stability (array): Memory stability in days (NaN if no FSRS state yet)
+        difficulty (array): Memory difficulty 1-10 (NaN if no FSRS state yet)
+        elapsed_days (array): Days since the previous review
+        quality (array): Performance ratings 0-5
+        weights (sequence): The 17 FSRS weights
+
+    Returns:
+        dict: Arrays 'stability', 'difficulty', 'interval' and 'retrievability'
+            (predicted recall before the review, NaN for first reviews)
+    """
+    w = np.asarray(weights, dtype=np.float64)
+    stability = np.asarray(stability, dtype=np.float64)
+    difficulty = np.asarray(difficulty, dtype=np.float64)
+    elapsed_days = np.maximum(np.asarray(elapsed_days, dtype=np.float64), 0.0)
+    grade = QUALITY_TO_GRADE[np.asarray(quality, dtype=np.int64)]
+
+    first = np.isnan(stability)
+    s = np.where(first, 1.0, stability)
+    d = np.where(first, 5.0, difficulty)
+    r = fsrs_retrievability(elapsed_days, s)
+
+    initial_stability = w[grade - 1]
+    initial_difficulty = np.clip(w[4] - (grade - 3) * w[5], 1.0, 10.0)
+
+    # Difficulty moves with the grade and reverts towards the "good" default
+    next_difficulty = np.clip(
+        w[7] * w[4] + (1 - w[7]) * (d - w[6] * (grade - 3)), 1.0, 10.0
+    )
+    recall_stability = s * (1 + np.exp(w[8]) * (11 - d) * np.power(s, -w[9])
+                            * (np.exp(w[10] * (1 - r)) - 1)
+                            * np.where(grade == 2, w[15], 1.0)
+                            * np.where(grade == 4, w[16], 1.0))
+    lapse_stability = np.minimum(
+        w[11] * np.power(d, -w[12]) * (np.power(s + 1, w[13]) - 1) * np.exp(w[14] * (1 - r)),
+        s
+    )
+
+    new_stability = np.clip(
+        np.where(first, initial_stability, np.where(grade > 1, recall_stability, lapse_stability)),
+        0.01, FSRS_MAX_INTERVAL
+    )
+    new_difficulty = np.where(first, initial_difficulty, next_difficulty)
+    interval = np.clip(
+        np.rint(new_stability * 9 * (1 / FSRS_DESIRED_RETENTION - 1)), 1, FSRS_MAX_INTERVAL
+    ).astype(np.int64)
+
+    return {
+        'stability': new_stability,
+        'difficulty': new_difficulty,
+        'interval': interval,
+        'retrievability': np.where(first, np.nan, r),
+    }
+
+
+def fsrs_loss(weights, steps, quality, reviewed_at, card_count):
+    """
+    Log loss of FSRS recall predictions over a review history.
+
+    Every review after a card's first is a prediction of whether the card
+    will be recalled; the loss compares those predictions with the outcomes.
+
+    Args:
+        weights (sequence): The 17 FSRS weights
+        steps (list): Precomputed history_steps() for the history
+        quality (array): Rating of each review (0-5)
+        reviewed_at (array): Time of each review (datetime64)
+        card_count (int): Number of cards in the history
+
+    Returns:
+        float: Mean log loss (0.0 if there are no predictions)
+    """
+    stability = np.full(card_count, np.nan)
+    difficulty = np.full(card_count, np.nan)
+    last = np.full(card_count, np.datetime64('NaT'), dtype='datetime64[us]')
+    total, count = 0.0, 0
+
+    for cards, selected in steps:
+        elapsed = np.zeros(cards.size)
+        seen = ~np.isnat(last[cards])
+        elapsed[seen] = (reviewed_at[selected][seen] - last[cards][seen]) / ONE_DAY
+        result = fsrs_review_batch(
+            stability[cards], difficulty[cards], elapsed, quality[selected], weights
+        )
+        predicted = result['retrievability'][seen]
+        if predicted.size:
+            predicted = np.clip(predicted, 1e-6, 1 - 1e-6)
+            recalled = quality[selected][seen] >= 3
+            total -= np.sum(np.where(recalled, np.log(predicted), np.log(1 - predicted)))
+            count += predicted.size
+        stability[cards] = result['stability']
+        difficulty[cards] = result['difficulty']
+        last[cards] = reviewed_at[selected]
+
+    return total / count if count else 0.0
+
+
+def fit_fsrs_weights(card_index, quality, reviewed_at, weights=FSRS_DEFAULT_WEIGHTS,
+                     iterations=8, step=0.2):
+    """
+    Fit FSRS weights to one user's review history.
+
+    Uses a coordinate search: each weight is nudged up and down in turn and
+    the change is kept when it lowers the loss; the step shrinks every round.
+    Every loss evaluation is a vectorized replay of the whole history.
+
+    Args:
+        card_index (array): Position of the card for each review
+        quality (array): Rating of each review (0-5)
+        reviewed_at (array): Time of each review (datetime64)
+        weights (sequence): Starting weights
+        iterations (int): Number of search rounds
+        step (float): Initial relative step size
+
+    Returns:
+        tuple: (fitted weights as a list, loss)
+    """
+    card_index = np.asarray(card_index, dtype=np.int64)
+    quality = np.asarray(quality, dtype=np.int64)
+    reviewed_at = np.asarray(reviewed_at, dtype='datetime64[us]')
+    card_count = int(card_index.max()) + 1 if card_index.size else 0
+    steps = list(history_steps(card_index, reviewed_at))
+
+    best = np.array(weights, dtype=np.float64)
+    best_loss = fsrs_loss(best, steps, quality, reviewed_at, card_count)
+    for _ in range(iterations):
+        for index in range(best.size):
+            for direction in (1 + step, 1 - step):
+                candidate = best.copy()
+                candidate[index] *= direction
+                loss = fsrs_loss(candidate, steps, quality, reviewed_at, card_count)
+                if loss < best_loss:
+                    best, best_loss = candidate, loss
+        step /= 2
+
+    return best.tolist(), best_loss
+
+
+class Scheduler:
+    """
+    Base class for schedulers.
+
+    Subclasses implement review_batch(), which takes the scheduling state of
+    many cards as arrays and returns the new state. review() schedules one
+    Flashcard through the same batch code.
+    """
+    name = ''
+    label = ''
+
+    def review_batch(self, state, quality, now, parameters=None):
+        """
+        Schedule many reviews at once.
+
+        Args:
+            state (dict): Arrays 'ease_factor', 'review_count', 'last_studied',
+                'next_review', 'stability' and 'difficulty' (NaN/NaT if unset)
+            quality (array): Performance ratings 0-5
+            now (array or datetime64): Review times
+            parameters (sequence): Per-user scheduler parameters (optional)
+
+        Returns:
+            dict: Arrays 'ease_factor', 'interval', 'stability' and 'difficulty'
+        """
+        raise NotImplementedError
+
+    def review(self, card, quality, now, parameters=None):
+        """
+        Schedule one review of `card`, updating its ease and memory state.
+
+        Returns:
+            int: Interval in days until the next review
+        """
+        state = card_state([card])
+        result = self.review_batch(state, [quality], to_datetime64([now]), parameters)
+        card.ease_factor = float(result['ease_factor'][0])
+        card.stability = none_if_nan(result['stability'][0])
+        card.fsrs_difficulty = none_if_nan(result['difficulty'][0])
+        return int(result['interval'][0])
+
+
+class SM2Scheduler(Scheduler):
+    name = 'sm2'
+    label = 'SM-2'
+
+    def review_batch(self, state, quality, now, parameters=None):
+        result = sm2_review_batch(
+            state['ease_factor'], state['review_count'], state['last_studied'], quality, now
+        )
+        return {
+            'ease_factor': result['ease_factor'],
+            'interval': result['interval'],
+            'stability': state['stability'],
+            'difficulty': state['difficulty'],
+        }
+
+    def review(self, card, quality, now, parameters=None):
+        # The scalar path avoids NumPy overhead for single reviews
+        card.ease_factor, interval = sm2_review(
+            card.ease_factor, card.review_count, card.last_studied, quality, now
+        )
+        return interval
+
+
+class LeitnerScheduler(Scheduler):
+    name = 'leitner'
+    label = 'Leitner'
+
+    def review_batch(self, state, quality, now, parameters=None):
+        result = leitner_review_batch(state['last_studied'], state['next_review'], quality, now)
+        return {
+            'ease_factor': state['ease_factor'],
+            'interval': result['interval'],
+            'stability': state['stability'],
+            'difficulty': state['difficulty'],
+        }
+
+
+class FSRSScheduler(Scheduler):
+    name = 'fsrs'
+    label = 'FSRS'
+
+    def review_batch(self, state, quality, now, parameters=None):
+        now = np.broadcast_to(np.asarray(now, dtype='datetime64[us]'), np.shape(quality))
+        last_studied = np.asarray(state['last_studied'], dtype='datetime64[us]')
+        elapsed = np.zeros(np.shape(quality))
+        seen = ~np.isnat(last_studied)
+        elapsed[seen] = (now[seen] - last_studied[seen]) / ONE_DAY
+        result = fsrs_review_batch(
+            state['stability'], state['difficulty'], elapsed, quality,
+            parameters or FSRS_DEFAULT_WEIGHTS
+        )
+        return {
+            'ease_factor': state['ease_factor'],
+            'interval': result['interval'],
+            'stability': result['stability'],
+            'difficulty': result['difficulty'],
+        }
+
+
+SCHEDULERS = {
+    scheduler.name: scheduler
+    for scheduler in (SM2Scheduler(), LeitnerScheduler(), FSRSScheduler())
+}
+DEFAULT_SCHEDULER = SM2Scheduler.name
+SCHEDULER_CHOICES = [(name, scheduler.label) for name, scheduler in SCHEDULERS.items()]
+
+
+def get_scheduler(name=None):
+    """Look up a scheduler by name (defaults to SM-2)"""
+    try:
+        return SCHEDULERS[name or DEFAULT_SCHEDULER]
+    except KeyError:
+        raise ValueError(f"Unknown scheduler: {name}")
+
+
+def none_if_nan(value):
+    """Convert a NumPy float to a Python float, mapping NaN to None"""
+    return None if np.isnan(value) else float(value)
+
+
+def card_state(cards):
+    """Build the scheduler state arrays for a list of Flashcard instances"""
+    return {
+        'ease_factor': np.array([card.ease_factor for card in cards], dtype=np.float64),
+        'review_count': np.array([card.review_count for card in cards], dtype=np.int64),
+        'last_studied': to_datetime64(card.last_studied for card in cards),
+        'next_review': to_datetime64(card.next_review for card in cards),
+        'stability': np.array(
+            [np.nan if card.stability is None else card.stability for card in cards]
+        ),
+        'difficulty': np.array(
+            [np.nan if card.fsrs_difficulty is None else card.fsrs_difficulty for card in cards]
+        ),
+    }
@@ -1,13 +1,14 @@
 """
 Flashcard Serializers
-FlashcardSetSerializer, FlashcardSerializer, StudySessionSerializer
+FlashcardSetSerializer, FlashcardSerializer, StudyQueueCardSerializer,
+FlashcardReviewBatchSerializer, ReviewLogSerializer, StudySessionSerializer
 
 Created by: Backend Agent
 Date: 2025-01-27
 """
 
 from rest_framework import serializers
-from .models import FlashcardSet, Flashcard, StudySession
+from .models import FlashcardSet, Flashcard, ReviewLog, StudySession
 from notes.models import Category
 
 
@@ -22,14 +23,22 @@ class FlashcardSetSerializer(serializers.ModelSerializer):
         required=False
     )
     card_count = serializers.IntegerField(read_only=True)
+    due_count = serializers.IntegerField(read_only=True)
+    new_count = serializers.IntegerField(read_only=True)
+    mastered_count = serializers.IntegerField(read_only=True)
+    average_ease = serializers.FloatField(read_only=True)
 
     class Meta:
         model = FlashcardSet
         fields = [
-            'id', 'name', 'description', 'category', 'category_id',
-            'card_count', 'created_at', 'updated_at'
+            'id', 'name', 'description', 'category', 'category_id', 'scheduler',
+            'card_count', 'due_count', 'new_count', 'mastered_count',
+            'average_ease', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'card_count', 'due_count',
+            'new_count', 'mastered_count', 'average_ease'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'card_count']
 
     def get_category(self, obj):
         """Return category data if exists"""
@@ -58,11 +67,13 @@ class FlashcardSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'front', 'back', 'difficulty',
             'ease_factor', 'review_count', 'correct_count',
-            'last_studied', 'next_review', 'created_at', 'updated_at'
+            'last_studied', 'next_review', 'stability', 'fsrs_difficulty',
+            'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'ease_factor', 'review_count', 'correct_count',
-            'last_studied', 'next_review', 'created_at', 'updated_at'
+            'last_studied', 'next_review', 'stability', 'fsrs_difficulty',
+            'created_at', 'updated_at'
         ]
 
     def validate_front(self, value):
@@ -78,6 +89,46 @@ class FlashcardSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
+class StudyQueueCardSerializer(FlashcardSerializer):
+    """Serializer for flashcards in the cross-set study queue"""
+
+    class Meta(FlashcardSerializer.Meta):
+        fields = ['flashcard_set'] + FlashcardSerializer.Meta.fields
+        read_only_fields = fields
+
+
+class FlashcardReviewItemSerializer(serializers.Serializer):
+    """Serializer for a single review within a batch review request"""
+    card_id = serializers.IntegerField()
+    quality = serializers.IntegerField(min_value=0, max_value=5)
+    reviewed_at = serializers.DateTimeField(required=False)
+    response_time_ms = serializers.IntegerField(min_value=0, required=False)
+
+
+class FlashcardReviewBatchSerializer(serializers.Serializer):
+    """Serializer for batch review requests"""
+    MAX_REVIEWS = 500
+
+    reviews = FlashcardReviewItemSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=MAX_REVIEWS
+    )
+    session_id = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ReviewLogSerializer(serializers.ModelSerializer):
+    """Serializer for ReviewLog model"""
+
+    class Meta:
+        model = ReviewLog
+        fields = [
+            'id', 'card', 'quality', 'previous_interval', 'new_interval',
+            'previous_ease', 'new_ease', 'reviewed_at', 'response_time_ms'
+        ]
+        read_only_fields = fields
+
+
 class StudySessionSerializer(serializers.ModelSerializer):
     """Serializer for StudySession model"""
     flashcard_set = serializers.SerializerMethodField()
@@ -98,8 +149,10 @@ class StudySessionSerializer(serializers.ModelSerializer):
             'started_at', 'ended_at', 'cards_studied', 'cards_correct',
             'duration', 'accuracy'
         ]
+        # The counters are maintained by the review endpoints (see reviews.py)
         read_only_fields = [
-            'id', 'user', 'started_at', 'ended_at', 'duration', 'accuracy'
+            'id', 'user', 'started_at', 'ended_at', 'cards_studied',
+            'cards_correct', 'duration', 'accuracy'
         ]
 
     def get_flashcard_set(self, obj):
@@ -119,12 +172,3 @@ class StudySessionSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate_cards_correct(self, value):
-        """Ensure cards_correct <= cards_studied"""
-        cards_studied = self.initial_data.get('cards_studied', 0)
-        if value > cards_studied:
-            raise serializers.ValidationError(
-                "Cards correct cannot exceed cards studied."
-            )
-        return value
-
@@ -0,0 +1,77 @@
+"""
+Flashcard Signals
+Invalidate cached schedule-derived data and card lists when cards are added,
+changed or removed, invalidate cached study statistics when sessions are
+written or deleted, and keep the daily study rollup correct when sessions are
+deleted.
+
+Reviews and bulk imports write without sending signals, so they bump the
+schedule and cards versions themselves. Card deletes are not hooked here:
+a post_delete receiver on Flashcard would make every set or user delete load
+and signal each card. Flashcard.delete() covers single cards, and deleting a
+set invalidates for all of its cards at once.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .cache import bump_schedule_version, invalidate_cards, invalidate_stats
+from .models import Flashcard, FlashcardSet, StudySession
+from .stats import rebuild_daily_rollups
+
+
+@receiver(post_save, sender=Flashcard)
+def flashcard_changed(sender, instance, **kwargs):
+    """Bump the owner's schedule version once committed, and the set's cards version"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_schedule_version(user_id))
+    invalidate_cards(instance.flashcard_set_id)
+
+
+@receiver(post_save, sender=FlashcardSet)
+def flashcard_set_created(sender, instance, created, **kwargs):
+    """Make sure a new set finds no card lists cached under a reused id"""
+    if created:
+        invalidate_cards(instance.pk)
+
+
+@receiver(post_delete, sender=FlashcardSet)
+def flashcard_set_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Drop a deleted set's card lists, which are served without loading the
+    set, and the owner's schedule-derived data, which counted its cards.
+
+    Cached data goes away with its user, so cascades from a user deletion
+    are skipped.
+    """
+    if isinstance(origin, get_user_model()):
+        return
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_schedule_version(user_id))
+    invalidate_cards(instance.pk)
+
+
+@receiver(post_save, sender=StudySession)
+def study_session_saved(sender, instance, **kwargs):
+    """Invalidate the owner's cached study statistics"""
+    invalidate_stats(instance.user_id)
+
+
+@receiver(post_delete, sender=StudySession)
+def study_session_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Invalidate the owner's cached study statistics and rebuild the deleted
+    session's day in the rollup.
+
+    Deletes leave nothing behind for the watermark to find, so the day is
+    recomputed here. Rollups go away with their user, so cascades from a
+    user deletion are skipped.
+    """
+    if isinstance(origin, get_user_model()):
+        return
+    user_id = instance.user_id
+    date = timezone.localdate(instance.started_at)
+    invalidate_stats(user_id)
+    transaction.on_commit(lambda: rebuild_daily_rollups(user_id, [date]))
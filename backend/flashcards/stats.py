@@ -0,0 +1,411 @@
+"""
+Flashcard Statistics
+Aggregations over a user's cards and reviews that back the /api/stats/ endpoints.
+"""
+
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, DateTimeField, DurationField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Greatest, TruncDate, TruncDay, TruncWeek
+from django.utils import timezone
+from study_app.cache import stale_while_revalidate, two_tier
+from .cache import bump_stats_version, get_stats_version, schedule_cache_key
+from .models import DailyStudyRollup, Flashcard, RollupWatermark, StudySession
+from .scheduling import ONE_DAY, sm2_review_batch, to_datetime64
+
+# RollupWatermark name for DailyStudyRollup
+DAILY_ROLLUP = 'daily_study_rollup'
+
+MAX_FORECAST_DAYS = 365
+MAX_TIMESERIES_DAYS = 730
+
+TIMESERIES_BUCKETS = {
+    'day': (TruncDay, timedelta(days=1)),
+    'week': (TruncWeek, timedelta(weeks=1)),
+}
+
+# Summaries and timeseries are cached per stats version (bumped when sessions
+# change), recomputed after STATS_FRESH_TIMEOUT seconds, and served stale for
+# up to STATS_STALE_TIMEOUT more while one worker does it
+STATS_FRESH_TIMEOUT = 30
+STATS_STALE_TIMEOUT = 10 * 60
+
+# Quality assumed for simulated future reviews: a correct answer that keeps
+# the ease factor unchanged
+SIMULATED_QUALITY = 3
+
+
+def start_of_day(day):
+    """Return the aware datetime at the start of a local date"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def due_histogram(user, start, end):
+    """
+    Count scheduled reviews per day with one grouped query.
+
+    Overdue cards are counted on the first day, since they are due now.
+
+    Returns:
+        dict: {date: number of cards due that day}
+    """
+    rows = (
+        Flashcard.objects.filter(user=user, next_review__lt=end)
+        .annotate(
+            due_date=TruncDate(
+                Greatest('next_review', Value(start, output_field=DateTimeField()))
+            )
+        )
+        .values('due_date')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return {row['due_date']: row['count'] for row in rows}
+
+
+def simulate_rereviews(user, start, end, days):
+    """
+    Estimate how many extra reviews the cards due in the window will cause.
+
+    Every card due before `end` is assumed to be reviewed on its due date and
+    answered correctly, then rescheduled with its own ease factor by the
+    vectorized SM-2 engine. This repeats until no card comes due again inside
+    the window, so the loop runs once per generation of reviews rather than
+    once per card or per day.
+
+    Returns:
+        numpy.ndarray: Extra reviews per day, one entry per day in the window
+    """
+    rows = list(
+        Flashcard.objects.filter(user=user, next_review__lt=end)
+        .values_list('ease_factor', 'review_count', 'last_studied', 'next_review')
+    )
+    extra = np.zeros(days, dtype=np.int64)
+    if not rows:
+        return extra
+
+    ease_factor = np.array([row[0] for row in rows], dtype=np.float64)
+    review_count = np.array([row[1] for row in rows], dtype=np.int64)
+    last_studied = to_datetime64(row[2] for row in rows)
+    start64, end64 = to_datetime64([start, end])
+    # Overdue cards are reviewed at the start of the window
+    due = np.maximum(to_datetime64(row[3] for row in rows), start64)
+
+    while due.size:
+        result = sm2_review_batch(
+            ease_factor,
+            review_count,
+            last_studied,
+            np.full(due.shape, SIMULATED_QUALITY),
+            due
+        )
+        active = result['next_review'] < end64
+        day_index = (result['next_review'][active] - start64) // ONE_DAY
+        extra += np.bincount(day_index, minlength=days)[:days]
+
+        ease_factor = result['ease_factor'][active]
+        review_count = result['review_count'][active]
+        last_studied = due[active]
+        due = result['next_review'][active]
+
+    return extra
+
+
+def workload_forecast(user, days, simulate=False):
+    """
+    Build the per-day review forecast for the next `days` days.
+
+    Results are cached per user under the user's schedule version, so they
+    stay valid until a review or card change reschedules something, and
+    until the day rolls over.
+
+    Args:
+        user: Owner of the flashcards
+        days (int): Number of days to forecast, starting today
+        simulate (bool): Also estimate re-reviews of cards due in the window
+
+    Returns:
+        dict: Forecast with one entry per day
+    """
+    today = timezone.localdate()
+    key = schedule_cache_key(user.pk, 'forecast', today.isoformat(), days, int(simulate))
+    forecast = two_tier.get(key)
+    if forecast is not None:
+        return forecast
+
+    start = start_of_day(today)
+    end = start + timedelta(days=days)
+    histogram = due_histogram(user, start, end)
+    extra = simulate_rereviews(user, start, end, days) if simulate else None
+
+    entries = []
+    for offset in range(days):
+        day = today + timedelta(days=offset)
+        entry = {'date': day.isoformat(), 'due': histogram.get(day, 0)}
+        if simulate:
+            entry['projected'] = entry['due'] + int(extra[offset])
+        entries.append(entry)
+
+    forecast = {
+        'start': today.isoformat(),
+        'days': days,
+        'simulated': simulate,
+        'total_due': sum(entry['due'] for entry in entries),
+        'forecast': entries,
+    }
+    if simulate:
+        forecast['total_projected'] = sum(entry['projected'] for entry in entries)
+
+    # Never serve yesterday's buckets, even if nothing was reviewed since
+    timeout = max(1, int((start_of_day(today + timedelta(days=1)) - timezone.now()).total_seconds()))
+    two_tier.set(key, forecast, timeout)
+    return forecast
+
+
+def session_totals():
+    """Live aggregates over StudySession rows"""
+    return {
+        'sessions': Count('id'),
+        'cards_studied': Sum('cards_studied'),
+        'cards_correct': Sum('cards_correct'),
+        # Sessions that have not ended have a NULL duration, which SUM skips
+        'study_time': Sum(
+            ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField())
+        ),
+    }
+
+
+def rollup_totals():
+    """Aggregates over DailyStudyRollup rows, matching session_totals()"""
+    return {
+        'sessions': Sum('sessions'),
+        'cards_studied': Sum('cards_studied'),
+        'cards_correct': Sum('cards_correct'),
+        'minutes': Sum('minutes'),
+    }
+
+
+def empty_totals():
+    """Return zeroed running totals"""
+    return {'sessions': 0, 'cards_studied': 0, 'cards_correct': 0, 'minutes': 0.0}
+
+
+def add_totals(totals, row):
+    """Add one aggregate row (live or rolled up) into a running total"""
+    for field in ('sessions', 'cards_studied', 'cards_correct'):
+        totals[field] += row[field] or 0
+    if 'study_time' in row:
+        totals['minutes'] += row['study_time'].total_seconds() / 60.0 if row['study_time'] else 0.0
+    else:
+        totals['minutes'] += row['minutes'] or 0.0
+    return totals
+
+
+def format_totals(totals):
+    """Turn running totals into the API representation"""
+    cards_studied = totals['cards_studied']
+    cards_correct = totals['cards_correct']
+    return {
+        'sessions': totals['sessions'],
+        'cards_studied': cards_studied,
+        'cards_correct': cards_correct,
+        'accuracy': (cards_correct / cards_studied) * 100.0 if cards_studied else 0.0,
+        'study_time': totals['minutes'],
+    }
+
+
+def split_rollup(user, first_day=None):
+    """
+    Split a user's study history into rolled-up days and sessions to aggregate live.
+
+    Days before the rollup boundary are read from DailyStudyRollup; sessions
+    started on or after it are aggregated live. The boundary is the
+    watermark's day, and today at the latest, so today's sessions are always
+    live. Days before the boundary with a session changed since the
+    watermark (edited or ended after the last run) are stale in the rollup,
+    so they are aggregated live as well.
+
+    Args:
+        user: Owner of the study sessions
+        first_day (date): Only include days from this one on
+
+    Returns:
+        tuple: (DailyStudyRollup queryset, StudySession queryset); the
+            rollup queryset is empty if the rollup has never been built
+    """
+    rollups = DailyStudyRollup.objects.filter(user=user)
+    sessions = StudySession.objects.filter(user=user)
+    if first_day is not None:
+        rollups = rollups.filter(date__gte=first_day)
+        sessions = sessions.filter(started_at__gte=start_of_day(first_day))
+
+    watermark = RollupWatermark.get(DAILY_ROLLUP)
+    if watermark is None:
+        return rollups.none(), sessions
+    boundary = min(timezone.localdate(), timezone.localdate(watermark))
+    if first_day is not None and first_day >= boundary:
+        return rollups.none(), sessions
+
+    stale_days = list(
+        sessions.filter(started_at__lt=start_of_day(boundary), updated_at__gt=watermark)
+        .dates('started_at', 'day')
+    )
+    rollups = rollups.filter(date__lt=boundary).exclude(date__in=stale_days)
+    live = sessions.filter(
+        Q(started_at__gte=start_of_day(boundary)) | Q(started_at__date__in=stale_days)
+    )
+    return rollups, live
+
+
+def stats_version(user, **kwargs):
+    """Return the stats version that cached statistics of a user are keyed by"""
+    return get_stats_version(user.pk)
+
+
+@stale_while_revalidate(
+    'stats:summary:{user.pk}',
+    fresh_for=STATS_FRESH_TIMEOUT,
+    stale_for=STATS_STALE_TIMEOUT,
+    version=stats_version
+)
+def study_summary(user):
+    """
+    Summarize all of a user's study sessions.
+
+    Completed days are read from DailyStudyRollup grouped by flashcard set,
+    and the days since the last rollup (or changed since it) are aggregated
+    live from StudySession, as split by split_rollup(). Both are grouped in the database, so the cost follows the
+    number of sets, not the number of sessions. Results are cached until the
+    user's sessions change, for at most STATS_FRESH_TIMEOUT seconds, then
+    refreshed by one caller at a time.
+
+    Returns:
+        dict: Overall totals and per-set totals (most cards studied first).
+            study_time is in minutes, accuracy is a percentage.
+    """
+    rollups, live = split_rollup(user)
+    groups = list(
+        rollups.values('flashcard_set_id', 'flashcard_set__name')
+        .annotate(**rollup_totals())
+        .order_by()
+    )
+    groups += (
+        live.values('flashcard_set_id', 'flashcard_set__name')
+        .annotate(**session_totals())
+        .order_by()
+    )
+
+    overall = empty_totals()
+    per_set = {}
+    for row in groups:
+        add_totals(overall, row)
+        if row['flashcard_set_id'] is not None:
+            name, totals = per_set.setdefault(
+                row['flashcard_set_id'], (row['flashcard_set__name'], empty_totals())
+            )
+            add_totals(totals, row)
+
+    per_set = [
+        {'flashcard_set_id': set_id, 'name': name, **format_totals(totals)}
+        for set_id, (name, totals) in per_set.items()
+    ]
+    per_set.sort(key=lambda entry: (-entry['cards_studied'], entry['flashcard_set_id']))
+    return {**format_totals(overall), 'per_set': per_set}
+
+
+@stale_while_revalidate(
+    'stats:timeseries:{user.pk}:{bucket}:{days}',
+    fresh_for=STATS_FRESH_TIMEOUT,
+    stale_for=STATS_STALE_TIMEOUT,
+    version=stats_version
+)
+def study_timeseries(user, bucket, days):
+    """
+    Total a user's study sessions per day or week.
+
+    Completed days come from DailyStudyRollup and the rest is aggregated live,
+    as in study_summary(), and results are cached the same way.
+
+    Args:
+        user: Owner of the study sessions
+        bucket (str): 'day' or 'week' (weeks start on Monday)
+        days (int): Number of days of history to include, ending today
+
+    Returns:
+        list: One entry per bucket, oldest first, including empty buckets
+    """
+    trunc, step = TIMESERIES_BUCKETS[bucket]
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+    first_period = first_day - timedelta(days=first_day.weekday()) if bucket == 'week' else first_day
+
+    rollups, live = split_rollup(user, first_day)
+    rows = list(
+        rollups.annotate(period=trunc('date'))
+        .values('period')
+        .annotate(**rollup_totals())
+        .order_by()
+    )
+    rows += (
+        live.annotate(period=trunc('started_at'))
+        .values('period')
+        .annotate(**session_totals())
+        .order_by()
+    )
+
+    totals = {}
+    for row in rows:
+        period = row['period']
+        if isinstance(period, datetime):
+            period = timezone.localtime(period).date()
+        add_totals(totals.setdefault(period, empty_totals()), row)
+
+    series = []
+    period = first_period
+    while period <= today:
+        series.append({'period': period.isoformat(), **format_totals(totals.get(period, empty_totals()))})
+        period += step
+    return series
+
+
+def rebuild_daily_rollups(user_id, dates, replace_all=False):
+    """
+    Recompute a user's DailyStudyRollup rows for the given days.
+
+    The rows are replaced from a grouped aggregate over the sessions started
+    on those days, so rebuilding is idempotent and also picks up sessions
+    that moved to another set or were deleted. With replace_all, every other
+    row of the user is dropped in the same transaction. The user's stats
+    version is bumped afterwards, since the statistics read the rollup.
+    """
+    dates = sorted(set(dates))
+    rows = (
+        StudySession.objects.filter(user_id=user_id, started_at__date__in=dates)
+        .annotate(date=TruncDate('started_at'))
+        .values('date', 'flashcard_set_id')
+        .annotate(**session_totals())
+        .order_by()
+    )
+    rollups = []
+    for row in rows:
+        totals = add_totals(empty_totals(), row)
+        rollups.append(DailyStudyRollup(
+            user_id=user_id,
+            date=row['date'],
+            flashcard_set_id=row['flashcard_set_id'],
+            sessions=totals['sessions'],
+            cards_studied=totals['cards_studied'],
+            cards_correct=totals['cards_correct'],
+            minutes=totals['minutes']
+        ))
+
+    with transaction.atomic():
+        stale = DailyStudyRollup.objects.filter(user_id=user_id)
+        if not replace_all:
+            stale = stale.filter(date__in=dates)
+        stale.delete()
+        DailyStudyRollup.objects.bulk_create(rollups)
+    bump_stats_version(user_id)
+    return len(rollups)
@@ -0,0 +1,258 @@
+"""
+Test: Anki Package Import
+Purpose: Verify .apkg decks are imported into flashcard sets with their scheduling
+Coverage: Collection reading, card rendering (reversed, cloze, HTML), SM-2 mapping, import endpoint
+"""
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.anki import NoteTypes, field_text, schedule_fields
+from flashcards.cache import get_schedule_version
+from flashcards.models import FlashcardSet, Flashcard
+
+User = get_user_model()
+
+COLLECTION_CREATED = datetime(2024, 1, 1, 4, tzinfo=dt_timezone.utc)
+
+BASIC_MODEL = {
+    'type': 0,
+    'flds': [{'name': 'Front', 'ord': 0}, {'name': 'Back', 'ord': 1}],
+    'tmpls': [
+        {'ord': 0, 'qfmt': '{{Front}}', 'afmt': '{{FrontSide}}<hr id=answer>{{Back}}'},
+        {'ord': 1, 'qfmt': '{{Back}}', 'afmt': '{{FrontSide}}<hr id=answer>{{Front}}'},
+    ],
+}
+CLOZE_MODEL = {
+    'type': 1,
+    'flds': [{'name': 'Text', 'ord': 0}, {'name': 'Extra', 'ord': 1}],
+    'tmpls': [{'ord': 0, 'qfmt': '{{cloze:Text}}', 'afmt': '{{cloze:Text}}<br>{{Extra}}'}],
+}
+
+
+def build_apkg(notes, cards, decks, member='collection.anki2'):
+    """
+    Build an .apkg in memory.
+
+    notes: (id, model id, [fields]); cards: (nid, did, ord, type, due, ivl, factor, reps, lapses)
+    """
+    handle, path = tempfile.mkstemp(suffix='.anki2')
+    os.close(handle)
+    try:
+        connection = sqlite3.connect(path)
+        connection.executescript('''
+            CREATE TABLE col (crt INTEGER, decks TEXT, models TEXT);
+            CREATE TABLE notes (id INTEGER PRIMARY KEY, mid INTEGER, flds TEXT);
+            CREATE TABLE cards (
+                id INTEGER PRIMARY KEY, nid INTEGER, did INTEGER, ord INTEGER, type INTEGER,
+                due INTEGER, ivl INTEGER, factor INTEGER, reps INTEGER, lapses INTEGER
+            );
+        ''')
+        connection.execute(
+            'INSERT INTO col VALUES (?, ?, ?)',
+            (
+                int(COLLECTION_CREATED.timestamp()),
+                json.dumps({str(did): {'name': name} for did, name in decks.items()}),
+                json.dumps({'1': BASIC_MODEL, '2': CLOZE_MODEL}),
+            )
+        )
+        connection.executemany(
+            'INSERT INTO notes VALUES (?, ?, ?)',
+            [(nid, mid, '\x1f'.join(fields)) for nid, mid, fields in notes]
+        )
+        connection.executemany(
+            'INSERT INTO cards (nid, did, ord, type, due, ivl, factor, reps, lapses) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            cards
+        )
+        connection.commit()
+        connection.close()
+
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, 'w') as archive:
+            archive.write(path, member)
+            archive.writestr('media', '{}')
+        return package.getvalue()
+    finally:
+        os.remove(path)
+
+
+class AnkiMappingTest(SimpleTestCase):
+    """Test rendering and scheduling conversion of single cards"""
+
+    def test_field_text_strips_html_and_media(self):
+        """Test HTML, entities and sound references become plain text"""
+        value = '<div>Line&nbsp;one</div><div><b>Line</b> two<br>three</div>[sound:a.mp3]'
+
+        self.assertEqual(field_text(value), 'Line one\nLine two\nthree')
+
+    def test_reversed_template(self):
+        """Test a reverse template swaps the sides"""
+        note_types = NoteTypes({'1': BASIC_MODEL})
+
+        self.assertEqual(note_types.render(1, 0, ['hola', 'hello']), ('hola', 'hello'))
+        self.assertEqual(note_types.render(1, 1, ['hola', 'hello']), ('hello', 'hola'))
+
+    def test_cloze(self):
+        """Test each cloze card hides only its own deletion"""
+        note_types = NoteTypes({'2': CLOZE_MODEL})
+        fields = ['{{c1::Paris}} is the capital of {{c2::France::country}}', 'Geography']
+
+        self.assertEqual(
+            note_types.render(2, 1, fields),
+            ('Paris is the capital of [country]', 'Paris is the capital of France\nGeography')
+        )
+
+    def test_review_card_schedule(self):
+        """Test a review card maps ease, due day and interval"""
+        fields = schedule_fields(2, 100, 10, 2300, 12, 2, COLLECTION_CREATED)
+
+        self.assertEqual(fields['ease_factor'], 2.3)
+        self.assertEqual(fields['review_count'], 12)
+        self.assertEqual(fields['correct_count'], 10)
+        self.assertEqual(fields['next_review'], COLLECTION_CREATED + timedelta(days=100))
+        self.assertEqual(fields['last_studied'], COLLECTION_CREATED + timedelta(days=90))
+
+    def test_learning_card_schedule(self):
+        """Test a learning card is due at its timestamp"""
+        due = int(datetime(2024, 6, 1, 12, tzinfo=dt_timezone.utc).timestamp())
+
+        fields = schedule_fields(1, due, -600, 0, 1, 0, COLLECTION_CREATED)
+
+        self.assertEqual(fields['ease_factor'], 2.5)
+        self.assertEqual(fields['next_review'], datetime(2024, 6, 1, 12, tzinfo=dt_timezone.utc))
+        self.assertEqual(fields['last_studied'], datetime(2024, 6, 1, 11, 50, tzinfo=dt_timezone.utc))
+
+    def test_new_card_stays_new(self):
+        """Test a new card has no schedule"""
+        fields = schedule_fields(0, 7, 0, 0, 0, 0, COLLECTION_CREATED)
+
+        self.assertIsNone(fields['next_review'])
+        self.assertIsNone(fields['last_studied'])
+
+    def test_low_ease_is_clamped(self):
+        """Test ease factors below the SM-2 minimum are raised to it"""
+        self.assertEqual(schedule_fields(2, 5, 1, 1100, 3, 3, COLLECTION_CREATED)['ease_factor'], 1.3)
+
+
+class AnkiImportAPITest(TestCase):
+    """Test the Anki import endpoint"""
+
+    url = '/api/flashcard-sets/import-anki/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, content, name='deck.apkg'):
+        upload = SimpleUploadedFile(name, content, content_type='application/octet-stream')
+        return self.client.post(self.url, {'file': upload}, format='multipart')
+
+    def test_import_creates_set_per_deck(self):
+        """Test cards are imported into one set per deck with their scheduling"""
+        content = build_apkg(
+            notes=[
+                (1, 1, ['hola', 'hello']),
+                (2, 2, ['{{c1::Paris}} is in France', '']),
+                (3, 1, ['<img src="a.png">', 'image only']),
+            ],
+            cards=[
+                (1, 10, 0, 2, 100, 10, 2300, 12, 2),
+                (1, 10, 1, 0, 1, 0, 0, 0, 0),
+                (2, 20, 0, 0, 2, 0, 0, 0, 0),
+                (3, 20, 0, 0, 3, 0, 0, 0, 0),
+            ],
+            decks={10: 'Spanish', 20: 'Geography::Europe'}
+        )
+        version = get_schedule_version(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.data['data']
+        self.assertEqual(data['created'], 3)
+        self.assertEqual(data['skipped'], 1)
+        self.assertEqual(
+            [(entry['name'], entry['cards']) for entry in data['sets']],
+            [('Spanish', 2), ('Geography::Europe', 1)]
+        )
+
+        spanish = FlashcardSet.objects.get(user=self.user, name='Spanish')
+        reviewed, reversed_card = spanish.flashcards.order_by('id')
+        self.assertEqual((reviewed.front, reviewed.back), ('hola', 'hello'))
+        self.assertEqual(reviewed.user_id, self.user.id)
+        self.assertEqual(reviewed.ease_factor, 2.3)
+        self.assertEqual(reviewed.next_review, COLLECTION_CREATED + timedelta(days=100))
+        self.assertEqual((reversed_card.front, reversed_card.back), ('hello', 'hola'))
+        self.assertIsNone(reversed_card.next_review)
+        self.assertEqual(
+            Flashcard.objects.get(flashcard_set__name='Geography::Europe').front,
+            '[...] is in France'
+        )
+        self.assertNotEqual(get_schedule_version(self.user.id), version)
+
+    def test_import_newer_collection_member(self):
+        """Test a collection.anki21 member is read"""
+        content = build_apkg(
+            notes=[(1, 1, ['Q', 'A'])],
+            cards=[(1, 1, 0, 0, 1, 0, 0, 0, 0)],
+            decks={1: 'Default'},
+            member='collection.anki21'
+        )
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], 1)
+
+    def test_rejects_latest_format(self):
+        """Test a zstd-compressed collection asks for a legacy export"""
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, 'w') as archive:
+            archive.writestr('collection.anki21b', b'\x28\xb5\x2f\xfd')
+
+        response = self.upload(package.getvalue())
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('older Anki versions', response.data['error'])
+
+    def test_rejects_non_zip(self):
+        """Test a file that is not a zip returns 400"""
+        response = self.upload(b'front,back\n')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_corrupt_collection(self):
+        """Test an unreadable collection returns 400 and creates nothing"""
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, 'w') as archive:
+            archive.writestr('collection.anki2', b'not a database')
+
+        response = self.upload(package.getvalue())
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(FlashcardSet.objects.exists())
+
+    def test_requires_file(self):
+        """Test a request without a file returns 400"""
+        response = self.client.post(self.url, {}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
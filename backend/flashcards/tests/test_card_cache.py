@@ -0,0 +1,150 @@
+"""
+Test: Flashcard List Cache
+Purpose: Verify cached card pages per flashcard set and their invalidation
+Coverage: Cache hits without queries, card and review invalidation, set deletes, user isolation, due-only lists
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.cache import get_cards_version, get_schedule_version
+from flashcards.imports import import_flashcards
+from flashcards.models import Flashcard, FlashcardSet
+
+User = get_user_model()
+
+
+class CachedCardListTest(TestCase):
+    """Test the cached card lists of a flashcard set"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='Q1', back='A1'
+        )
+        self.url = reverse('flashcards:flashcard-list', kwargs={'flashcard_set_pk': self.flashcard_set.id})
+
+    def fronts(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [card['front'] for card in response.data['results']]
+
+    def test_cached_page_needs_no_queries(self):
+        """Test a repeated page is served from the cache"""
+        self.fronts()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['status'], 'success')
+
+    def test_card_changes_invalidate(self):
+        """Test creating, editing and deleting cards through the API bump the version"""
+        self.fronts()
+
+        self.client.post(self.url, {'front': 'Q2', 'back': 'A2'}, format='json')
+        self.assertEqual(self.fronts(), ['Q1', 'Q2'])
+
+        detail_url = reverse(
+            'flashcards:flashcard-detail',
+            kwargs={'flashcard_set_pk': self.flashcard_set.id, 'pk': self.flashcard.id}
+        )
+        self.client.patch(detail_url, {'front': 'Edited'}, format='json')
+        self.assertEqual(self.fronts(), ['Edited', 'Q2'])
+
+        self.client.delete(detail_url)
+        self.assertEqual(self.fronts(), ['Q2'])
+
+    def test_review_invalidates(self):
+        """Test a review, which sends no signals, bumps the version on commit"""
+        self.fronts()
+        version = get_cards_version(self.flashcard_set.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id}),
+                {'quality': 5}, format='json'
+            )
+
+        self.assertGreater(get_cards_version(self.flashcard_set.id), version)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['review_count'], 1)
+
+    def test_import_invalidates(self):
+        """Test a bulk import bumps the version on commit"""
+        self.fronts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_flashcards(self.flashcard_set, [{'front': 'Q2', 'back': 'A2'}])
+
+        self.assertEqual(self.fronts(), ['Q1', 'Q2'])
+
+    def test_pages_and_ordering_are_cached_separately(self):
+        """Test each page and ordering has its own cached page"""
+        Flashcard.objects.create(flashcard_set=self.flashcard_set, front='Q2', back='A2')
+
+        self.assertEqual(self.fronts(), ['Q1', 'Q2'])
+        self.assertEqual(self.fronts(ordering='-created_at'), ['Q2', 'Q1'])
+
+    def test_other_user_gets_404(self):
+        """Test another user is not served the owner's cached page"""
+        self.fronts()
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=other_user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_set_gets_404(self):
+        """Test a deleted set's cached pages are not served"""
+        self.fronts()
+
+        self.flashcard_set.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_set_delete_invalidates_without_card_signals(self):
+        """Test deleting a set bumps its versions once, not per card"""
+        version = get_schedule_version(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flashcard_set.delete()
+
+        self.assertFalse(post_delete.has_listeners(Flashcard))
+        self.assertGreater(get_schedule_version(self.user.pk), version)
+        self.assertFalse(Flashcard.objects.filter(pk=self.flashcard.pk).exists())
+
+    def test_due_only_is_not_cached(self):
+        """Test due-only lists follow cards falling due"""
+        Flashcard.objects.filter(pk=self.flashcard.pk).update(
+            next_review=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(self.fronts(due_only='true'), [])
+
+        # Falls due without the version changing
+        Flashcard.objects.filter(pk=self.flashcard.pk).update(
+            next_review=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(self.fronts(due_only='true'), ['Q1'])
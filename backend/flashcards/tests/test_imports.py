@@ -0,0 +1,190 @@
+"""
+Test: Flashcard Bulk Import
+Purpose: Verify streaming CSV/TSV/JSON/NDJSON import into a flashcard set
+Coverage: Format detection, streaming parsers, per-row validation errors, chunked inserts
+"""
+
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards import imports
+from flashcards.imports import ImportFormatError, iter_json_array, text_stream
+from flashcards.models import FlashcardSet, Flashcard
+
+User = get_user_model()
+
+
+class JSONStreamParserTest(SimpleTestCase):
+    """Test the incremental JSON array parser"""
+
+    def parse(self, document, read_size=7):
+        stream = text_stream(io.BytesIO(document.encode('utf-8')))
+        with mock.patch.object(imports, 'READ_SIZE', read_size):
+            return list(iter_json_array(stream))
+
+    def test_items_split_across_reads(self):
+        """Test items are decoded even when reads cut through them"""
+        items = [{'front': f'Question {i}', 'back': 'Ans\\wer "quoted"'} for i in range(50)]
+
+        self.assertEqual(self.parse(json.dumps(items)), items)
+        self.assertEqual(self.parse(json.dumps(items, indent=2), read_size=3), items)
+
+    def test_empty_array(self):
+        """Test an empty array yields nothing"""
+        self.assertEqual(self.parse('  [ ]  '), [])
+
+    def test_rejects_non_array(self):
+        """Test a top-level object is rejected"""
+        with self.assertRaises(ImportFormatError):
+            self.parse('{"front": "Q", "back": "A"}')
+
+    def test_rejects_truncated_input(self):
+        """Test a document cut short is rejected"""
+        with self.assertRaises(ImportFormatError):
+            self.parse('[{"front": "Q", "back": "A"}, {"front": "Q2"')
+
+
+class FlashcardImportAPITest(TestCase):
+    """Test the flashcard set import endpoint"""
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.url = f'/api/flashcard-sets/{self.flashcard_set.id}/import/'
+        self.client.force_authenticate(user=self.user)
+
+    def post_body(self, body, content_type, **params):
+        url = self.url
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.generic('POST', url, body.encode('utf-8'), content_type=content_type)
+
+    def test_import_csv_with_header(self):
+        """Test a CSV body with a header row imports every row"""
+        body = 'front,back,difficulty\n"What is 2+2?",4,easy\n"Multi\nline",answer,hard\n'
+
+        response = self.post_body(body, 'text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['created'], 2)
+        cards = list(self.flashcard_set.flashcards.order_by('id'))
+        self.assertEqual(cards[0].front, 'What is 2+2?')
+        self.assertEqual(cards[0].difficulty, 'easy')
+        self.assertEqual(cards[1].front, 'Multi\nline')
+        self.assertEqual(cards[1].user_id, self.user.id)
+        self.assertEqual(cards[1].ease_factor, 2.5)
+        self.assertIsNone(cards[1].next_review)
+
+    def test_import_tsv_upload_without_header(self):
+        """Test an uploaded TSV file without a header is read as front, back"""
+        upload = SimpleUploadedFile(
+            'deck.tsv',
+            '﻿hola\thello\nadiós\tgoodbye\n'.encode('utf-8'),
+            content_type='application/octet-stream'
+        )
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(self.flashcard_set.flashcards.order_by('id').values_list('front', 'back')),
+            [('hola', 'hello'), ('adiós', 'goodbye')]
+        )
+
+    def test_import_reports_row_errors(self):
+        """Test invalid rows are reported by number and valid rows still import"""
+        rows = [
+            {'front': 'Q1', 'back': 'A1'},
+            {'front': '   ', 'back': 'A2'},
+            {'front': 'Q3', 'back': 'A3', 'difficulty': 'impossible'},
+            'not an object',
+            {'front': 'Q5', 'back': 'A5'},
+        ]
+
+        response = self.post_body(json.dumps(rows), 'application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.data['data']
+        self.assertEqual(data['rows'], 5)
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(data['error_count'], 3)
+        self.assertEqual([error['row'] for error in data['errors']], [2, 3, 4])
+        self.assertIn('front', data['errors'][0]['errors'])
+
+    def test_import_ndjson(self):
+        """Test newline-delimited JSON is imported line by line"""
+        body = '{"front": "Q1", "back": "A1"}\n\n{"front": "Q2", "back": "A2"}\n'
+
+        response = self.post_body(body, 'application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.flashcard_set.flashcards.count(), 2)
+
+    def test_import_in_chunks(self):
+        """Test large imports are written in a handful of bulk inserts"""
+        body = 'front,back\n' + ''.join(f'Question {i},Answer {i}\n' for i in range(5000))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_body(body, 'text/csv')
+
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT')]
+        # Multi-row inserts (SQLite caps each at its variable limit), never one per card
+        self.assertLess(len(inserts), 100)
+        self.assertEqual(response.data['data']['created'], 5000)
+        self.assertEqual(Flashcard.objects.filter(flashcard_set=self.flashcard_set).count(), 5000)
+
+    def test_import_format_override(self):
+        """Test file_format overrides the content type"""
+        response = self.post_body('Q\tA\n', 'text/plain', file_format='tsv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_import_unknown_format(self):
+        """Test an undetectable format returns 400"""
+        response = self.post_body('Q,A\n', 'text/plain')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_malformed_json_rolls_back(self):
+        """Test a document that breaks part way imports nothing"""
+        body = '[{"front": "Q1", "back": "A1"}, {"front": '
+
+        response = self.post_body(body, 'application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.flashcard_set.flashcards.count(), 0)
+
+    def test_import_without_valid_rows(self):
+        """Test an import with only invalid rows returns 400 with the report"""
+        response = self.post_body('front,back\n,\n" ",A\n', 'text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['data']['created'], 0)
+        self.assertEqual(response.data['data']['error_count'], 1)
+
+    def test_import_into_other_users_set(self):
+        """Test importing into another user's set returns 404"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=other_user)
+
+        response = self.post_body('Q,A\n', 'text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Flashcard.objects.count(), 0)
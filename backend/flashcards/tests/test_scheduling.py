@@ -0,0 +1,380 @@
+"""
+Test: SM-2 Scheduling Engine
+Purpose: Verify the vectorized SM-2 engine matches the scalar algorithm exactly
+Coverage: sm2_review, sm2_review_batch, replay_reviews, scheduler registry,
+FSRS fitting, replay_reviews and fit_fsrs commands
+"""
+
+import random
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from flashcards.models import FlashcardSet, Flashcard, ReviewLog, SchedulerParameters
+from flashcards.reviews import review_card
+from flashcards.scheduling import (
+    FSRS_DEFAULT_WEIGHTS,
+    SCHEDULERS,
+    card_state,
+    fit_fsrs_weights,
+    fsrs_loss,
+    get_scheduler,
+    history_steps,
+    sm2_review,
+    sm2_review_batch,
+    replay_reviews,
+    to_datetime,
+    to_datetime64,
+)
+
+User = get_user_model()
+
+
+class SM2BatchTest(SimpleTestCase):
+    """Test the vectorized SM-2 engine against the scalar path"""
+
+    def setUp(self):
+        self.random = random.Random(42)
+        self.now = timezone.now()
+
+    def test_batch_matches_scalar(self):
+        """Test batch results are identical to scalar results for random cards"""
+        cards = []
+        for _ in range(2000):
+            last_studied = None
+            if self.random.random() < 0.8:
+                last_studied = self.now - timedelta(seconds=self.random.randint(0, 400 * 86400))
+            cards.append((
+                round(self.random.uniform(1.3, 3.5), 3),
+                self.random.randint(0, 6),
+                last_studied,
+                self.random.randint(0, 5),
+            ))
+
+        result = sm2_review_batch(
+            [card[0] for card in cards],
+            [card[1] for card in cards],
+            to_datetime64(card[2] for card in cards),
+            [card[3] for card in cards],
+            to_datetime64([self.now])[0]
+        )
+
+        for index, (ease, count, last_studied, quality) in enumerate(cards):
+            expected_ease, expected_interval = sm2_review(ease, count, last_studied, quality, self.now)
+            self.assertEqual(result['ease_factor'][index], expected_ease)
+            self.assertEqual(result['interval'][index], expected_interval)
+            self.assertEqual(
+                to_datetime(result['next_review'][index]),
+                self.now + timedelta(days=expected_interval)
+            )
+
+    def test_batch_rejects_invalid_quality(self):
+        """Test batch scheduling validates quality like the scalar path"""
+        with self.assertRaises(ValueError):
+            sm2_review_batch([2.5], [0], to_datetime64([None]), [6], to_datetime64([self.now])[0])
+
+    def test_replay_matches_sequential_reviews(self):
+        """Test replaying interleaved histories matches reviewing card by card"""
+        histories = {}
+        card_index, qualities, times = [], [], []
+        for card in range(50):
+            start = self.now - timedelta(days=200)
+            history = []
+            for _ in range(self.random.randint(0, 8)):
+                start += timedelta(hours=self.random.randint(1, 24 * 30))
+                history.append((self.random.randint(0, 5), start))
+            histories[card] = history
+            for quality, reviewed_at in history:
+                card_index.append(card)
+                qualities.append(quality)
+                times.append(reviewed_at)
+
+        # Shuffle to check replay orders reviews by time itself
+        order = list(range(len(card_index)))
+        self.random.shuffle(order)
+        state = replay_reviews(
+            [card_index[i] for i in order],
+            [qualities[i] for i in order],
+            to_datetime64([times[i] for i in order]),
+            len(histories)
+        )
+
+        for card, history in histories.items():
+            flashcard = Flashcard(front='Q', back='A')
+            for quality, reviewed_at in history:
+                flashcard.apply_review(quality, now=reviewed_at)
+            self.assertEqual(state['ease_factor'][card], flashcard.ease_factor)
+            self.assertEqual(state['review_count'][card], flashcard.review_count)
+            self.assertEqual(state['correct_count'][card], flashcard.correct_count)
+            self.assertEqual(to_datetime(state['last_studied'][card]), flashcard.last_studied)
+            self.assertEqual(to_datetime(state['next_review'][card]), flashcard.next_review)
+
+    def test_replay_without_history(self):
+        """Test replaying no reviews returns fresh card state"""
+        state = replay_reviews([], [], to_datetime64([]), 3)
+
+        self.assertTrue(np.all(state['ease_factor'] == 2.5))
+        self.assertTrue(np.all(state['review_count'] == 0))
+        self.assertTrue(np.all(np.isnat(state['next_review'])))
+
+
+class ReplayReviewsCommandTest(TestCase):
+    """Test the replay_reviews management command"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set,
+            front='Question',
+            back='Answer'
+        )
+
+    def test_command_rebuilds_schedule_from_logs(self):
+        """Test the command recomputes card state from review logs"""
+        now = timezone.now()
+        expected = Flashcard(front='Q', back='A')
+        for days_ago, quality in [(20, 5), (15, 4), (5, 2)]:
+            reviewed_at = now - timedelta(days=days_ago)
+            expected.apply_review(quality, now=reviewed_at)
+            ReviewLog.objects.create(
+                card=self.flashcard,
+                user=self.user,
+                quality=quality,
+                new_interval=1,
+                previous_ease=2.5,
+                new_ease=2.5,
+                reviewed_at=reviewed_at
+            )
+
+        call_command('replay_reviews', '--user', str(self.user.id), stdout=StringIO())
+
+        self.flashcard.refresh_from_db()
+        self.assertEqual(self.flashcard.review_count, 3)
+        self.assertEqual(self.flashcard.correct_count, 2)
+        self.assertAlmostEqual(self.flashcard.ease_factor, expected.ease_factor)
+        self.assertEqual(self.flashcard.next_review, expected.next_review)
+
+    def test_command_keeps_history_before_the_logs(self):
+        """Test the replay starts from the earliest log's ease and earlier review counts"""
+        now = timezone.now()
+        first_review = now - timedelta(days=10)
+        # Three reviews (two correct) happened before review logging started
+        expected = Flashcard(
+            front='Q', back='A', ease_factor=2.2, review_count=3, correct_count=2,
+            last_studied=first_review - timedelta(days=4)
+        )
+        for days_ago, quality in [(10, 4), (2, 5)]:
+            reviewed_at = now - timedelta(days=days_ago)
+            ReviewLog.objects.create(
+                card=self.flashcard,
+                user=self.user,
+                quality=quality,
+                previous_interval=4,
+                new_interval=1,
+                previous_ease=expected.ease_factor,
+                new_ease=2.5,
+                reviewed_at=reviewed_at
+            )
+            expected.apply_review(quality, now=reviewed_at)
+        Flashcard.objects.filter(pk=self.flashcard.pk).update(review_count=5, correct_count=4)
+
+        call_command('replay_reviews', stdout=StringIO())
+
+        self.flashcard.refresh_from_db()
+        self.assertEqual(self.flashcard.review_count, 5)
+        self.assertEqual(self.flashcard.correct_count, 4)
+        self.assertAlmostEqual(self.flashcard.ease_factor, expected.ease_factor)
+        self.assertEqual(self.flashcard.next_review, expected.next_review)
+
+    def test_command_replays_with_each_sets_scheduler(self):
+        """Test Leitner and FSRS sets are not rescheduled with SM-2"""
+        now = timezone.now()
+        for scheduler in ('leitner', 'fsrs'):
+            flashcard_set = FlashcardSet.objects.create(
+                name=scheduler, user=self.user, scheduler=scheduler
+            )
+            card = Flashcard.objects.create(flashcard_set=flashcard_set, front='Q', back='A')
+            expected = Flashcard(front='Q', back='A')
+            for days_ago, quality in [(30, 4), (20, 5), (3, 4)]:
+                reviewed_at = now - timedelta(days=days_ago)
+                expected.apply_review(quality, now=reviewed_at, scheduler=scheduler)
+                ReviewLog.objects.create(
+                    card=card,
+                    user=self.user,
+                    quality=quality,
+                    new_interval=1,
+                    previous_ease=2.5,
+                    new_ease=2.5,
+                    reviewed_at=reviewed_at
+                )
+
+            call_command('replay_reviews', '--set', str(flashcard_set.id), stdout=StringIO())
+
+            card.refresh_from_db()
+            self.assertEqual(card.next_review, expected.next_review)
+            self.assertEqual(card.review_count, 3)
+            if scheduler == 'fsrs':
+                self.assertAlmostEqual(card.stability, expected.stability)
+                self.assertAlmostEqual(card.fsrs_difficulty, expected.fsrs_difficulty)
+
+    def test_command_dry_run_saves_nothing(self):
+        """Test --dry-run leaves cards untouched"""
+        ReviewLog.objects.create(
+            card=self.flashcard,
+            user=self.user,
+            quality=5,
+            new_interval=1,
+            previous_ease=2.5,
+            new_ease=2.6,
+            reviewed_at=timezone.now()
+        )
+
+        call_command('replay_reviews', '--dry-run', stdout=StringIO())
+
+        self.flashcard.refresh_from_db()
+        self.assertEqual(self.flashcard.review_count, 0)
+
+
+class SchedulerRegistryTest(SimpleTestCase):
+    """Test the scheduler registry and the Leitner and FSRS schedulers"""
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def test_registry_lookup(self):
+        """Test schedulers are looked up by name with SM-2 as the default"""
+        self.assertEqual(get_scheduler().name, 'sm2')
+        self.assertEqual(get_scheduler('leitner').name, 'leitner')
+        self.assertEqual(get_scheduler('fsrs').name, 'fsrs')
+        with self.assertRaises(ValueError):
+            get_scheduler('unknown')
+
+    def test_leitner_moves_between_boxes(self):
+        """Test correct answers move up a box and misses return to the first"""
+        flashcard = Flashcard(front='Q', back='A')
+        intervals = []
+        for quality in [5, 4, 3, 1, 4]:
+            reviewed_at = flashcard.next_review or self.now
+            intervals.append(
+                flashcard.apply_review(quality, now=reviewed_at, scheduler='leitner')['interval']
+            )
+        self.assertEqual(intervals, [1, 2, 4, 1, 2])
+        self.assertEqual(flashcard.ease_factor, 2.5)
+
+    def test_fsrs_tracks_memory_state(self):
+        """Test FSRS grows stability on recall and shrinks it on a lapse"""
+        flashcard = Flashcard(front='Q', back='A')
+        flashcard.apply_review(4, now=self.now, scheduler='fsrs')
+        first_stability = flashcard.stability
+        self.assertIsNotNone(flashcard.fsrs_difficulty)
+
+        result = flashcard.apply_review(
+            4, now=flashcard.next_review, scheduler='fsrs'
+        )
+        self.assertGreater(flashcard.stability, first_stability)
+        self.assertGreaterEqual(result['interval'], 1)
+
+        stability = flashcard.stability
+        flashcard.apply_review(0, now=flashcard.next_review, scheduler='fsrs')
+        self.assertLess(flashcard.stability, stability)
+
+    def test_batch_interface_matches_single_review(self):
+        """Test review_batch gives the same schedule as reviewing one card at a time"""
+        for name in SCHEDULERS:
+            cards = [Flashcard(front='Q', back='A') for _ in range(3)]
+            for card in cards:
+                card.apply_review(4, now=self.now - timedelta(days=10), scheduler=name)
+            state = card_state(cards)
+            result = SCHEDULERS[name].review_batch(
+                state, [1, 3, 5], to_datetime64([self.now])[0]
+            )
+            for index, quality in enumerate([1, 3, 5]):
+                single = cards[index].apply_review(quality, now=self.now, scheduler=name)
+                self.assertEqual(result['interval'][index], single['interval'], name)
+
+    def test_fit_lowers_loss(self):
+        """Test fitting FSRS weights does not increase the loss"""
+        generator = random.Random(7)
+        card_index, qualities, times = [], [], []
+        for card in range(30):
+            reviewed_at = self.now - timedelta(days=300)
+            for _ in range(6):
+                reviewed_at += timedelta(days=generator.randint(1, 40))
+                card_index.append(card)
+                qualities.append(5 if generator.random() < 0.85 else 1)
+                times.append(reviewed_at)
+        times = to_datetime64(times)
+        steps = list(history_steps(card_index, times))
+
+        default_loss = fsrs_loss(FSRS_DEFAULT_WEIGHTS, steps, np.array(qualities), times, 30)
+        weights, loss = fit_fsrs_weights(card_index, qualities, times, iterations=2)
+
+        self.assertEqual(len(weights), len(FSRS_DEFAULT_WEIGHTS))
+        self.assertLessEqual(loss, default_loss)
+
+
+class SchedulerSelectionTest(TestCase):
+    """Test reviews use the scheduler selected on the flashcard set"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def create_reviewed_logs(self, flashcard, count):
+        now = timezone.now()
+        for index in range(count):
+            ReviewLog.objects.create(
+                card=flashcard,
+                user=self.user,
+                quality=4 if index % 4 else 1,
+                new_interval=1,
+                previous_ease=2.5,
+                new_ease=2.5,
+                reviewed_at=now - timedelta(days=(count - index) * 3)
+            )
+
+    def test_review_uses_set_scheduler(self):
+        """Test a review in an FSRS set stores FSRS memory state"""
+        flashcard_set = FlashcardSet.objects.create(
+            name='FSRS Set', user=self.user, scheduler='fsrs'
+        )
+        flashcard = Flashcard.objects.create(flashcard_set=flashcard_set, front='Q', back='A')
+
+        review_card(self.user, flashcard.id, 4)
+
+        flashcard.refresh_from_db()
+        self.assertIsNotNone(flashcard.stability)
+        self.assertEqual(flashcard.ease_factor, 2.5)
+
+    def test_fit_fsrs_command_stores_weights(self):
+        """Test the fit_fsrs command stores weights for users with enough history"""
+        flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        flashcard = Flashcard.objects.create(flashcard_set=flashcard_set, front='Q', back='A')
+        self.create_reviewed_logs(flashcard, 12)
+
+        call_command('fit_fsrs', '--workers', '0', '--min-reviews', '10', stdout=StringIO())
+
+        weights = SchedulerParameters.get_weights(self.user, 'fsrs')
+        self.assertEqual(len(weights), len(FSRS_DEFAULT_WEIGHTS))
+
+    def test_fit_fsrs_command_skips_short_histories(self):
+        """Test users below --min-reviews are not fitted"""
+        flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        flashcard = Flashcard.objects.create(flashcard_set=flashcard_set, front='Q', back='A')
+        self.create_reviewed_logs(flashcard, 3)
+
+        call_command('fit_fsrs', '--workers', '0', '--min-reviews', '10', stdout=StringIO())
+
+        self.assertIsNone(SchedulerParameters.get_weights(self.user, 'fsrs'))
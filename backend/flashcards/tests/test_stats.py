@@ -0,0 +1,612 @@
+"""
+Test: Study Statistics API
+Purpose: Verify the server-side statistics endpoints and their caching
+Coverage: Workload forecast histogram, re-review simulation, per-user cache invalidation,
+study session summary and timeseries aggregation, stale-while-revalidate caching,
+stats invalidation on session changes, daily rollup command
+"""
+
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.cache import get_stats_version
+from flashcards.models import DailyStudyRollup, FlashcardSet, Flashcard, StudySession
+from flashcards.stats import MAX_FORECAST_DAYS, start_of_day
+from study_app.cache import stale_while_revalidate
+
+User = get_user_model()
+
+
+class ForecastAPITest(TestCase):
+    """Test the workload forecast endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.today = start_of_day(timezone.localdate()) + timedelta(hours=12)
+        self.client.force_authenticate(user=self.user)
+
+    def create_card(self, due_in_days, user=None, **fields):
+        flashcard_set = self.flashcard_set
+        if user is not None:
+            flashcard_set = FlashcardSet.objects.create(name='Other', user=user)
+        next_review = None
+        if due_in_days is not None:
+            next_review = self.today + timedelta(days=due_in_days)
+        return Flashcard.objects.create(
+            flashcard_set=flashcard_set,
+            front='Question',
+            back='Answer',
+            next_review=next_review,
+            **fields
+        )
+
+    def get_forecast(self, **params):
+        response = self.client.get('/api/stats/forecast/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']
+
+    def test_forecast_buckets_cards_by_day(self):
+        """Test cards are counted on their due day and overdue cards count today"""
+        self.create_card(-3)
+        self.create_card(0)
+        self.create_card(1)
+        self.create_card(5)
+        self.create_card(40)
+        self.create_card(None)
+        self.create_card(1, user=self.other_user)
+
+        data = self.get_forecast(days=30)
+
+        self.assertEqual(data['days'], 30)
+        self.assertEqual(len(data['forecast']), 30)
+        due = [entry['due'] for entry in data['forecast']]
+        self.assertEqual(due[0], 2)
+        self.assertEqual(due[1], 1)
+        self.assertEqual(due[5], 1)
+        self.assertEqual(data['total_due'], 4)
+        self.assertNotIn('projected', data['forecast'][0])
+
+    def test_forecast_days_is_clamped(self):
+        """Test the forecast length is clamped to the supported range"""
+        self.assertEqual(self.get_forecast(days=10000)['days'], MAX_FORECAST_DAYS)
+        self.assertEqual(self.get_forecast(days=0)['days'], 1)
+        self.assertEqual(self.get_forecast(days='abc')['days'], 30)
+
+    def test_forecast_simulates_rereviews(self):
+        """Test simulation adds the reviews rescheduled inside the window"""
+        self.create_card(
+            1,
+            review_count=2,
+            ease_factor=2.5,
+            last_studied=self.today - timedelta(days=5)
+        )
+
+        data = self.get_forecast(days=30, simulate='true')
+
+        projected = [entry['projected'] for entry in data['forecast']]
+        # Reviewed tomorrow after 6 days: int(6 * 2.5) = 15 days later
+        self.assertEqual(projected[1], 1)
+        self.assertEqual(projected[16], 1)
+        self.assertEqual(data['total_due'], 1)
+        self.assertEqual(data['total_projected'], 2)
+
+    def test_forecast_is_cached_until_schedule_changes(self):
+        """Test repeated requests hit the cache and reviews invalidate it"""
+        flashcard = self.create_card(0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.get_forecast()['total_due'], 1)
+
+        with self.assertNumQueries(0):
+            self.get_forecast()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/flashcards/{flashcard.id}/review/',
+                {'quality': 5},
+                format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        data = self.get_forecast()
+        self.assertEqual(data['forecast'][0]['due'], 0)
+        self.assertEqual(data['forecast'][1]['due'], 1)
+
+    def test_forecast_cache_is_per_user(self):
+        """Test one user's cached forecast is never served to another"""
+        self.create_card(0)
+        self.get_forecast()
+
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.get_forecast()['total_due'], 0)
+
+    def test_forecast_requires_authentication(self):
+        """Test unauthenticated users cannot read the forecast"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/stats/forecast/')
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN]
+        )
+
+
+class StudySessionStatsAPITest(TestCase):
+    """Test the study session summary and timeseries endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.python_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.django_set = FlashcardSet.objects.create(name='Django Basics', user=self.user)
+        self.now = start_of_day(timezone.localdate()) + timedelta(hours=12)
+        self.client.force_authenticate(user=self.user)
+
+    def create_session(self, flashcard_set, days_ago, studied, correct, minutes=None, user=None):
+        started_at = self.now - timedelta(days=days_ago)
+        session = StudySession.objects.create(
+            user=user or self.user,
+            flashcard_set=flashcard_set,
+            cards_studied=studied,
+            cards_correct=correct
+        )
+        StudySession.objects.filter(pk=session.pk).update(
+            started_at=started_at,
+            ended_at=started_at + timedelta(minutes=minutes) if minutes is not None else None
+        )
+        return session
+
+    def test_summary_totals_all_sessions(self):
+        """Test the summary covers every session, not just the first page"""
+        for days_ago in range(120):
+            self.create_session(self.python_set, days_ago, 10, 7, minutes=5)
+        self.create_session(self.django_set, 1, 20, 20, minutes=30)
+        self.create_session(None, 2, 4, 2)
+        self.create_session(
+            FlashcardSet.objects.create(name='Other', user=self.other_user),
+            0, 50, 50, minutes=10, user=self.other_user
+        )
+
+        # Watermark lookup plus one grouped query; no rollup has been built
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/stats/summary/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(data['sessions'], 122)
+        self.assertEqual(data['cards_studied'], 1224)
+        self.assertEqual(data['cards_correct'], 862)
+        self.assertAlmostEqual(data['accuracy'], 862 / 1224 * 100)
+        self.assertAlmostEqual(data['study_time'], 630.0)
+
+        self.assertEqual(
+            [entry['name'] for entry in data['per_set']],
+            ['Python Basics', 'Django Basics']
+        )
+        python_stats = data['per_set'][0]
+        self.assertEqual(python_stats['flashcard_set_id'], self.python_set.id)
+        self.assertEqual(python_stats['sessions'], 120)
+        self.assertAlmostEqual(python_stats['accuracy'], 70.0)
+
+    def test_summary_without_sessions(self):
+        """Test the summary of a user with no sessions is all zeros"""
+        response = self.client.get('/api/stats/summary/')
+
+        data = response.data['data']
+        self.assertEqual(data['sessions'], 0)
+        self.assertEqual(data['accuracy'], 0.0)
+        self.assertEqual(data['study_time'], 0.0)
+        self.assertEqual(data['per_set'], [])
+
+    def test_timeseries_by_day(self):
+        """Test sessions are totalled per day with empty days filled in"""
+        self.create_session(self.python_set, 0, 10, 5, minutes=10)
+        self.create_session(self.django_set, 0, 10, 10, minutes=20)
+        self.create_session(self.python_set, 2, 4, 4)
+        self.create_session(self.python_set, 30, 100, 100)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/stats/timeseries/', {'days': 7})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['data']['results']
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results[-1]['period'], timezone.localdate().isoformat())
+        self.assertEqual(results[-1]['sessions'], 2)
+        self.assertEqual(results[-1]['cards_studied'], 20)
+        self.assertAlmostEqual(results[-1]['accuracy'], 75.0)
+        self.assertAlmostEqual(results[-1]['study_time'], 30.0)
+        self.assertEqual(results[-3]['cards_studied'], 4)
+        self.assertEqual(results[-2]['sessions'], 0)
+        self.assertEqual(sum(entry['sessions'] for entry in results), 3)
+
+    def test_timeseries_by_week(self):
+        """Test weekly buckets start on Monday and cover the window"""
+        self.create_session(self.python_set, 0, 10, 5)
+        self.create_session(self.python_set, 7, 6, 6)
+
+        response = self.client.get('/api/stats/timeseries/', {'bucket': 'week', 'days': 14})
+
+        results = response.data['data']['results']
+        self.assertEqual(response.data['data']['bucket'], 'week')
+        for entry in results:
+            self.assertEqual(timezone.datetime.fromisoformat(entry['period']).weekday(), 0)
+        self.assertEqual(results[-1]['cards_studied'], 10)
+        self.assertEqual(sum(entry['cards_studied'] for entry in results), 16)
+
+    def test_timeseries_rejects_unknown_bucket(self):
+        """Test an unsupported bucket returns 400"""
+        response = self.client.get('/api/stats/timeseries/', {'bucket': 'month'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StaleWhileRevalidateTest(TestCase):
+    """Test stats are cached, served stale and refreshed by one caller"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.client.force_authenticate(user=self.user)
+
+    @property
+    def key(self):
+        return f'stats:summary:{self.user.pk}:{get_stats_version(self.user.pk)}'
+
+    def create_session(self):
+        return StudySession.objects.create(
+            user=self.user, flashcard_set=self.flashcard_set, cards_studied=10, cards_correct=5
+        )
+
+    def create_session_quietly(self):
+        """Add a session without signals, so the stats version stays put"""
+        StudySession.objects.bulk_create([StudySession(
+            user=self.user, flashcard_set=self.flashcard_set, cards_studied=10, cards_correct=5
+        )])
+
+    def sessions(self):
+        return self.client.get('/api/stats/summary/').data['data']['sessions']
+
+    def expire(self):
+        """Make the cached summary stale without dropping it"""
+        fresh_until, value = cache.get(self.key)
+        cache.set(self.key, (fresh_until - 3600, value))
+
+    def test_fresh_summary_is_cached(self):
+        """Test a repeated summary runs no queries"""
+        self.assertEqual(self.sessions(), 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.sessions(), 0)
+
+    def test_session_changes_invalidate(self):
+        """Test creating, updating and deleting sessions refreshes the summary at once"""
+        self.assertEqual(self.sessions(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            session = self.create_session()
+        self.assertEqual(self.sessions(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/study-sessions/{session.pk}/end/')
+        self.sessions()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            session.delete()
+        self.assertEqual(self.sessions(), 0)
+
+    def test_reviews_invalidate(self):
+        """Test reviews counted into a session, which send no signals, refresh the summary"""
+        session = self.create_session()
+        card = Flashcard.objects.create(flashcard_set=self.flashcard_set, front='Q', back='A')
+        self.client.get('/api/stats/summary/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f'/api/flashcards/{card.pk}/review/',
+                {'quality': 5, 'session_id': session.pk}, format='json'
+            )
+
+        summary = self.client.get('/api/stats/summary/').data['data']
+        self.assertEqual(summary['cards_studied'], 11)
+
+    def test_stale_summary_is_recomputed(self):
+        """Test the first caller after the entry goes stale recomputes it"""
+        self.sessions()
+        self.create_session_quietly()
+        self.expire()
+
+        self.assertEqual(self.sessions(), 1)
+        self.assertIsNone(cache.get(f'{self.key}:lock'))
+
+    def test_stale_summary_served_while_locked(self):
+        """Test callers are served the stale summary while another one recomputes"""
+        self.sessions()
+        self.create_session_quietly()
+        self.expire()
+        cache.add(f'{self.key}:lock', True)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.sessions(), 0)
+
+    def test_timeseries_is_cached_per_window(self):
+        """Test each bucket and window is cached separately"""
+        self.create_session()
+        self.client.get('/api/stats/timeseries/', {'days': 7})
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/stats/timeseries/', {'days': 7})
+        with self.assertNumQueries(2):
+            self.client.get('/api/stats/timeseries/', {'days': 14})
+
+    def test_abandoned_lock_on_cold_cache(self):
+        """Test a caller stops waiting for a first result after the lock timeout"""
+        calls = []
+
+        @stale_while_revalidate('test:{name}', fresh_for=60, stale_for=60, lock_timeout=0.1)
+        def compute(name):
+            calls.append(name)
+            return name.upper()
+
+        cache.add('test:cold:lock', True)
+
+        self.assertEqual(compute('cold'), 'COLD')
+        self.assertEqual(calls, ['cold'])
+
+    def test_waiter_reads_the_result_of_a_released_lock(self):
+        """Test a caller that lost the race reads the holder's result instead of recomputing"""
+        calls = []
+
+        @stale_while_revalidate('test:{name}', fresh_for=60, stale_for=60)
+        def compute(name):
+            calls.append(name)
+            return name.upper()
+
+        def lose_race(key, value, timeout):
+            # The holder stores its result and releases the lock meanwhile
+            cache.set('test:raced', (float('inf'), 'RACED'))
+            return False
+
+        with mock.patch('study_app.cache.cache.add', side_effect=lose_race):
+            self.assertEqual(compute('raced'), 'RACED')
+        self.assertEqual(calls, [])
+
+    def test_no_lock_without_atomic_add(self):
+        """Test backends without an atomic add() recompute instead of waiting on a lock"""
+        calls = []
+
+        @stale_while_revalidate('test:{name}', fresh_for=60, stale_for=60, lock_timeout=10)
+        def compute(name):
+            calls.append(name)
+            return name.upper()
+
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}):
+            cache.add('test:file:lock', 'other')
+            with mock.patch('study_app.cache.time.sleep') as sleep:
+                self.assertEqual(compute('file'), 'FILE')
+
+        sleep.assert_not_called()
+        self.assertEqual(calls, ['file'])
+
+    def test_expired_lock_is_not_released_for_its_new_holder(self):
+        """Test a slow caller whose lock expired leaves the next holder's lock alone"""
+        @stale_while_revalidate('test:{name}', fresh_for=60, stale_for=60)
+        def compute(name):
+            # The lock expires and another caller takes it meanwhile
+            cache.set('test:slow:lock', 'other')
+            return name
+
+        compute('slow')
+
+        self.assertEqual(cache.get('test:slow:lock'), 'other')
+
+
+class DailyStudyRollupTest(TestCase):
+    """Test the daily rollup command and reading statistics through it"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.now = start_of_day(timezone.localdate()) + timedelta(hours=12)
+        self.client.force_authenticate(user=self.user)
+
+    def create_session(self, days_ago, studied, correct, minutes=10, flashcard_set=None):
+        started_at = self.now - timedelta(days=days_ago)
+        session = StudySession.objects.create(
+            user=self.user,
+            flashcard_set=flashcard_set or self.flashcard_set,
+            cards_studied=studied,
+            cards_correct=correct
+        )
+        # Backdate updated_at too, so the rollup sees settled sessions
+        StudySession.objects.filter(pk=session.pk).update(
+            started_at=started_at,
+            ended_at=started_at + timedelta(minutes=minutes),
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        session.refresh_from_db()
+        return session
+
+    def rollup(self, *args):
+        call_command('rollup_study_stats', *args, stdout=StringIO())
+
+    def test_rollup_groups_sessions_by_day_and_set(self):
+        """Test sessions are folded into one row per user, day and set"""
+        other_set = FlashcardSet.objects.create(name='Django Basics', user=self.user)
+        self.create_session(3, 10, 8)
+        self.create_session(3, 5, 5)
+        self.create_session(3, 4, 1, flashcard_set=other_set)
+        self.create_session(1, 6, 6)
+
+        self.rollup()
+
+        row = DailyStudyRollup.objects.get(
+            user=self.user,
+            date=timezone.localdate() - timedelta(days=3),
+            flashcard_set=self.flashcard_set
+        )
+        self.assertEqual(row.sessions, 2)
+        self.assertEqual(row.cards_studied, 15)
+        self.assertEqual(row.cards_correct, 13)
+        self.assertAlmostEqual(row.minutes, 20.0)
+        self.assertEqual(DailyStudyRollup.objects.filter(user=self.user).count(), 3)
+
+    def test_stats_combine_rollup_with_live_today(self):
+        """Test rolled-up days and today's live sessions add up to the full totals"""
+        for days_ago in range(1, 50):
+            self.create_session(days_ago, 10, 5)
+        self.rollup()
+        # Today's session is newer than the watermark and is read live
+        StudySession.objects.create(
+            user=self.user, flashcard_set=self.flashcard_set, cards_studied=4, cards_correct=4
+        )
+
+        response = self.client.get('/api/stats/summary/')
+        data = response.data['data']
+        self.assertEqual(data['sessions'], 50)
+        self.assertEqual(data['cards_studied'], 494)
+        self.assertEqual(data['cards_correct'], 249)
+        self.assertAlmostEqual(data['study_time'], 490.0)
+        self.assertEqual(data['per_set'][0]['sessions'], 50)
+
+        response = self.client.get('/api/stats/timeseries/', {'days': 3})
+        results = response.data['data']['results']
+        self.assertEqual([entry['cards_studied'] for entry in results], [10, 10, 4])
+
+    def test_rollup_is_incremental(self):
+        """Test only sessions changed since the watermark are recomputed"""
+        session = self.create_session(2, 10, 5)
+        self.create_session(5, 3, 3)
+        self.rollup()
+
+        StudySession.objects.filter(pk=session.pk).update(
+            cards_studied=20,
+            cards_correct=15,
+            updated_at=timezone.now()
+        )
+        self.rollup('--lag', '0')
+
+        day = timezone.localdate() - timedelta(days=2)
+        row = DailyStudyRollup.objects.get(user=self.user, date=day)
+        self.assertEqual(row.cards_studied, 20)
+        self.assertEqual(row.cards_correct, 15)
+        self.assertEqual(DailyStudyRollup.objects.filter(user=self.user).count(), 2)
+
+    def test_session_changed_after_rollup_is_read_live(self):
+        """Test a rolled-up session edited after the last run counts before the next run"""
+        session = self.create_session(2, 10, 5)
+        self.create_session(3, 1, 1)
+        self.rollup()
+
+        session.cards_studied = 20
+        session.save()
+
+        data = self.client.get('/api/stats/summary/').data['data']
+        self.assertEqual(data['cards_studied'], 21)
+        self.assertEqual(data['sessions'], 2)
+        results = self.client.get('/api/stats/timeseries/', {'days': 4}).data['data']['results']
+        self.assertEqual([entry['cards_studied'] for entry in results], [1, 20, 0, 0])
+
+    def test_deleted_session_is_removed_from_rollup(self):
+        """Test deleting a rolled-up session rebuilds its day"""
+        session = self.create_session(2, 10, 5)
+        self.create_session(2, 3, 3)
+        self.rollup()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            session.delete()
+
+        row = DailyStudyRollup.objects.get(user=self.user)
+        self.assertEqual(row.sessions, 1)
+        self.assertEqual(row.cards_studied, 3)
+
+    def test_full_rebuild(self):
+        """Test --full rebuilds every rollup from scratch"""
+        self.create_session(2, 10, 5)
+        self.rollup()
+        DailyStudyRollup.objects.update(cards_studied=999)
+
+        self.rollup('--full')
+
+        self.assertEqual(DailyStudyRollup.objects.get(user=self.user).cards_studied, 10)
+
+    def test_full_rebuild_drops_rollups_without_sessions(self):
+        """Test --full removes rows whose sessions are gone and keeps the rest"""
+        self.create_session(2, 10, 5)
+        self.rollup()
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        DailyStudyRollup.objects.create(user=other_user, date=timezone.localdate(), sessions=1)
+
+        self.rollup('--full')
+
+        self.assertFalse(DailyStudyRollup.objects.filter(user=other_user).exists())
+        self.assertEqual(DailyStudyRollup.objects.get(user=self.user).cards_studied, 10)
+
+    def test_full_rebuild_keeps_sessions_inside_the_lag(self):
+        """Test --full keeps the history of sessions updated inside the lag window"""
+        session = self.create_session(2, 10, 5)
+        self.rollup()
+        StudySession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+
+        self.rollup('--full')
+
+        self.assertEqual(DailyStudyRollup.objects.get(user=self.user).cards_studied, 10)
+
+    def test_one_row_per_user_day_and_set(self):
+        """Test the database rejects a second row for the same day and set"""
+        day = timezone.localdate()
+        DailyStudyRollup.objects.create(user=self.user, date=day, flashcard_set=self.flashcard_set)
+        DailyStudyRollup.objects.create(user=self.user, date=day)
+
+        for flashcard_set in (self.flashcard_set, None):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                DailyStudyRollup.objects.create(user=self.user, date=day, flashcard_set=flashcard_set)
@@ -11,11 +11,13 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 from notes.models import Category
-from flashcards.models import FlashcardSet, Flashcard, StudySession
+from flashcards.models import FlashcardSet, Flashcard, ReviewLog, StudySession
 
 User = get_user_model()
 
@@ -411,7 +413,7 @@ class StudySessionAPITest(TestCase):
         self.assertEqual(response.data['data']['mode'], 'spaced')
     
     def test_update_study_session(self):
-        """Test updating a study session"""
+        """Test updating a study session leaves the server-maintained counters alone"""
         self.client.force_authenticate(user=self.user)
         session = StudySession.objects.create(
             user=self.user,
@@ -421,13 +423,14 @@ class StudySessionAPITest(TestCase):
         )
         
         url = reverse('flashcards:studysession-detail', kwargs={'pk': session.id})
-        data = {'cards_studied': 10, 'cards_correct': 8}
+        data = {'mode': 'spaced', 'cards_studied': 10, 'cards_correct': 8}
         response = self.client.patch(url, data, format='json')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'success')
-        self.assertEqual(response.data['data']['cards_studied'], 10)
-        self.assertEqual(response.data['data']['cards_correct'], 8)
+        self.assertEqual(response.data['data']['mode'], 'spaced')
+        self.assertEqual(response.data['data']['cards_studied'], 5)
+        self.assertEqual(response.data['data']['cards_correct'], 4)
     
     def test_end_study_session(self):
         """Test ending a study session"""
@@ -476,3 +479,589 @@ class StudySessionAPITest(TestCase):
         self.assertIn('accuracy', response.data['data'])
         self.assertEqual(response.data['data']['accuracy'], 80.0)
 
+
+
+class FlashcardBatchReviewAPITest(TestCase):
+    """Test the batch review endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(
+            name='Python Basics',
+            user=self.user
+        )
+        self.other_set = FlashcardSet.objects.create(
+            name='Other Set',
+            user=self.other_user
+        )
+        self.card1 = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set,
+            front='Question 1',
+            back='Answer 1'
+        )
+        self.card2 = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set,
+            front='Question 2',
+            back='Answer 2'
+        )
+        self.other_card = Flashcard.objects.create(
+            flashcard_set=self.other_set,
+            front='Other',
+            back='Other'
+        )
+        self.url = reverse('flashcards:flashcard-review-batch')
+    
+    def test_batch_review_updates_all_cards(self):
+        """Test batch review applies SM-2 to every card"""
+        self.client.force_authenticate(user=self.user)
+        data = {'reviews': [
+            {'card_id': self.card1.id, 'quality': 5},
+            {'card_id': self.card2.id, 'quality': 1},
+        ]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'success')
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertEqual(response.data['data'][0]['card_id'], self.card1.id)
+        self.assertEqual(response.data['data'][0]['interval'], 1)
+        self.card1.refresh_from_db()
+        self.card2.refresh_from_db()
+        self.assertEqual(self.card1.review_count, 1)
+        self.assertEqual(self.card1.correct_count, 1)
+        self.assertEqual(self.card2.review_count, 1)
+        self.assertEqual(self.card2.correct_count, 0)
+        self.assertAlmostEqual(self.card2.ease_factor, 2.3)
+    
+    def test_batch_review_matches_single_review(self):
+        """Test batch review produces the same schedule as the single review path"""
+        self.client.force_authenticate(user=self.user)
+        data = {'reviews': [
+            {'card_id': self.card1.id, 'quality': 4},
+            {'card_id': self.card1.id, 'quality': 4},
+        ]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.card2.update_review(4)
+        self.card2.update_review(4)
+        self.card1.refresh_from_db()
+        self.assertEqual(self.card1.review_count, 2)
+        self.assertEqual(response.data['data'][1]['interval'], 6)
+        self.assertAlmostEqual(self.card1.ease_factor, self.card2.ease_factor)
+    
+    def test_batch_review_reports_foreign_cards(self):
+        """Test cards owned by other users are reported and left untouched"""
+        self.client.force_authenticate(user=self.user)
+        data = {'reviews': [
+            {'card_id': self.other_card.id, 'quality': 5},
+            {'card_id': self.card1.id, 'quality': 5},
+        ]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data'][0]['status'], 'error')
+        self.assertEqual(response.data['data'][1]['status'], 'success')
+        self.other_card.refresh_from_db()
+        self.assertEqual(self.other_card.review_count, 0)
+    
+    def test_batch_review_uses_reviewed_at(self):
+        """Test reviewed_at is used as the review time"""
+        self.client.force_authenticate(user=self.user)
+        reviewed_at = timezone.now() - timedelta(days=2)
+        data = {'reviews': [
+            {'card_id': self.card1.id, 'quality': 5, 'reviewed_at': reviewed_at.isoformat()},
+        ]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.card1.refresh_from_db()
+        self.assertAlmostEqual(
+            self.card1.last_studied.timestamp(),
+            reviewed_at.timestamp(),
+            delta=1
+        )
+    
+    def test_batch_review_validates_quality(self):
+        """Test batch review rejects out-of-range quality values"""
+        self.client.force_authenticate(user=self.user)
+        data = {'reviews': [{'card_id': self.card1.id, 'quality': 6}]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.card1.refresh_from_db()
+        self.assertEqual(self.card1.review_count, 0)
+    
+    def test_batch_review_requires_authentication(self):
+        """Test batch review requires authentication"""
+        data = {'reviews': [{'card_id': self.card1.id, 'quality': 5}]}
+        response = self.client.post(self.url, data, format='json')
+        
+        self.assertIn(response.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+class FlashcardReviewQueryTest(TestCase):
+    """Test the single review path stays within its query budget"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(
+            name='Python Basics',
+            user=self.user
+        )
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set,
+            front='Question',
+            back='Answer'
+        )
+    
+    def review_queries(self, url, data):
+        """Post a review and return the SQL statements it ran (excluding savepoints)"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+    
+    def test_review_uses_one_read_and_one_update(self):
+        """Test review does a single read, a single narrow update and the log insert"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id})
+        
+        queries = self.review_queries(url, {'quality': 4})
+        
+        self.assertEqual(len(queries), 3)
+        self.assertTrue(queries[0].startswith('SELECT'))
+        self.assertTrue(queries[1].startswith('UPDATE'))
+        self.assertNotIn('"front"', queries[1])
+        self.assertNotIn('"back"', queries[1])
+        self.assertTrue(queries[2].startswith('INSERT'))
+    
+    def test_nested_review_uses_one_read_and_one_update(self):
+        """Test nested review access stays within the same budget"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse(
+            'flashcards:flashcard-review',
+            kwargs={'pk': self.flashcard.id, 'flashcard_set_pk': self.flashcard_set.id}
+        )
+        
+        queries = self.review_queries(url, {'quality': 4})
+        
+        self.assertEqual(len(queries), 3)
+    
+    def test_review_increments_counters_in_database(self):
+        """Test counters are incremented relative to the stored values"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id})
+        
+        self.client.post(url, {'quality': 5}, format='json')
+        response = self.client.post(url, {'quality': 1}, format='json')
+        
+        self.flashcard.refresh_from_db()
+        self.assertEqual(self.flashcard.review_count, 2)
+        self.assertEqual(self.flashcard.correct_count, 1)
+        self.assertEqual(response.data['data']['review_count'], 2)
+        self.assertEqual(response.data['data']['correct_count'], 1)
+    
+    def test_review_other_users_card_not_found(self):
+        """Test reviewing another user's card returns 404"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=other_user)
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id})
+        
+        response = self.client.post(url, {'quality': 5}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StudySessionReviewCounterTest(TestCase):
+    """Test reviews update study session counters on the server"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.flashcards = [
+            Flashcard.objects.create(flashcard_set=self.flashcard_set, front=f'Q{i}', back=f'A{i}')
+            for i in range(3)
+        ]
+        self.session = StudySession.objects.create(user=self.user, flashcard_set=self.flashcard_set)
+        self.client.force_authenticate(user=self.user)
+    
+    def review(self, flashcard, quality, session_id):
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': flashcard.id})
+        return self.client.post(url, {'quality': quality, 'session_id': session_id}, format='json')
+    
+    def test_review_increments_session_counters(self):
+        """Test each review is counted in the session, correct answers separately"""
+        self.review(self.flashcards[0], 5, self.session.id)
+        self.review(self.flashcards[1], 1, self.session.id)
+        self.review(self.flashcards[2], 3, self.session.id)
+        
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.cards_studied, 3)
+        self.assertEqual(self.session.cards_correct, 2)
+    
+    def test_review_with_session_adds_one_update(self):
+        """Test crediting the session costs a single extra UPDATE"""
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcards[0].id})
+        
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                url, {'quality': 4, 'session_id': self.session.id}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+        self.assertEqual(len(queries), 4)
+        self.assertTrue(queries[3].startswith('UPDATE "flashcards_studysession"'))
+    
+    def test_review_rejects_ended_session(self):
+        """Test an ended session is rejected and the review is rolled back"""
+        self.session.end_session()
+        
+        response = self.review(self.flashcards[0], 5, self.session.id)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.flashcards[0].refresh_from_db()
+        self.assertEqual(self.flashcards[0].review_count, 0)
+        self.assertFalse(ReviewLog.objects.exists())
+    
+    def test_review_rejects_other_users_session(self):
+        """Test reviews cannot be counted in another user's session"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        other_session = StudySession.objects.create(user=other_user)
+        
+        response = self.review(self.flashcards[0], 5, other_session.id)
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        other_session.refresh_from_db()
+        self.assertEqual(other_session.cards_studied, 0)
+    
+    def test_review_rejects_invalid_session_id(self):
+        """Test a non-integer session id returns 400"""
+        response = self.review(self.flashcards[0], 5, 'abc')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_batch_review_credits_session_once(self):
+        """Test a batch review credits only the reviews that were applied"""
+        url = reverse('flashcards:flashcard-review-batch')
+        data = {
+            'session_id': self.session.id,
+            'reviews': [
+                {'card_id': self.flashcards[0].id, 'quality': 5},
+                {'card_id': self.flashcards[1].id, 'quality': 2},
+                {'card_id': 999999, 'quality': 5},
+            ]
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.cards_studied, 2)
+        self.assertEqual(self.session.cards_correct, 1)
+    
+    def test_batch_review_rejects_ended_session(self):
+        """Test a batch review against an ended session applies nothing"""
+        self.session.end_session()
+        url = reverse('flashcards:flashcard-review-batch')
+        data = {
+            'session_id': self.session.id,
+            'reviews': [{'card_id': self.flashcards[0].id, 'quality': 5}]
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.flashcards[0].refresh_from_db()
+        self.assertEqual(self.flashcards[0].review_count, 0)
+    
+    def test_batch_review_rejects_bad_session_without_matching_cards(self):
+        """Test an invalid session fails the batch even when no card is applied"""
+        url = reverse('flashcards:flashcard-review-batch')
+        data = {
+            'session_id': self.session.id + 100,
+            'reviews': [{'card_id': 999999, 'quality': 5}]
+        }
+        
+        response = self.client.post(url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReviewHistoryAPITest(TestCase):
+    """Test review logging and the review history endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(
+            name='Python Basics',
+            user=self.user
+        )
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set,
+            front='Question',
+            back='Answer'
+        )
+    
+    def test_review_writes_log(self):
+        """Test a review appends a log entry with before and after state"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id})
+        
+        self.client.post(url, {'quality': 5, 'response_time_ms': 1200}, format='json')
+        self.client.post(url, {'quality': 2}, format='json')
+        
+        logs = list(ReviewLog.objects.filter(card=self.flashcard).order_by('id'))
+        self.assertEqual(len(logs), 2)
+        self.assertEqual(logs[0].user, self.user)
+        self.assertEqual(logs[0].quality, 5)
+        self.assertEqual(logs[0].previous_interval, 0)
+        self.assertEqual(logs[0].new_interval, 1)
+        self.assertAlmostEqual(logs[0].previous_ease, 2.5)
+        self.assertAlmostEqual(logs[0].new_ease, 2.6)
+        self.assertEqual(logs[0].response_time_ms, 1200)
+        self.assertEqual(logs[1].previous_interval, 1)
+        self.assertAlmostEqual(logs[1].previous_ease, 2.6)
+        self.assertIsNone(logs[1].response_time_ms)
+    
+    def test_batch_review_writes_logs(self):
+        """Test batch reviews append one log entry per review"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('flashcards:flashcard-review-batch')
+        data = {'reviews': [
+            {'card_id': self.flashcard.id, 'quality': 4, 'response_time_ms': 900},
+            {'card_id': self.flashcard.id, 'quality': 3},
+        ]}
+        
+        self.client.post(url, data, format='json')
+        
+        self.assertEqual(ReviewLog.objects.filter(card=self.flashcard).count(), 2)
+    
+    def test_history_paginates_newest_first(self):
+        """Test history is returned newest first with cursor links"""
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        for days_ago in range(5):
+            ReviewLog.objects.create(
+                card=self.flashcard,
+                user=self.user,
+                quality=4,
+                new_interval=1,
+                previous_ease=2.5,
+                new_ease=2.55,
+                reviewed_at=now - timedelta(days=days_ago)
+            )
+        
+        url = reverse('flashcards:flashcard-history', kwargs={'pk': self.flashcard.id})
+        response = self.client.get(url, {'page_size': 3})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'success')
+        self.assertEqual(len(response.data['results']), 3)
+        reviewed = [r['reviewed_at'] for r in response.data['results']]
+        self.assertEqual(reviewed, sorted(reviewed, reverse=True))
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+    
+    def test_history_other_users_card_not_found(self):
+        """Test history of another user's card returns 404"""
+        self.client.force_authenticate(user=self.other_user)
+        url = reverse('flashcards:flashcard-history', kwargs={'pk': self.flashcard.id})
+        response = self.client.get(url)
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StudyQueueAPITest(TestCase):
+    """Test the cross-set study queue endpoint"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.set_a = FlashcardSet.objects.create(name='Set A', user=self.user)
+        self.set_b = FlashcardSet.objects.create(name='Set B', user=self.user)
+        self.url = reverse('flashcards:studyqueue-list')
+        now = timezone.now()
+        self.a_overdue = Flashcard.objects.create(
+            flashcard_set=self.set_a, front='A overdue', back='Answer',
+            next_review=now - timedelta(days=5)
+        )
+        self.a_due = Flashcard.objects.create(
+            flashcard_set=self.set_a, front='A due', back='Answer',
+            next_review=now - timedelta(days=3)
+        )
+        self.b_due = Flashcard.objects.create(
+            flashcard_set=self.set_b, front='B due', back='Answer',
+            next_review=now - timedelta(days=1)
+        )
+        self.b_new = Flashcard.objects.create(
+            flashcard_set=self.set_b, front='B new', back='Answer'
+        )
+        self.b_future = Flashcard.objects.create(
+            flashcard_set=self.set_b, front='B future', back='Answer',
+            next_review=now + timedelta(days=3)
+        )
+        other_set = FlashcardSet.objects.create(name='Other', user=self.other_user)
+        Flashcard.objects.create(flashcard_set=other_set, front='Other', back='Answer')
+    
+    def test_flashcard_user_copied_from_set(self):
+        """Test flashcards record the owner of their set"""
+        self.assertEqual(self.a_due.user, self.user)
+    
+    def test_queue_spans_sets_and_interleaves(self):
+        """Test due cards from all sets come first, interleaved by set"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'success')
+        fronts = [card['front'] for card in response.data['results']]
+        self.assertEqual(fronts, ['A overdue', 'B due', 'A due', 'B new'])
+        self.assertEqual(response.data['results'][1]['flashcard_set'], self.set_b.id)
+    
+    def test_queue_respects_limit(self):
+        """Test the queue returns at most `limit` cards"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, {'limit': 2})
+        
+        fronts = [card['front'] for card in response.data['results']]
+        self.assertEqual(fronts, ['A overdue', 'A due'])
+    
+    def test_queue_uses_no_join(self):
+        """Test the queue queries do not join through flashcard sets"""
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        
+        self.assertEqual(len(context.captured_queries), 2)
+        for query in context.captured_queries:
+            self.assertNotIn('JOIN', query['sql'])
+
+
+class FlashcardSetSummaryAPITest(TestCase):
+    """Test the per-set card summary on flashcard set responses"""
+    
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        now = timezone.now()
+        Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='New', back='Answer'
+        )
+        Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='Due', back='Answer', ease_factor=2.0,
+            last_studied=now - timedelta(days=2), next_review=now - timedelta(days=1)
+        )
+        Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='Mastered', back='Answer', ease_factor=3.0,
+            last_studied=now - timedelta(days=1), next_review=now + timedelta(days=29)
+        )
+    
+    def assert_summary(self, data):
+        self.assertEqual(data['card_count'], 3)
+        self.assertEqual(data['due_count'], 1)
+        self.assertEqual(data['new_count'], 1)
+        self.assertEqual(data['mastered_count'], 1)
+        self.assertAlmostEqual(data['average_ease'], 2.5)
+    
+    def test_list_includes_summary(self):
+        """Test set list includes card summary counts"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('flashcards:flashcardset-list'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_summary(response.data['results'][0])
+    
+    def test_detail_includes_summary(self):
+        """Test set detail includes card summary counts"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('flashcards:flashcardset-detail', kwargs={'pk': self.flashcard_set.id})
+        response = self.client.get(url)
+        
+        self.assert_summary(response.data['data'])
+    
+    def test_list_query_count_independent_of_cards(self):
+        """Test listing sets does not load flashcards"""
+        for index in range(3):
+            extra_set = FlashcardSet.objects.create(name=f'Set {index}', user=self.user)
+            for card in range(5):
+                Flashcard.objects.create(flashcard_set=extra_set, front='Q', back='A')
+        self.client.force_authenticate(user=self.user)
+        
+        # The ETag version, one count query for pagination and one grouped
+        # query for the page
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('flashcards:flashcardset-list'))
+        self.assertEqual(len(response.data['results']), 4)
+    
+    def test_created_set_has_empty_summary(self):
+        """Test a newly created set reports an empty summary"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            reverse('flashcards:flashcardset-list'), {'name': 'Empty'}, format='json'
+        )
+        
+        self.assertEqual(response.data['data']['card_count'], 0)
+        self.assertIsNone(response.data['data']['average_ease'])
@@ -10,6 +10,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     FlashcardSetViewSet,
     FlashcardViewSet,
+    StatsViewSet,
+    StudyQueueViewSet,
     StudySessionViewSet
 )
 
@@ -18,6 +20,8 @@ app_name = 'flashcards'
 router = DefaultRouter()
 router.register(r'flashcard-sets', FlashcardSetViewSet, basename='flashcardset')
 router.register(r'study-sessions', StudySessionViewSet, basename='studysession')
+router.register(r'study-queue', StudyQueueViewSet, basename='studyqueue')
+router.register(r'stats', StatsViewSet, basename='stats')
 
 # Nested router for flashcards under flashcard sets
 flashcard_router = DefaultRouter()
@@ -32,5 +36,9 @@ urlpatterns = [
     path('flashcard-sets/<int:flashcard_set_pk>/', include(flashcard_router.urls)),
     # Direct flashcard review endpoint (using pk from URL)
     path('flashcards/<int:pk>/review/', FlashcardViewSet.as_view({'post': 'review'}), name='flashcard-review'),
+    # Review history endpoint (keyset paginated)
+    path('flashcards/<int:pk>/history/', FlashcardViewSet.as_view({'get': 'history'}), name='flashcard-history'),
+    # Batch review endpoint for reviewing many flashcards at once
+    path('flashcards/review-batch/', FlashcardViewSet.as_view({'post': 'review_batch'}), name='flashcard-review-batch'),
 ]
 
@@ -1,27 +1,79 @@
 """
 Flashcard API Views
-FlashcardSetViewSet, FlashcardViewSet, FlashcardReviewView, StudySessionViewSet
+FlashcardSetViewSet, FlashcardViewSet, FlashcardReviewView, StudyQueueViewSet,
+StudySessionViewSet, StatsViewSet
 
 Created by: Backend Agent
 Date: 2025-01-27
 """
 
+import hashlib
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.parsers import MultiPartParser
 from django.utils import timezone
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import FlashcardSet, Flashcard, StudySession
+from study_app.cache import two_tier
+from study_app.conditional import ConditionalGetMixin, collection_version, conditional
+from study_app.pagination import CursorPaginationMixin
+from notes.models import Category
+from .cache import CARDS_CACHE_TIMEOUT, cards_cache_key
+from .models import FlashcardSet, Flashcard, ReviewLog, StudySession
+from .anki import import_anki_package
+from .imports import ImportFormatError, detect_format, import_flashcards, iter_rows, text_stream
+from .reviews import review_card, review_cards
+from .stats import (
+    MAX_FORECAST_DAYS,
+    MAX_TIMESERIES_DAYS,
+    TIMESERIES_BUCKETS,
+    study_summary,
+    study_timeseries,
+    workload_forecast
+)
 from .serializers import (
     FlashcardSetSerializer,
     FlashcardSerializer,
+    FlashcardReviewBatchSerializer,
+    ReviewLogSerializer,
+    StudyQueueCardSerializer,
     StudySessionSerializer
 )
 
 
-class FlashcardSetViewSet(viewsets.ModelViewSet):
+class ReviewHistoryPagination(CursorPagination):
+    """Keyset pagination for review history, newest reviews first"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-reviewed_at', '-id')
+
+
+def interleave_by_set(flashcards):
+    """
+    Interleave flashcards round-robin by set, keeping each set's own order.
+    
+    The first card of every set comes before the second card of any set, so
+    a queue spanning many sets does not present one set as a block.
+    """
+    by_set = {}
+    for flashcard in flashcards:
+        by_set.setdefault(flashcard.flashcard_set_id, []).append(flashcard)
+    
+    interleaved = []
+    rounds = max((len(cards) for cards in by_set.values()), default=0)
+    for index in range(rounds):
+        for cards in by_set.values():
+            if index < len(cards):
+                interleaved.append(cards[index])
+    return interleaved
+
+
+class FlashcardSetViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for FlashcardSet model.
     Users can only access their own flashcard sets.
@@ -41,15 +93,42 @@ class FlashcardSetViewSet(viewsets.ModelViewSet):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        # Prefetch related objects for performance
-        queryset = queryset.select_related('category', 'user').prefetch_related('flashcards')
+        # Select related objects and summarize cards in the same grouped query
+        queryset = queryset.select_related('category', 'user').annotate(
+            **FlashcardSet.summary_aggregates(timezone.now())
+        )
         
         return queryset
 
+    def get_list_version(self):
+        """
+        Sets, their cards and categories change the list. Card summaries also
+        change as time passes and cards fall due, so due cards are counted too.
+        """
+        user = self.request.user
+        cards = Flashcard.objects.filter(user=user)
+        return collection_version(
+            FlashcardSet.objects.filter(user=user),
+            cards,
+            cards.filter(next_review__lte=timezone.now()),
+            Category.objects.filter(user=user)
+        )
+
+    def get_detail_version(self):
+        flashcard_set = self.get_object()
+        category = flashcard_set.category
+        return (
+            flashcard_set.pk,
+            flashcard_set.updated_at,
+            category and category.updated_at,
+            *flashcard_set.get_summary().values(),
+        )
+
     def perform_create(self, serializer):
         """Set the user when creating a flashcard set"""
         serializer.save(user=self.request.user)
 
+    @conditional('get_list_version')
     def list(self, request, *args, **kwargs):
         """Override list to return paginated response with status"""
         response = super().list(request, *args, **kwargs)
@@ -69,6 +148,7 @@ class FlashcardSetViewSet(viewsets.ModelViewSet):
             'status': 'success'
         })
 
+    @conditional('get_detail_version')
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to return response with status"""
         response = super().retrieve(request, *args, **kwargs)
@@ -98,12 +178,91 @@ class FlashcardSetViewSet(viewsets.ModelViewSet):
         super().destroy(request, *args, **kwargs)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=True, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_cards(self, request, pk=None):
+        """
+        Bulk import cards into this set from CSV, TSV, JSON or NDJSON.
+        
+        Send either a multipart upload in the 'file' field or the raw document
+        as the request body (Content-Type text/csv, text/tab-separated-values,
+        application/json or application/x-ndjson). The format is taken from
+        the file_format query param, the file name or the content type.
+        
+        The input is parsed as a stream; rows failing validation are skipped
+        and reported by row number, valid rows are imported.
+        """
+        flashcard_set = get_object_or_404(FlashcardSet, pk=pk, user=request.user)
+        
+        try:
+            if request.content_type.startswith('multipart/form-data'):
+                upload = request.data.get('file')
+                if upload is None:
+                    return Response(
+                        {'error': 'No file uploaded.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                file_format = detect_format(
+                    upload.content_type, upload.name, request.query_params.get('file_format')
+                )
+                source = upload
+            else:
+                file_format = detect_format(
+                    request.content_type, requested=request.query_params.get('file_format')
+                )
+                source = request.stream
+                if source is None:
+                    return Response(
+                        {'error': 'Request body is empty.'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            
+            result = import_flashcards(flashcard_set, iter_rows(text_stream(source), file_format))
+        except ImportFormatError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'data': result,
+            'status': 'success' if result['created'] else 'error'
+        }, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'], url_path='import-anki', parser_classes=[MultiPartParser])
+    def import_anki(self, request):
+        """
+        Import an Anki package (.apkg) uploaded in the 'file' field.
+        
+        Creates one flashcard set per Anki deck. Cards keep their Anki
+        scheduling (ease, interval and due date); media is not imported.
+        """
+        upload = request.data.get('file')
+        if upload is None:
+            return Response(
+                {'error': 'No file uploaded.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            result = import_anki_package(request.user, upload)
+        except ImportFormatError as exc:
+            return Response(
+                {'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'data': result,
+            'status': 'success' if result['created'] else 'error'
+        }, status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST)
+
 
-class FlashcardViewSet(viewsets.ModelViewSet):
+class FlashcardViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for Flashcard model.
     Flashcards are nested under FlashcardSets.
     Users can only access flashcards in their own sets.
+    Lists support keyset pagination with ?pagination=cursor.
     """
     serializer_class = FlashcardSerializer
     permission_classes = [IsAuthenticated]
@@ -111,21 +270,24 @@ class FlashcardViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at', 'next_review']
     ordering = ['created_at']
 
+    def get_flashcard_set(self):
+        """Return the flashcard set from the URL, checking it belongs to the user"""
+        if not hasattr(self, '_flashcard_set'):
+            self._flashcard_set = get_object_or_404(
+                FlashcardSet.objects.filter(user=self.request.user),
+                pk=self.kwargs.get('flashcard_set_pk')
+            )
+        return self._flashcard_set
+
+    def is_due_only(self):
+        return self.request.query_params.get('due_only', 'false').lower() == 'true'
+
     def get_queryset(self):
         """Return flashcards for the specified flashcard set, filtered by user"""
-        flashcard_set_id = self.kwargs.get('flashcard_set_pk')
-        
-        # Get the flashcard set and verify ownership
-        flashcard_set = get_object_or_404(
-            FlashcardSet.objects.filter(user=self.request.user),
-            pk=flashcard_set_id
-        )
-        
-        queryset = Flashcard.objects.filter(flashcard_set=flashcard_set)
+        queryset = Flashcard.objects.filter(flashcard_set=self.get_flashcard_set())
         
         # Filter by due_only if provided
-        due_only = self.request.query_params.get('due_only', 'false').lower() == 'true'
-        if due_only:
+        if self.is_due_only():
             now = timezone.now()
             queryset = queryset.filter(
                 next_review__lte=now
@@ -138,30 +300,57 @@ class FlashcardViewSet(viewsets.ModelViewSet):
         flashcard_set_id = self.kwargs.get('flashcard_set_pk')
         if not flashcard_set_id:
             raise serializers.ValidationError("flashcard_set_pk is required")
-        flashcard_set = get_object_or_404(
-            FlashcardSet.objects.filter(user=self.request.user),
-            pk=flashcard_set_id
-        )
-        serializer.save(flashcard_set=flashcard_set)
+        serializer.save(flashcard_set=self.get_flashcard_set(), user=self.request.user)
+
+    def get_list_cache_key(self):
+        """
+        Cache key of the requested card page, or None when it is not cached.
+
+        Pages are keyed by set, cards version, user and the request's host and
+        query parameters (page, ordering, pagination), which also decide the
+        next and previous links. Due-only lists change as time passes, so
+        they are not cached.
+        """
+        if self.is_due_only():
+            return None
+        params = sorted(self.request.query_params.lists())
+        digest = hashlib.sha256(repr((self.request.get_host(), params)).encode()).hexdigest()[:32]
+        return cards_cache_key(self.kwargs.get('flashcard_set_pk'), 'list', self.request.user.pk, digest)
 
     def list(self, request, *args, **kwargs):
-        """Override list to return paginated response with status"""
+        """
+        Override list to return paginated response with status.
+
+        Pages are cached until the set's cards change (see flashcards.cache).
+        Only the owner's key is ever filled, so a cached page is served without
+        checking ownership again.
+        """
+        key = self.get_list_cache_key()
+        data = two_tier.get(key) if key else None
+        if data is None:
+            data = self.get_list_data(request, *args, **kwargs)
+            if key:
+                two_tier.set(key, data, CARDS_CACHE_TIMEOUT)
+        return Response(data)
+
+    def get_list_data(self, request, *args, **kwargs):
+        """Build the list envelope"""
         response = super().list(request, *args, **kwargs)
         if hasattr(response, 'data') and isinstance(response.data, dict):
-            return Response({
+            return {
                 'count': response.data.get('count', len(response.data.get('results', []))),
                 'next': response.data.get('next'),
                 'previous': response.data.get('previous'),
                 'results': response.data.get('results', []),
                 'status': 'success'
-            })
-        return Response({
+            }
+        return {
             'count': len(response.data) if isinstance(response.data, list) else 0,
             'next': None,
             'previous': None,
             'results': response.data if isinstance(response.data, list) else [],
             'status': 'success'
-        })
+        }
 
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to return response with status"""
@@ -197,7 +386,8 @@ class FlashcardViewSet(viewsets.ModelViewSet):
         """
         Record a flashcard review using SM-2 algorithm.
         
-        Request body: {'quality': 0-5}
+        Request body: {'quality': 0-5, 'response_time_ms': int (optional),
+                       'session_id': int (optional)}
         Quality scale:
         - 0-1: Complete failure / Incorrect
         - 2: Incorrect with difficulty
@@ -205,30 +395,6 @@ class FlashcardViewSet(viewsets.ModelViewSet):
         - 4: Correct after hesitation
         - 5: Perfect response
         """
-        # Get flashcard - handle both nested and direct access
-        if flashcard_set_pk:
-            # Nested access
-            flashcard = get_object_or_404(
-                Flashcard.objects.filter(
-                    flashcard_set__user=request.user,
-                    flashcard_set_id=flashcard_set_pk
-                ),
-                pk=pk
-            )
-        else:
-            # Direct access (for review endpoint)
-            flashcard = get_object_or_404(
-                Flashcard.objects.filter(flashcard_set__user=request.user),
-                pk=pk
-            )
-        
-        # Verify flashcard belongs to user (already filtered above, but double-check)
-        if flashcard.flashcard_set.user != request.user:
-            return Response(
-                {'error': 'Flashcard not found or does not belong to you.'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
         quality = request.data.get('quality')
         
         # Validate quality
@@ -252,12 +418,44 @@ class FlashcardViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Update flashcard using SM-2 algorithm
+        response_time_ms = request.data.get('response_time_ms')
+        if response_time_ms is not None:
+            try:
+                response_time_ms = int(response_time_ms)
+            except (ValueError, TypeError):
+                response_time_ms = -1
+            if response_time_ms < 0:
+                return Response(
+                    {'error': 'Response time must be a non-negative integer.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        session_id = request.data.get('session_id')
+        if session_id is not None:
+            try:
+                session_id = int(session_id)
+            except (ValueError, TypeError):
+                return Response(
+                    {'error': 'Session id must be an integer.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # Update flashcard using SM-2 algorithm (one read, one narrow update);
+        # handles both nested and direct access
         try:
-            result = flashcard.update_review(quality)
-        except ValueError as e:
+            flashcard, result = review_card(
+                request.user,
+                pk,
+                quality,
+                flashcard_set_id=flashcard_set_pk,
+                response_time_ms=response_time_ms,
+                session_id=session_id
+            )
+        except Flashcard.DoesNotExist:
+            raise Http404
+        except StudySession.DoesNotExist:
             return Response(
-                {'error': str(e)},
+                {'error': 'Study session not found, already ended or does not belong to you.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
@@ -273,11 +471,120 @@ class FlashcardViewSet(viewsets.ModelViewSet):
             'status': 'success'
         })
 
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None, flashcard_set_pk=None):
+        """
+        Get the review history of a flashcard, newest first.
+        
+        Uses keyset (cursor) pagination so deep pages stay as cheap as the first.
+        """
+        flashcards = Flashcard.objects.filter(user=request.user, pk=pk)
+        if flashcard_set_pk:
+            flashcards = flashcards.filter(flashcard_set_id=flashcard_set_pk)
+        if not flashcards.exists():
+            raise Http404
+        
+        queryset = ReviewLog.objects.filter(user=request.user, card_id=pk)
+        paginator = ReviewHistoryPagination()
+        # No view is passed so the viewset's card ordering does not apply to logs
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = ReviewLogSerializer(page, many=True)
+        
+        return Response({
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': serializer.data,
+            'status': 'success'
+        })
+
+    @action(detail=False, methods=['post'], url_path='review-batch')
+    def review_batch(self, request, flashcard_set_pk=None):
+        """
+        Record many flashcard reviews in one request and one transaction.
+        
+        Request body: {'reviews': [{'card_id': int, 'quality': 0-5, 'reviewed_at': datetime}],
+                       'session_id': int (optional)}
+        reviewed_at is optional and defaults to now. Cards that are not found
+        are reported per item and do not prevent the other reviews from applying.
+        Successful reviews are counted in the study session, if one is given.
+        """
+        serializer = FlashcardReviewBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            results = review_cards(
+                request.user,
+                serializer.validated_data['reviews'],
+                flashcard_set_id=flashcard_set_pk,
+                session_id=serializer.validated_data.get('session_id')
+            )
+        except StudySession.DoesNotExist:
+            return Response(
+                {'error': 'Study session not found, already ended or does not belong to you.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'data': results,
+            'status': 'success'
+        })
+
+
+class StudyQueueViewSet(viewsets.GenericViewSet):
+    """
+    ViewSet for the cross-set study queue.
+    Returns the next cards due for review across all of the user's sets.
+    """
+    serializer_class = StudyQueueCardSerializer
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 200
+
+    def get_limit(self):
+        """Return the requested queue length, clamped to max_limit"""
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except (ValueError, TypeError):
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return up to `limit` due cards, most overdue first, interleaved by set.
+        
+        Cards that were reviewed before come first, ordered by how long they
+        have been due. New (never reviewed) cards fill any remaining slots in
+        creation order. Both lookups are index range scans on the denormalized
+        owner column and never join through FlashcardSet.
+        """
+        limit = self.get_limit()
+        now = timezone.now()
+        flashcards = Flashcard.objects.filter(user=request.user)
+        
+        due = list(
+            flashcards.filter(next_review__lte=now).order_by('next_review', 'id')[:limit]
+        )
+        new = []
+        if len(due) < limit:
+            new = list(
+                flashcards.filter(next_review__isnull=True)
+                .order_by('created_at', 'id')[:limit - len(due)]
+            )
+        
+        queue = interleave_by_set(due) + interleave_by_set(new)
+        serializer = self.get_serializer(queue, many=True)
+        return Response({
+            'count': len(queue),
+            'results': serializer.data,
+            'status': 'success'
+        })
+
 
-class StudySessionViewSet(viewsets.ModelViewSet):
+class StudySessionViewSet(CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for StudySession model.
     Users can only access their own study sessions.
+    Lists support keyset pagination with ?pagination=cursor.
     """
     serializer_class = StudySessionSerializer
     permission_classes = [IsAuthenticated]
@@ -396,3 +703,66 @@ class StudySessionViewSet(viewsets.ModelViewSet):
             'status': 'success'
         })
 
+
+
+class StatsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for server-side study statistics.
+    Every endpoint is computed with database aggregates for the current user.
+    """
+    permission_classes = [IsAuthenticated]
+    default_days = 30
+
+    def get_days(self, max_days):
+        """Return the requested number of days, clamped to max_days"""
+        try:
+            days = int(self.request.query_params.get('days', self.default_days))
+        except (ValueError, TypeError):
+            days = self.default_days
+        return max(1, min(days, max_days))
+
+    @action(detail=False, methods=['get'])
+    def forecast(self, request):
+        """
+        Return the number of reviews coming due on each of the next `days` days.
+
+        Pass `simulate=true` to also project the re-reviews those reviews
+        will schedule inside the window.
+        """
+        simulate = request.query_params.get('simulate', '').lower() in ('1', 'true', 'yes')
+        return Response({
+            'data': workload_forecast(request.user, self.get_days(MAX_FORECAST_DAYS), simulate),
+            'status': 'success'
+        })
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Return overall and per-set totals across all of the user's study sessions"""
+        return Response({
+            'data': study_summary(request.user),
+            'status': 'success'
+        })
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """
+        Return study session totals per day or week for the last `days` days.
+
+        Query params:
+            bucket: 'day' (default) or 'week'
+            days: Length of the window, ending today (default 30)
+        """
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in TIMESERIES_BUCKETS:
+            return Response(
+                {'error': f"Bucket must be one of: {', '.join(TIMESERIES_BUCKETS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'data': {
+                'bucket': bucket,
+                'results': study_timeseries(request.user, bucket, self.get_days(MAX_TIMESERIES_DAYS))
+            },
+            'status': 'success'
+        })
@@ -5,3 +5,5 @@ class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
 
+    def ready(self):
+        from . import signals  # noqa: F401
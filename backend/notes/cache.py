@@ -0,0 +1,34 @@
+"""
+Notes Cache Keys
+Per-user cached category and tag lists, invalidated by versioned keys.
+
+Each user has a version per list ('categories' and 'tags'). Cached lists are
+stored under a key embedding the current version, e.g.
+categories:user:1:<version>:name, and saving or deleting a category or tag
+bumps the version (see notes.signals). Stale entries are never read again
+and expire after LIST_CACHE_TIMEOUT. Versions and lists are read through the
+two-tier cache (see study_app.cache).
+"""
+
+from study_app.cache import two_tier
+
+LIST_VERSION_KEY = 'notes:{name}-version:{user_id}'
+
+# Cached lists expire after an hour even if nothing changes
+LIST_CACHE_TIMEOUT = 60 * 60
+
+
+def get_list_version(name, user_id):
+    """Return the current version of a user's cached list"""
+    return two_tier.get_version(LIST_VERSION_KEY.format(name=name, user_id=user_id))
+
+
+def bump_list_version(name, user_id):
+    """Invalidate a user's cached list"""
+    two_tier.bump_version(LIST_VERSION_KEY.format(name=name, user_id=user_id))
+
+
+def list_cache_key(name, user_id, *parts):
+    """Build the cache key of a user's list, invalidated when the list changes"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{name}:user:{user_id}:{get_list_version(name, user_id)}:{suffix}'
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:45
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_INSTALL = [
+    """
+    CREATE FUNCTION notes_note_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER notes_note_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON notes_note
+    FOR EACH ROW EXECUTE FUNCTION notes_note_search_vector_update()
+    """,
+    # Fires the trigger for existing rows
+    'UPDATE notes_note SET title = title',
+    'CREATE INDEX notes_note_search_vector_gin ON notes_note USING gin (search_vector)',
+]
+
+POSTGRESQL_UNINSTALL = [
+    'DROP INDEX IF EXISTS notes_note_search_vector_gin',
+    'DROP TRIGGER IF EXISTS notes_note_search_vector_trigger ON notes_note',
+    'DROP FUNCTION IF EXISTS notes_note_search_vector_update()',
+]
+
+# External-content FTS5 table over notes_note. The triggers are dropped if
+# SQLite rebuilds notes_note for a schema change, so a migration that alters
+# the table must run SQLITE_INSTALL again.
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, content, content='notes_note', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, content ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO notes_note_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+    'DROP TABLE IF EXISTS notes_note_fts',
+]
+
+
+def run_for_vendor(statements):
+    """Build a RunPython function running the statements for the current database"""
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRESQL_INSTALL, 'sqlite': SQLITE_INSTALL}),
+            run_for_vendor({'postgresql': POSTGRESQL_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}),
+        ),
+    ]
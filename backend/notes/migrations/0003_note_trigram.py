@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# GIN trigram indexes for fuzzy search (search.fuzzy); PostgreSQL only
+POSTGRESQL_INSTALL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX notes_note_title_trgm ON notes_note USING gin (title gin_trgm_ops)',
+    'CREATE INDEX notes_note_content_trgm ON notes_note USING gin (content gin_trgm_ops)',
+]
+
+POSTGRESQL_UNINSTALL = [
+    'DROP INDEX IF EXISTS notes_note_title_trgm',
+    'DROP INDEX IF EXISTS notes_note_content_trgm',
+]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_INSTALL:
+            schema_editor.execute(statement)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_UNINSTALL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
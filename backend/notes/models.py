@@ -2,7 +2,11 @@
 Notes models for the Study Notes & Flashcard App.
 Defines Note, Category, and Tag models.
 """
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Case, Value, When
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import LessThanOrEqual
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 
@@ -48,6 +52,7 @@ class Tag(models.Model):
     name = models.CharField(max_length=50)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tags')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'notes_tag'
@@ -78,6 +83,9 @@ class Note(models.Model):
     )
     tags = models.ManyToManyField(Tag, related_name='notes', blank=True)
     source_url = models.URLField(blank=True, null=True)
+    # Weighted title/content tsvector, maintained by a database trigger on
+    # PostgreSQL (see search.fulltext); unused on other databases
+    search_vector = SearchVectorField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -103,3 +111,17 @@ class Note(models.Model):
             return self.content
         return self.content[:length] + '...'
 
+    @classmethod
+    def excerpt_expression(cls, length=100):
+        """
+        Build get_excerpt() as a database expression.
+
+        Annotating a queryset with it lets list views send excerpts without
+        loading the content column.
+        """
+        return Case(
+            When(LessThanOrEqual(Length('content'), length), then='content'),
+            default=Concat(Substr('content', 1, length), Value('...')),
+            output_field=models.TextField()
+        )
+
@@ -0,0 +1,47 @@
+"""
+Note Search
+Ranked full-text search over note titles and content.
+
+On PostgreSQL, notes carry a search_vector column (title weighted above
+content) kept up to date by a trigger and indexed with GIN. On SQLite, an
+FTS5 table shadows notes_note through triggers. Both are created by
+migration 0002_note_search; matching itself lives in search.fulltext.
+
+Matching notes are annotated with search_rank (higher is better).
+"""
+
+from rest_framework import filters
+from search.fulltext import NOTE_INDEX, search_queryset
+
+
+def search_notes(queryset, text):
+    """
+    Filter a Note queryset to notes matching the search text.
+
+    Args:
+        queryset: Note queryset to filter
+        text (str): Search text as typed by the user
+
+    Returns:
+        QuerySet: Matching notes annotated with search_rank
+    """
+    return search_queryset(queryset, NOTE_INDEX, text)
+
+
+class NoteSearchFilter(filters.BaseFilterBackend):
+    """
+    Full-text search on the 'search' query param.
+
+    Results are ordered by relevance unless the request asks for an explicit
+    ordering, so this backend must come after OrderingFilter.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        queryset = search_notes(queryset, text)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by('-search_rank', '-updated_at')
+        return queryset
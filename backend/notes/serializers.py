@@ -71,7 +71,21 @@ class TagSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Serialize only the fields named in a `fields` argument.
+
+    Unknown names are ignored; without the argument every field is kept.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class NoteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Note model"""
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
@@ -174,3 +188,19 @@ class NoteSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
+
+
+class NoteSummarySerializer(NoteSerializer):
+    """
+    Read-only Note serializer for list pages: an excerpt instead of the content.
+
+    The excerpt is read from an `excerpt` annotation (see
+    Note.excerpt_expression), so the content column need not be loaded.
+    """
+    excerpt = serializers.CharField(read_only=True)
+
+    class Meta(NoteSerializer.Meta):
+        fields = [
+            'id', 'title', 'excerpt', 'category', 'tags', 'source_url', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
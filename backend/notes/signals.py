@@ -0,0 +1,38 @@
+"""
+Notes Signals
+Invalidate the cached category and tag lists when categories or tags are
+added, changed or removed.
+
+Bulk writes do not send signals, so the account restore bumps the list
+versions itself.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import bump_list_version
+from .models import Category, Tag
+
+
+def invalidate_list(name, user_id):
+    """
+    Bump a list version now, so the rest of this request sees the change, and
+    again on commit, so a list another request cached from the old rows while
+    the transaction was open is not kept.
+    """
+    bump_list_version(name, user_id)
+    transaction.on_commit(lambda: bump_list_version(name, user_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """Invalidate the owner's cached category list"""
+    invalidate_list('categories', instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    """Invalidate the owner's cached tag list"""
+    invalidate_list('tags', instance.user_id)
@@ -0,0 +1,108 @@
+"""
+Test: Category and Tag List Cache
+Purpose: Verify per-user cached category and tag lists and their invalidation
+Coverage: Cache hits without queries, signal-driven invalidation, ordering, user isolation
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from notes.cache import get_list_version
+from notes.models import Category, Tag
+
+User = get_user_model()
+
+
+class CachedListTest(TestCase):
+    """Test the cached category and tag lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        Category.objects.create(name='Python', user=self.user)
+        Tag.objects.create(name='basics', user=self.user)
+
+    def names(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['name'] for item in response.data['data']]
+
+    def test_cached_list_needs_no_queries(self):
+        """Test a repeated list is served from the cache"""
+        for name in ('category', 'tag'):
+            url = reverse(f'notes:{name}-list')
+            self.names(url)
+
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data['data']), 1)
+
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_create_through_api_invalidates(self):
+        """Test a created category shows up in the cached list"""
+        url = reverse('notes:category-list')
+        self.names(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'name': 'Django', 'color': '#123456'}, format='json')
+
+        self.assertEqual(self.names(url), ['Django', 'Python'])
+
+    def test_save_and_delete_invalidate(self):
+        """Test saving or deleting a tag outside the API bumps the version"""
+        url = reverse('notes:tag-list')
+        self.names(url)
+        tag = Tag.objects.get(user=self.user)
+        version = get_list_version('tags', self.user.pk)
+
+        tag.name = 'intro'
+        tag.save()
+        self.assertGreater(get_list_version('tags', self.user.pk), version)
+        self.assertEqual(self.names(url), ['intro'])
+
+        tag.delete()
+        self.assertEqual(self.names(url), [])
+
+    def test_version_bumped_again_on_commit(self):
+        """Test the version changes again once the change commits"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name='Django', user=self.user)
+        version = get_list_version('categories', self.user.pk)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertGreater(get_list_version('categories', self.user.pk), version)
+
+    def test_ordering_is_cached_separately(self):
+        """Test each ordering has its own cached list"""
+        Category.objects.create(name='Algorithms', user=self.user)
+        url = reverse('notes:category-list')
+
+        self.assertEqual(self.names(url), ['Algorithms', 'Python'])
+        self.assertEqual(self.names(url, ordering='-name'), ['Python', 'Algorithms'])
+
+    def test_lists_are_per_user(self):
+        """Test users do not see each other's cached lists"""
+        url = reverse('notes:category-list')
+        self.names(url)
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=other_user)
+
+        self.assertEqual(self.names(url), [])
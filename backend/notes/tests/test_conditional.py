@@ -0,0 +1,164 @@
+"""
+Test: Conditional GET
+Purpose: Verify ETags and 304 Not Modified on the collection and detail endpoints
+Coverage: Notes, categories, tags and flashcard sets; invalidation on changes, per-request tags
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.models import Flashcard, FlashcardSet
+from notes.models import Category, Note, Tag
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    """Test conditional requests with If-None-Match"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Python', user=self.user)
+        self.tag = Tag.objects.create(name='basics', user=self.user)
+        self.note = Note.objects.create(
+            title='Note', content='Content', category=self.category, user=self.user
+        )
+        self.note.tags.add(self.tag)
+
+    def get_etag(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def revalidate(self, url, etag, **params):
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+    def test_list_answers_304(self):
+        """Test an unchanged list answers 304 with only the version query"""
+        url = reverse('notes:note-list')
+        etag = self.get_etag(url)
+
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_cache_control(self):
+        """Test responses may be kept by the browser but must be revalidated"""
+        response = self.client.get(reverse('notes:note-list'))
+
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_note_changes_invalidate_list(self):
+        """Test creating, editing and deleting notes change the ETag"""
+        url = reverse('notes:note-list')
+        etag = self.get_etag(url)
+
+        Note.objects.create(title='Other', content='Content', user=self.user)
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+        etag = self.get_etag(url)
+        self.note.delete()
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_embedded_changes_invalidate_note_list(self):
+        """Test renaming a tag or category changes the note list ETag"""
+        url = reverse('notes:note-list')
+        etag = self.get_etag(url)
+
+        self.client.put(reverse('notes:tag-detail', kwargs={'pk': self.tag.id}), {'name': 'intro'}, format='json')
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+        etag = self.get_etag(url)
+        self.category.name = 'Django'
+        self.category.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_query(self):
+        """Test each page, filter and field selection has its own ETag"""
+        url = reverse('notes:note-list')
+
+        self.assertNotEqual(self.get_etag(url), self.get_etag(url, fields='id'))
+
+    def test_etag_depends_on_user(self):
+        """Test another user's ETag does not match"""
+        url = reverse('notes:tag-list')
+        etag = self.get_etag(url)
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=other_user)
+
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_categories_and_tags(self):
+        """Test the category and tag lists answer 304 until they change"""
+        for name, model_object in (('category', self.category), ('tag', self.tag)):
+            url = reverse(f'notes:{name}-list')
+            etag = self.get_etag(url)
+            self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+            model_object.name = 'Renamed'
+            model_object.save()
+            self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_detail_answers_304_until_updated(self):
+        """Test a note detail uses the note's updated_at"""
+        url = reverse('notes:note-detail', kwargs={'pk': self.note.id})
+        etag = self.get_etag(url)
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.note.title = 'Edited'
+        self.note.save()
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_detail_is_404(self):
+        """Test a conditional request for a missing object is still a 404"""
+        url = reverse('notes:note-detail', kwargs={'pk': self.note.id + 100})
+
+        self.assertEqual(self.revalidate(url, '"anything"').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_flashcard_set_list_follows_cards_and_time(self):
+        """Test card edits and cards falling due change the set list ETag"""
+        flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        flashcard = Flashcard.objects.create(
+            flashcard_set=flashcard_set, front='Q', back='A',
+            next_review=timezone.now() + timedelta(hours=1)
+        )
+        url = reverse('flashcards:flashcardset-list')
+        etag = self.get_etag(url)
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Falls due without the card changing
+        Flashcard.objects.filter(pk=flashcard.pk).update(next_review=timezone.now() - timedelta(hours=1))
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['due_count'], 1)
+
+    def test_flashcard_set_detail(self):
+        """Test a set detail answers 304 until its cards change"""
+        flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        url = reverse('flashcards:flashcardset-detail', kwargs={'pk': flashcard_set.id})
+        etag = self.get_etag(url)
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Flashcard.objects.create(flashcard_set=flashcard_set, front='Q', back='A')
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
@@ -0,0 +1,129 @@
+"""
+Test: Two-Tier Cache
+Purpose: Verify the per-process LRU in front of the shared cache and its cross-worker invalidation
+Coverage: LRU eviction and expiry, copies on read, versions shared across workers, list endpoints
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from notes.cache import LIST_VERSION_KEY, list_cache_key
+from notes.models import Category
+from study_app.cache import LocalCache, TwoTierCache
+
+User = get_user_model()
+
+
+class LocalCacheTest(TestCase):
+    """Test the bounded in-process LRU"""
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently read entry is evicted first"""
+        local = LocalCache(max_entries=2, timeout=60)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+        local.set('c', 3)
+
+        self.assertEqual(local.get('a'), 1)
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(len(local), 2)
+
+    def test_entries_expire(self):
+        """Test an entry is not served past its timeout"""
+        local = LocalCache(max_entries=2, timeout=60)
+        local.set('a', 1, timeout=0)
+
+        self.assertIsNone(local.get('a'))
+        self.assertEqual(len(local), 0)
+
+    def test_disabled(self):
+        """Test nothing is kept with max_entries=0"""
+        local = LocalCache(max_entries=0, timeout=60)
+        local.set('a', 1)
+
+        self.assertIsNone(local.get('a'))
+
+
+class TwoTierCacheTest(TestCase):
+    """Test two workers sharing one cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.worker = TwoTierCache(max_entries=100, timeout=60)
+        self.other_worker = TwoTierCache(max_entries=100, timeout=60)
+
+    def test_values_are_served_from_memory(self):
+        """Test a value read once is kept locally"""
+        self.other_worker.set('key', [1, 2], 60)
+        self.assertEqual(self.worker.get('key'), [1, 2])
+
+        cache.delete('key')
+
+        self.assertEqual(self.worker.get('key'), [1, 2])
+
+    def test_values_are_copies(self):
+        """Test changing a value read from memory does not change the cached one"""
+        self.worker.set('key', {'results': [1]}, 60)
+
+        self.worker.get('key')['results'].append(2)
+
+        self.assertEqual(self.worker.get('key'), {'results': [1]})
+
+    def test_bump_is_seen_at_once(self):
+        """Test another worker's bump reaches this worker without waiting"""
+        version = self.worker.get_version('version')
+
+        self.other_worker.bump_version('version')
+
+        self.assertGreater(self.worker.get_version('version'), version)
+
+    def test_bump_needs_no_previous_version(self):
+        """Test a bump after the version was evicted still moves it forward"""
+        version = self.worker.get_version('version')
+        cache.delete('version')
+
+        self.other_worker.bump_version('version')
+
+        self.assertGreater(self.worker.get_version('version'), version)
+
+
+@override_settings(LOCAL_CACHE_MAX_ENTRIES=100)
+class TwoTierListTest(TestCase):
+    """Test the list endpoints with the local tier enabled"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        Category.objects.create(name='Python', user=self.user)
+
+    def names(self):
+        response = self.client.get(reverse('notes:category-list'))
+        return [item['name'] for item in response.data['data']]
+
+    def test_cached_list_is_read_from_memory(self):
+        """Test a repeated list is served from process memory"""
+        self.names()
+        cache.delete(list_cache_key('categories', self.user.pk, ''))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(), ['Python'])
+
+    def test_other_worker_changes_are_seen(self):
+        """Test a list changed through another worker is fresh on the next request"""
+        self.assertEqual(self.names(), ['Python'])
+
+        Category.objects.bulk_create([Category(name='Django', user=self.user)])
+        TwoTierCache(max_entries=100, timeout=60).bump_version(
+            LIST_VERSION_KEY.format(name='categories', user_id=self.user.pk)
+        )
+
+        self.assertEqual(self.names(), ['Django', 'Python'])
@@ -0,0 +1,147 @@
+"""
+Test: Cursor Pagination
+Purpose: Verify opt-in keyset pagination on the note, flashcard and study session lists
+Coverage: Walking pages, ordering, envelope, estimated counts, nullable orderings
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.models import Flashcard, FlashcardSet, StudySession
+from notes.models import Note
+
+User = get_user_model()
+
+
+class CursorPaginationTest(TestCase):
+    """Test ?pagination=cursor on the list endpoints"""
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        now = timezone.now()
+        for index in range(5):
+            note = Note.objects.create(title=f'Note {index}', content='Content', user=self.user)
+            # Distinct timestamps, oldest first
+            Note.objects.filter(pk=note.pk).update(updated_at=now - timedelta(minutes=10 - index))
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def walk(self, url, **params):
+        """Follow next links from the first page, returning every page"""
+        pages = [self.get(url, pagination='cursor', **params)]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+        return pages
+
+    def test_walks_every_note_once(self):
+        """Test following next links visits every note in order"""
+        pages = self.walk(reverse('notes:note-list'), page_size=2)
+
+        titles = [note['title'] for page in pages for note in page['results']]
+        self.assertEqual(titles, [f'Note {index}' for index in range(4, -1, -1)])
+        self.assertEqual(len(pages), 3)
+
+    def test_envelope(self):
+        """Test the page keeps the list envelope, without a count by default"""
+        data = self.get(reverse('notes:note-list'), pagination='cursor', page_size=2)
+
+        self.assertEqual(set(data), {'count', 'next', 'previous', 'results', 'status'})
+        self.assertIsNone(data['count'])
+        self.assertIsNone(data['previous'])
+        self.assertIn('cursor=', data['next'])
+
+    def test_previous_link(self):
+        """Test the previous link returns to the earlier page"""
+        first = self.get(reverse('notes:note-list'), pagination='cursor', page_size=2)
+        second = self.get(first['next'])
+        back = self.get(second['previous'])
+
+        self.assertEqual(back['results'], first['results'])
+
+    def test_no_count_query(self):
+        """Test a cursor page runs no COUNT"""
+        with self.assertNumQueries(3):
+            # ETag version, notes (with category joined), then the tags prefetch
+            self.get(reverse('notes:note-list'), pagination='cursor')
+
+    def test_estimated_count(self):
+        """Test ?count=estimate adds a count"""
+        data = self.get(reverse('notes:note-list'), pagination='cursor', count='estimate')
+
+        self.assertEqual(data['count'], 5)
+
+    def test_estimated_count_is_capped(self):
+        """Test large result sets are not counted exactly"""
+        with mock.patch('study_app.pagination.EXACT_COUNT_LIMIT', 3):
+            data = self.get(reverse('notes:note-list'), pagination='cursor', count='estimate')
+
+        self.assertEqual(data['count'], 3)
+
+    def test_explicit_ordering(self):
+        """Test ?ordering is followed in cursor mode"""
+        pages = self.walk(reverse('notes:note-list'), page_size=2, ordering='title')
+
+        titles = [note['title'] for page in pages for note in page['results']]
+        self.assertEqual(titles, [f'Note {index}' for index in range(5)])
+
+    def test_search_keeps_relevance_order(self):
+        """Test a search falls back to page numbers so results stay ranked"""
+        Note.objects.create(title='Django', content='Other', user=self.user)
+        Note.objects.create(title='Other', content='Mentions django once', user=self.user)
+
+        data = self.get(reverse('notes:note-list'), pagination='cursor', search='django')
+
+        self.assertEqual([note['title'] for note in data['results']], ['Django', 'Other'])
+        self.assertEqual(data['count'], 2)
+
+    def test_search_with_ordering_uses_cursor(self):
+        """Test a search with an explicit ordering still pages by cursor"""
+        data = self.get(reverse('notes:note-list'), pagination='cursor', search='content', ordering='title')
+
+        self.assertIsNone(data['count'])
+        self.assertEqual(data['results'][0]['title'], 'Note 0')
+
+    def test_page_numbers_by_default(self):
+        """Test page number pagination is unchanged without the param"""
+        data = self.get(reverse('notes:note-list'))
+
+        self.assertEqual(data['count'], 5)
+
+    def test_flashcards(self):
+        """Test flashcards page by cursor, falling back from nullable orderings"""
+        flashcard_set = FlashcardSet.objects.create(name='Set', user=self.user)
+        for index in range(3):
+            Flashcard.objects.create(flashcard_set=flashcard_set, front=f'Q{index}', back='A')
+        url = f'/api/flashcard-sets/{flashcard_set.id}/flashcards/'
+
+        pages = self.walk(url, page_size=2, ordering='next_review')
+
+        fronts = [card['front'] for page in pages for card in page['results']]
+        self.assertEqual(fronts, ['Q0', 'Q1', 'Q2'])
+
+    def test_study_sessions(self):
+        """Test study sessions page by cursor, newest first"""
+        now = timezone.now()
+        for index in range(3):
+            session = StudySession.objects.create(user=self.user, cards_studied=index)
+            StudySession.objects.filter(pk=session.pk).update(started_at=now - timedelta(hours=index))
+
+        pages = self.walk('/api/study-sessions/', page_size=2)
+
+        studied = [session['cards_studied'] for page in pages for session in page['results']]
+        self.assertEqual(studied, [0, 1, 2])
@@ -0,0 +1,107 @@
+"""
+Test: Note Full-Text Search
+Purpose: Verify ranked full-text search over note titles and content
+Coverage: Ranking, stemming, index maintenance on update/delete, query escaping, ordering
+"""
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.urls import reverse
+from notes.models import Note
+from notes.search import search_notes
+from search.fulltext import fts5_query
+
+User = get_user_model()
+
+
+class NoteSearchTest(TestCase):
+    """Test the full-text search on the notes list"""
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('notes:note-list')
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {'search': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [note['title'] for note in response.data['results']]
+
+    def test_title_matches_rank_first(self):
+        """Test a match in the title ranks above a match in the content"""
+        Note.objects.create(title='Decorators', content='Functions wrapping generators', user=self.user)
+        Note.objects.create(title='Generators', content='Lazy iteration', user=self.user)
+        Note.objects.create(title='Classes', content='Inheritance', user=self.user)
+
+        self.assertEqual(self.search('generators'), ['Generators', 'Decorators'])
+
+    def test_matches_word_forms(self):
+        """Test searches match other forms of the same word"""
+        Note.objects.create(title='Testing', content='Running the tests', user=self.user)
+
+        self.assertEqual(self.search('test'), ['Testing'])
+
+    def test_all_words_must_match(self):
+        """Test every word of the search must appear in the note"""
+        Note.objects.create(title='Python lists', content='Slicing', user=self.user)
+        Note.objects.create(title='Python dicts', content='Hashing', user=self.user)
+
+        self.assertEqual(self.search('python slicing'), ['Python lists'])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test edited and deleted notes are reflected in the results"""
+        note = Note.objects.create(title='Draft', content='Old content', user=self.user)
+        removed = Note.objects.create(title='Removed', content='Old content', user=self.user)
+
+        note.content = 'New content'
+        note.save()
+        removed.delete()
+
+        self.assertEqual(self.search('old'), [])
+        self.assertEqual(self.search('new'), ['Draft'])
+
+    def test_punctuation_is_literal(self):
+        """Test query syntax characters in the search do not cause errors"""
+        Note.objects.create(title='C++ "pointers"', content='AND OR NOT', user=self.user)
+
+        self.assertEqual(self.search('"pointers" AND ('), ['C++ "pointers"'])
+        self.assertEqual(fts5_query('say "hi"'), '"say" """hi"""')
+
+    def test_explicit_ordering_wins(self):
+        """Test an ordering param replaces relevance ordering"""
+        Note.objects.create(title='B python', content='python python', user=self.user)
+        Note.objects.create(title='A python', content='Other', user=self.user)
+
+        self.assertEqual(self.search('python', ordering='title'), ['A python', 'B python'])
+
+    def test_search_is_scoped_to_user(self):
+        """Test other users' notes are not matched"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        Note.objects.create(title='Python', content='Private', user=other_user)
+
+        self.assertEqual(self.search('python'), [])
+
+    def test_blank_search_returns_everything(self):
+        """Test a blank search does not filter"""
+        Note.objects.create(title='Python', content='Content', user=self.user)
+
+        self.assertEqual(len(self.search('   ')), 1)
+
+    def test_search_notes_annotates_rank(self):
+        """Test search_notes annotates a relevance score"""
+        Note.objects.create(title='Python', content='Content', user=self.user)
+
+        note = search_notes(Note.objects.all(), 'python').get()
+
+        self.assertGreater(note.search_rank, 0)
@@ -9,6 +9,7 @@ Date: 2025-01-27
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.urls import reverse
@@ -21,6 +22,7 @@ class NotesAPITest(TestCase):
     """Test Notes API endpoints"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient(enforce_csrf_checks=False)
         self.user = User.objects.create_user(
             username='testuser',
@@ -358,12 +360,77 @@ class NotesAPITest(TestCase):
         self.assertIn('next', response.data)
         self.assertIn('count', response.data)
         self.assertEqual(response.data['count'], 25)
+    
+    def test_sparse_fields(self):
+        """Test ?fields= returns only the named fields"""
+        self.client.force_authenticate(user=self.user)
+        note = Note.objects.create(title='Note', content='Content', user=self.user)
+        note.tags.add(self.tag1)
+        
+        url = reverse('notes:note-list')
+        with self.assertNumQueries(3):
+            # ETag version, count and notes; tags are not prefetched when not requested
+            response = self.client.get(url, {'fields': 'id,title,unknown'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': note.id, 'title': 'Note'}])
+    
+    def test_sparse_fields_on_retrieve(self):
+        """Test ?fields= also narrows a single note"""
+        self.client.force_authenticate(user=self.user)
+        note = Note.objects.create(title='Note', content='Content', user=self.user)
+        
+        url = reverse('notes:note-detail', kwargs={'pk': note.id})
+        response = self.client.get(url, {'fields': 'title,content'})
+        
+        self.assertEqual(response.data['data'], {'title': 'Note', 'content': 'Content'})
+    
+    def test_sparse_fields_ignored_on_write(self):
+        """Test ?fields= does not narrow create or update"""
+        self.client.force_authenticate(user=self.user)
+        
+        url = reverse('notes:note-list') + '?fields=id'
+        response = self.client.post(url, {'title': 'Note', 'content': 'Content'}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['data']['content'], 'Content')
+    
+    def test_summary_view(self):
+        """Test ?view=summary returns excerpts instead of content"""
+        self.client.force_authenticate(user=self.user)
+        long_note = Note.objects.create(title='Long', content='x' * 150, user=self.user)
+        short_note = Note.objects.create(title='Short', content='Brief', user=self.user)
+        long_note.tags.add(self.tag1)
+        
+        url = reverse('notes:note-list')
+        response = self.client.get(url, {'view': 'summary', 'ordering': 'title'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        long_result, short_result = response.data['results']
+        self.assertNotIn('content', long_result)
+        self.assertEqual(long_result['excerpt'], long_note.get_excerpt())
+        self.assertEqual(short_result['excerpt'], short_note.get_excerpt())
+        self.assertEqual([tag['name'] for tag in long_result['tags']], ['basics'])
+    
+    def test_summary_view_does_not_load_content(self):
+        """Test the summary query selects the excerpt, not the content"""
+        self.client.force_authenticate(user=self.user)
+        Note.objects.create(title='Note', content='Content', user=self.user)
+        
+        url = reverse('notes:note-list')
+        with self.assertNumQueries(3) as queries:
+            self.client.get(url, {'view': 'summary', 'fields': 'id,title,excerpt', 'page_size': 5})
+        
+        # Content is only read inside the excerpt expression
+        selected_columns = queries.captured_queries[-1]['sql'].split(' CASE ')[0]
+        self.assertNotIn('"notes_note"."content"', selected_columns)
 
 
 class CategoriesAPITest(TestCase):
     """Test Categories API endpoints"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient(enforce_csrf_checks=False)
         self.user = User.objects.create_user(
             username='testuser',
@@ -462,6 +529,7 @@ class TagsAPITest(TestCase):
     """Test Tags API endpoints"""
     
     def setUp(self):
+        cache.clear()
         self.client = APIClient(enforce_csrf_checks=False)
         self.user = User.objects.create_user(
             username='testuser',
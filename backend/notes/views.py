@@ -6,9 +6,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from study_app.cache import two_tier
+from study_app.conditional import ConditionalGetMixin, collection_version, conditional
+from study_app.pagination import CursorPaginationMixin
+from .cache import LIST_CACHE_TIMEOUT, get_list_version, list_cache_key
 from .models import Note, Category, Tag
-from .serializers import NoteSerializer, CategorySerializer, TagSerializer
+from .search import NoteSearchFilter
+from .serializers import NoteSerializer, NoteSummarySerializer, CategorySerializer, TagSerializer
 
 
 class NoPagination(PageNumberPagination):
@@ -17,7 +21,31 @@ class NoPagination(PageNumberPagination):
         return None
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CachedListMixin:
+    """
+    Serve a whole per-user list from the cache (see notes.cache).
+    
+    The list version changes whenever the list does, so it also versions the
+    ETag and a cached list is served without touching the database.
+    """
+    list_cache_name = None
+    
+    def get_list_version(self):
+        return get_list_version(self.list_cache_name, self.request.user.pk)
+    
+    def get_cached_list(self):
+        """Return the serialized list, from the cache when it is there"""
+        ordering = self.request.query_params.get(filters.OrderingFilter.ordering_param, '')
+        key = list_cache_key(self.list_cache_name, self.request.user.pk, ordering)
+        data = two_tier.get(key)
+        if data is None:
+            queryset = self.filter_queryset(self.get_queryset())
+            data = list(self.get_serializer(queryset, many=True).data)
+            two_tier.set(key, data, LIST_CACHE_TIMEOUT)
+        return data
+
+
+class CategoryViewSet(CachedListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Category model.
     Users can only access their own categories.
@@ -28,6 +56,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
     pagination_class = NoPagination  # Disable pagination for categories
+    list_cache_name = 'categories'
     
     def get_queryset(self):
         """Return only categories belonging to the current user"""
@@ -37,29 +66,15 @@ class CategoryViewSet(viewsets.ModelViewSet):
         """Set the user when creating a category"""
         serializer.save(user=self.request.user)
     
+    @conditional('get_list_version')
     def list(self, request, *args, **kwargs):
-        """Override list to return response with status"""
-        queryset = self.filter_queryset(self.get_queryset())
-        # With NoPagination, paginate_queryset should return None
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            # Handle paginated response (shouldn't happen with NoPagination)
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
-            # Extract data from paginated response
-            paginated_data = paginated_response.data if hasattr(paginated_response, 'data') else {}
-            if isinstance(paginated_data, dict) and 'results' in paginated_data:
-                return Response({
-                    'data': paginated_data['results'],
-                    'status': 'success'
-                })
-        # No pagination - serialize directly
-        serializer = self.get_serializer(queryset, many=True)
+        """Override list to return response with status, from the per-user cache"""
         return Response({
-            'data': serializer.data,
+            'data': self.get_cached_list(),
             'status': 'success'
         })
     
+    @conditional('get_detail_version')
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to return response with status"""
         response = super().retrieve(request, *args, **kwargs)
@@ -90,7 +105,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Tag model.
     Users can only access their own tags.
@@ -101,6 +116,7 @@ class TagViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
     pagination_class = NoPagination  # Disable pagination for tags
+    list_cache_name = 'tags'
     
     def get_queryset(self):
         """Return only tags belonging to the current user"""
@@ -110,29 +126,15 @@ class TagViewSet(viewsets.ModelViewSet):
         """Set the user when creating a tag"""
         serializer.save(user=self.request.user)
     
+    @conditional('get_list_version')
     def list(self, request, *args, **kwargs):
-        """Override list to return response with status"""
-        queryset = self.filter_queryset(self.get_queryset())
-        # With NoPagination, paginate_queryset should return None
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            # Handle paginated response (shouldn't happen with NoPagination)
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
-            # Extract data from paginated response
-            paginated_data = paginated_response.data if hasattr(paginated_response, 'data') else {}
-            if isinstance(paginated_data, dict) and 'results' in paginated_data:
-                return Response({
-                    'data': paginated_data['results'],
-                    'status': 'success'
-                })
-        # No pagination - serialize directly
-        serializer = self.get_serializer(queryset, many=True)
+        """Override list to return response with status, from the per-user cache"""
         return Response({
-            'data': serializer.data,
+            'data': self.get_cached_list(),
             'status': 'success'
         })
     
+    @conditional('get_detail_version')
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to return response with status"""
         response = super().retrieve(request, *args, **kwargs)
@@ -163,44 +165,95 @@ class TagViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class NoteViewSet(viewsets.ModelViewSet):
+class NoteViewSet(ConditionalGetMixin, CursorPaginationMixin, viewsets.ModelViewSet):
     """
     ViewSet for Note model.
     Users can only access their own notes.
-    Supports filtering, searching, and pagination.
+    Supports filtering, ranked full-text search, and pagination
+    (page numbers, or keyset with ?pagination=cursor).
     """
     serializer_class = NoteSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'content']
+    # Search runs after ordering so it can order by relevance by default
+    filter_backends = [filters.OrderingFilter, NoteSearchFilter]
+    relevance_query_params = [NoteSearchFilter.search_param]
     ordering_fields = ['created_at', 'updated_at', 'title']
     ordering = ['-updated_at']
     
+    def is_summary(self):
+        """Whether the request asks for ?view=summary (excerpts instead of content)"""
+        return self.request.method == 'GET' and self.request.query_params.get('view') == 'summary'
+
+    def get_sparse_fields(self):
+        """
+        Return the field names requested with ?fields=, or None for all fields.
+        Only read requests are narrowed.
+        """
+        param = self.request.query_params.get('fields')
+        if self.request.method != 'GET' or not param:
+            return None
+        return [name.strip() for name in param.split(',') if name.strip()]
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return NoteSummarySerializer
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
         """Return only notes belonging to the current user"""
-        queryset = Note.objects.filter(user=self.request.user)
+        # The search vector is only read by the database
+        queryset = Note.objects.filter(user=self.request.user).defer('search_vector')
         
         # Filter by category if provided
         category_id = self.request.query_params.get('category', None)
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        # Search in title and content
-        search_query = self.request.query_params.get('search', None)
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) | Q(content__icontains=search_query)
-            )
-        
-        # Prefetch related objects for performance
-        queryset = queryset.select_related('category', 'user').prefetch_related('tags')
+        # Load only what the requested fields need
+        fields = self.get_sparse_fields()
+        if self.is_summary():
+            queryset = queryset.defer('content')
+            if fields is None or 'excerpt' in fields:
+                queryset = queryset.annotate(excerpt=Note.excerpt_expression())
+        elif fields is not None and 'content' not in fields:
+            queryset = queryset.defer('content')
+        if fields is None or 'category' in fields:
+            queryset = queryset.select_related('category')
+        if fields is None or 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
         
         return queryset
     
+    def get_list_version(self):
+        """Notes change the list, and so do the categories and tags embedded in it"""
+        user = self.request.user
+        return collection_version(
+            Note.objects.filter(user=user),
+            Category.objects.filter(user=user),
+            Tag.objects.filter(user=user)
+        )
+    
+    def get_detail_version(self):
+        note = self.get_object()
+        category = note.category
+        return (
+            note.pk,
+            note.updated_at,
+            category and category.updated_at,
+            [(tag.pk, tag.updated_at) for tag in note.tags.all()],
+        )
+    
     def perform_create(self, serializer):
         """Set the user when creating a note"""
         serializer.save(user=self.request.user)
     
+    @conditional('get_list_version')
     def list(self, request, *args, **kwargs):
         """Override list to return paginated response with status"""
         response = super().list(request, *args, **kwargs)
@@ -221,6 +274,7 @@ class NoteViewSet(viewsets.ModelViewSet):
             'status': 'success'
         })
     
+    @conditional('get_detail_version')
     def retrieve(self, request, *args, **kwargs):
         """Override retrieve to return response with status"""
         response = super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,24 @@
+"""
+Search Cache Keys
+Per-user text version of the in-process fuzzy search indexes.
+
+The version moves when one of the user's notes or cards is added or its
+text edited (see search.signals); bulk inserts bump it themselves. An index
+built under an older version is rebuilt on the next search (see
+search.fuzzy). The version is read through the two-tier cache (see
+study_app.cache).
+"""
+
+from study_app.cache import two_tier
+
+TEXT_VERSION_KEY = 'search:text-version:{user_id}'
+
+
+def get_text_version(user_id):
+    """Return the current text version of a user's notes and cards"""
+    return two_tier.get_version(TEXT_VERSION_KEY.format(user_id=user_id))
+
+
+def bump_text_version(user_id):
+    """Mark a user's indexes stale after a note or card was added or its text changed"""
+    two_tier.bump_version(TEXT_VERSION_KEY.format(user_id=user_id))
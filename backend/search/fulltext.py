@@ -0,0 +1,211 @@
+"""
+Full-Text Search
+Ranked full-text matching and highlighted snippets for notes, cards and sets.
+
+Each searchable model has a full-text index on two columns (a title-like
+column weighted above a body column):
+
+- PostgreSQL: a search_vector column kept up to date by a trigger and
+  indexed with GIN, matched with websearch_to_tsquery and ranked with
+  ts_rank. Snippets come from ts_headline.
+- SQLite: an external-content FTS5 table kept in sync by triggers, ranked
+  with weighted bm25(). Snippets come from snippet().
+
+Other databases fall back to icontains without ranking or snippets.
+
+Snippets are built in the database with private-use marker characters
+around each match. highlight() HTML-escapes them and turns the markers
+into <mark> tags, so note text is never sent as markup.
+
+unified_search() runs one ranked query per model and merges the results,
+so only the display fields and snippets leave the database.
+"""
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Concat, Left
+from django.utils.html import escape
+from flashcards.models import Flashcard, FlashcardSet
+from notes.models import Note
+
+# Text search configuration used by the search_vector triggers
+SEARCH_CONFIG = 'english'
+
+# Private-use characters marking matches in database-built snippets
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_WORDS = 16
+
+
+class FullTextIndex:
+    """The full-text index of one model: its FTS5 table and weighted columns"""
+
+    def __init__(self, table, fts_table, columns, weights):
+        self.table = table
+        self.fts_table = fts_table
+        self.columns = columns
+        self.weights = weights
+
+
+NOTE_INDEX = FullTextIndex('notes_note', 'notes_note_fts', ('title', 'content'), (10.0, 1.0))
+FLASHCARD_INDEX = FullTextIndex(
+    'flashcards_flashcard', 'flashcards_flashcard_fts', ('front', 'back'), (2.0, 1.0)
+)
+FLASHCARD_SET_INDEX = FullTextIndex(
+    'flashcards_flashcardset', 'flashcards_flashcardset_fts', ('name', 'description'), (10.0, 1.0)
+)
+
+
+def fts5_query(text):
+    """
+    Turn free text into an FTS5 query that matches all of its words.
+
+    Every word is quoted, so FTS5 operators and punctuation in the input are
+    matched literally instead of being parsed.
+    """
+    words = text.split()
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def fts5_subquery(index, select):
+    """Correlated FTS5 subquery for the current row of the index's table"""
+    fts_table = connection.ops.quote_name(index.fts_table)
+    table = connection.ops.quote_name(index.table)
+    return (
+        f'SELECT {select} FROM {fts_table} '
+        f'WHERE {fts_table} MATCH %s AND {fts_table}.rowid = {table}.id'
+    )
+
+
+def search_queryset(queryset, index, text):
+    """
+    Filter a queryset to rows matching the search text.
+
+    Returns:
+        QuerySet: Matching rows annotated with search_rank (higher is better)
+    """
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+
+    if connection.vendor == 'sqlite':
+        match = fts5_query(text)
+        if not match:
+            return queryset.none()
+        fts_table = connection.ops.quote_name(index.fts_table)
+        weights = ', '.join(['%s'] * len(index.weights))
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match])
+        ).annotate(
+            # bm25() is lower for better matches
+            search_rank=RawSQL(
+                fts5_subquery(index, f'-bm25({fts_table}, {weights})'),
+                [*index.weights, match],
+                output_field=FloatField()
+            )
+        )
+
+    condition = Q()
+    for column in index.columns:
+        condition |= Q(**{f'{column}__icontains': text})
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def annotate_snippet(queryset, index, text):
+    """
+    Annotate matching rows with search_snippet, an excerpt around the matches.
+
+    Matches are wrapped in MATCH_START and MATCH_END; pass the value through
+    highlight() before sending it to a client.
+    """
+    if connection.vendor == 'postgresql':
+        document = Concat(
+            *(expression for column in index.columns for expression in (F(column), Value('\n'))),
+            output_field=TextField()
+        )
+        return queryset.annotate(search_snippet=SearchHeadline(
+            document,
+            SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch'),
+            config=SEARCH_CONFIG,
+            start_sel=MATCH_START,
+            stop_sel=MATCH_END,
+            max_words=SNIPPET_WORDS,
+            min_words=SNIPPET_WORDS // 2,
+            max_fragments=2,
+            fragment_delimiter=f' {SNIPPET_ELLIPSIS} '
+        ))
+
+    if connection.vendor == 'sqlite':
+        fts_table = connection.ops.quote_name(index.fts_table)
+        return queryset.annotate(search_snippet=RawSQL(
+            # Column -1 lets FTS5 pick the best matching column
+            fts5_subquery(index, f'snippet({fts_table}, -1, %s, %s, %s, %s)'),
+            [MATCH_START, MATCH_END, SNIPPET_ELLIPSIS, SNIPPET_WORDS, fts5_query(text)],
+            output_field=TextField()
+        ))
+
+    return queryset.annotate(search_snippet=Left(index.columns[-1], 200))
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and turn its match markers into <mark> tags"""
+    return (
+        escape(snippet or '')
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
+
+
+# Searched models: (result type, model, index, title field, extra fields)
+SEARCH_TARGETS = (
+    ('note', Note, NOTE_INDEX, 'title', ()),
+    ('flashcard_set', FlashcardSet, FLASHCARD_SET_INDEX, 'name', ()),
+    ('flashcard', Flashcard, FLASHCARD_INDEX, 'front', ('flashcard_set_id',)),
+)
+
+
+def unified_search(user, text, limit):
+    """
+    Search a user's notes, flashcard sets and flashcards.
+
+    Each type is ranked with its own weights (and on SQLite, bm25 has its
+    own scale), so raw ranks are not comparable across types. Ranks are
+    divided by the best rank of the same type before the types are merged:
+    the best match of every type has rank 1.0.
+
+    Args:
+        user: Owner of the rows
+        text (str): Search text
+        limit (int): Maximum number of results
+
+    Returns:
+        list: Result dicts (type, id, title, snippet with <mark> highlights,
+            normalized rank and type-specific fields), best first
+    """
+    results = []
+    for kind, model, index, title_field, extra_fields in SEARCH_TARGETS:
+        queryset = search_queryset(model.objects.filter(user=user), index, text)
+        rows = list(
+            annotate_snippet(queryset, index, text)
+            .order_by('-search_rank', 'id')
+            .values('id', title_field, 'search_rank', 'search_snippet', *extra_fields)[:limit]
+        )
+        top_rank = rows[0]['search_rank'] if rows else 0
+        for position, row in enumerate(rows):
+            rank = row['search_rank'] / top_rank if top_rank > 0 else 1.0
+            results.append(({
+                'type': kind,
+                'id': row['id'],
+                'title': row[title_field],
+                'snippet': highlight(row['search_snippet']),
+                'rank': round(rank, 4),
+                **{field: row[field] for field in extra_fields},
+            }, position))
+    # Equal ranks interleave the types by their position within each type
+    results.sort(key=lambda item: (-item[0]['rank'], item[1]))
+    return [result for result, position in results[:limit]]
@@ -0,0 +1,190 @@
+"""
+Fuzzy Search
+Typo-tolerant search over note titles and content and flashcard fronts and backs.
+
+On PostgreSQL, matching uses pg_trgm word similarity (the <% operator) on
+GIN trigram indexes created by migrations notes 0003 and flashcards 0006,
+and is ranked by word_similarity(). Elsewhere (development and SQLite
+deployments), a TrigramIndex of the user's notes and cards is built in
+process, with an approximation of word similarity (see search.trigrams).
+
+Each worker keeps its own copy per user, rebuilt when the user's text
+version moves: when a note or card is created or its text edited, or rows
+are inserted in bulk. Checking it costs one cache lookup and no queries.
+Deletes do not move it; deleted rows stay in the index until the next
+rebuild and are dropped when the matches are loaded. A rebuild reads at
+most MAX_INDEXED_ROWS notes and as many cards, the most recently updated
+first, so its cost is bounded for very large accounts.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import BooleanField, F, Func, Q, Value
+from django.db.models.functions import Greatest
+from flashcards.models import Flashcard
+from notes.models import Note
+from .cache import get_text_version
+from .trigrams import TrigramIndex
+
+# Minimum word similarity of a match (pg_trgm's default is 0.6, which
+# misses most single-word typos, e.g. 0.43 for "djnago" and "django")
+FUZZY_THRESHOLD = 0.3
+
+# Fields searched per model: (result type, model, fields)
+FUZZY_TARGETS = (
+    ('note', Note, ('title', 'content')),
+    ('flashcard', Flashcard, ('front', 'back')),
+)
+
+# Rows per model read into an in-process index
+MAX_INDEXED_ROWS = 20_000
+
+# Users whose in-process index is kept
+MAX_CACHED_INDEXES = 16
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+class WordSimilar(Func):
+    """pg_trgm `text <% field`: word similarity above the threshold (index-backed)"""
+    template = '%(expressions)s'
+    arg_joiner = ' <%% '
+    output_field = BooleanField()
+
+
+def postgres_matches(user, text, limit):
+    """
+    Find matches with pg_trgm.
+
+    Returns:
+        list: (result type, id, similarity) for each model, best first
+    """
+    with connection.cursor() as cursor:
+        # Session setting read by <%; set on every search, so it is always ours
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            [str(FUZZY_THRESHOLD)]
+        )
+
+    matches = []
+    for kind, model, fields in FUZZY_TARGETS:
+        condition = Q()
+        for field in fields:
+            condition |= Q(WordSimilar(Value(text), F(field)))
+        rows = (
+            model.objects.filter(condition, user=user)
+            .annotate(similarity=Greatest(*(TrigramWordSimilarity(text, field) for field in fields)))
+            .order_by('-similarity', 'id')
+            .values_list('id', 'similarity')[:limit]
+        )
+        matches += [(kind, object_id, similarity) for object_id, similarity in rows]
+    return matches
+
+
+def index_version(user):
+    """
+    Return the user's text version, which moves when a note or card is
+    added or its text edited.
+
+    Saves bump it through search.signals, and bulk inserts (imports and
+    restores) bump it themselves. Reviews only touch scheduling columns, so
+    they keep the index.
+    """
+    return get_text_version(user.pk)
+
+
+def build_index(user):
+    """Build the trigram index of a user's notes and cards, up to MAX_INDEXED_ROWS of each"""
+    index = TrigramIndex()
+    for kind, model, fields in FUZZY_TARGETS:
+        rows = (
+            model.objects.filter(user=user)
+            .order_by('-updated_at', '-id')
+            .values_list('id', *fields)[:MAX_INDEXED_ROWS]
+            .iterator(chunk_size=2000)
+        )
+        for object_id, *texts in rows:
+            index.add((kind, object_id), *texts)
+    return index
+
+
+def get_index(user):
+    """Return the user's trigram index, rebuilding it if their data changed"""
+    version = index_version(user)
+    with _indexes_lock:
+        cached = _indexes.get(user.pk)
+        if cached is not None and cached[0] == version:
+            _indexes.move_to_end(user.pk)
+            return cached[1]
+
+    index = build_index(user)
+    with _indexes_lock:
+        _indexes[user.pk] = (version, index)
+        _indexes.move_to_end(user.pk)
+        while len(_indexes) > MAX_CACHED_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear_indexes():
+    """Forget every in-process index"""
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def fuzzy_search(user, text, limit):
+    """
+    Search a user's notes and cards, tolerating typos.
+
+    Args:
+        user: Owner of the notes and cards
+        text (str): Search text
+        limit (int): Maximum number of results
+
+    Returns:
+        list: Result dicts (type, id, similarity and display fields), most
+            similar first
+    """
+    if connection.vendor == 'postgresql':
+        matches = postgres_matches(user, text, limit)
+    else:
+        matches = [
+            (kind, object_id, score)
+            for (kind, object_id), score in get_index(user).search(text, FUZZY_THRESHOLD, limit)
+        ]
+    matches.sort(key=lambda match: -match[2])
+    matches = matches[:limit]
+
+    notes = Note.objects.filter(user=user).in_bulk(
+        [object_id for kind, object_id, _ in matches if kind == 'note']
+    )
+    flashcards = Flashcard.objects.filter(user=user).in_bulk(
+        [object_id for kind, object_id, _ in matches if kind == 'flashcard']
+    )
+
+    results = []
+    for kind, object_id, similarity in matches:
+        if kind == 'note' and object_id in notes:
+            note = notes[object_id]
+            results.append({
+                'type': 'note',
+                'id': note.id,
+                'title': note.title,
+                'excerpt': note.get_excerpt(),
+                'similarity': round(similarity, 3),
+            })
+        elif kind == 'flashcard' and object_id in flashcards:
+            flashcard = flashcards[object_id]
+            results.append({
+                'type': 'flashcard',
+                'id': flashcard.id,
+                'flashcard_set_id': flashcard.flashcard_set_id,
+                'front': flashcard.front,
+                'back': flashcard.back,
+                'similarity': round(similarity, 3),
+            })
+    return results
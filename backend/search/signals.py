@@ -0,0 +1,30 @@
+"""
+Search Signals
+Mark the in-process fuzzy search indexes stale when a note or flashcard is
+created or its text edited.
+
+Review updates write no text, so they leave the indexes alone. Deletes are
+not tracked (see search.fuzzy), and bulk inserts bump the version themselves.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from flashcards.models import Flashcard
+from notes.models import Note
+from .cache import bump_text_version
+from .fuzzy import FUZZY_TARGETS
+
+# Searched fields per model
+TEXT_FIELDS = {model: set(fields) for kind, model, fields in FUZZY_TARGETS}
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_save, sender=Flashcard)
+def text_changed(sender, instance, created, update_fields=None, **kwargs):
+    """Bump the owner's text version now and again on commit"""
+    if update_fields is not None and not TEXT_FIELDS[sender] & set(update_fields):
+        return
+    user_id = instance.user_id
+    bump_text_version(user_id)
+    transaction.on_commit(lambda: bump_text_version(user_id))
@@ -0,0 +1 @@
+# Search app tests
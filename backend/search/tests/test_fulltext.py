@@ -0,0 +1,158 @@
+"""
+Test: Unified Search
+Purpose: Verify ranked full-text search across notes, flashcard sets and flashcards
+Coverage: Result types, ranking, highlighted snippets, escaping, index maintenance, user isolation, API
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.models import Flashcard, FlashcardSet
+from notes.models import Note
+from search.fulltext import MATCH_END, MATCH_START, highlight
+
+User = get_user_model()
+
+
+class HighlightTest(SimpleTestCase):
+    """Test snippet highlighting"""
+
+    def test_markers_become_mark_tags(self):
+        """Test match markers are turned into <mark> tags"""
+        self.assertEqual(
+            highlight(f'a {MATCH_START}match{MATCH_END} here'),
+            'a <mark>match</mark> here'
+        )
+
+    def test_text_is_escaped(self):
+        """Test markup in the text is escaped"""
+        self.assertEqual(
+            highlight(f'<b>{MATCH_START}x{MATCH_END}</b>'),
+            '&lt;b&gt;<mark>x</mark>&lt;/b&gt;'
+        )
+
+    def test_missing_snippet(self):
+        """Test a null snippet becomes an empty string"""
+        self.assertEqual(highlight(None), '')
+
+
+class UnifiedSearchAPITest(TestCase):
+    """Test the unified search endpoint"""
+
+    url = '/api/search/'
+
+    def setUp(self):
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.note = Note.objects.create(
+            title='Closures', content='A closure captures variables from the enclosing scope', user=self.user
+        )
+        self.flashcard_set = FlashcardSet.objects.create(
+            name='Python scope', description='Closures and namespaces', user=self.user
+        )
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='What is a closure?', back='A function with captured variables'
+        )
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {'q': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']['results']
+
+    def test_matches_every_type(self):
+        """Test notes, sets and cards are all searched"""
+        results = self.search('closures')
+
+        self.assertEqual(
+            {(result['type'], result['id']) for result in results},
+            {
+                ('note', self.note.id),
+                ('flashcard_set', self.flashcard_set.id),
+                ('flashcard', self.flashcard.id),
+            }
+        )
+        card = next(result for result in results if result['type'] == 'flashcard')
+        self.assertEqual(card['title'], 'What is a closure?')
+        self.assertEqual(card['flashcard_set_id'], self.flashcard_set.id)
+
+    def test_results_are_ranked(self):
+        """Test results are ordered best first"""
+        ranks = [result['rank'] for result in self.search('closure')]
+
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+    def test_ranks_are_normalized_per_type(self):
+        """Test the best match of every type ranks first, whatever its raw rank"""
+        Note.objects.create(title='Closure recap', content='A closure keeps its scope', user=self.user)
+        results = self.search('closure')
+
+        top = {}
+        for result in results:
+            top.setdefault(result['type'], result['rank'])
+        self.assertEqual(top, {'note': 1.0, 'flashcard_set': 1.0, 'flashcard': 1.0})
+        self.assertEqual(
+            {result['type'] for result in results[:3]},
+            {'note', 'flashcard_set', 'flashcard'}
+        )
+
+    def test_snippets_highlight_matches(self):
+        """Test snippets come from the database with matches marked"""
+        results = self.search('function')
+
+        self.assertEqual([result['type'] for result in results], ['flashcard'])
+        self.assertIn('<mark>function</mark>', results[0]['snippet'])
+
+    def test_snippets_are_excerpts(self):
+        """Test long bodies are cut down around the match"""
+        self.note.content = ' '.join(['filler'] * 200) + ' needle ' + ' '.join(['filler'] * 200)
+        self.note.save()
+
+        snippet = self.search('needle')[0]['snippet']
+
+        self.assertIn('<mark>needle</mark>', snippet)
+        self.assertLess(len(snippet), 300)
+
+    def test_snippets_escape_markup(self):
+        """Test markup in the text is escaped before highlighting"""
+        Note.objects.create(title='Markup', content='<script>alert(1)</script> payload', user=self.user)
+
+        snippet = self.search('payload')[0]['snippet']
+
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test edited and deleted rows are reflected in the results"""
+        self.flashcard.front = 'What is a decorator?'
+        self.flashcard.save()
+        self.flashcard_set.delete()
+
+        self.assertEqual([result['type'] for result in self.search('closure')], ['note'])
+        self.assertEqual(self.search('decorator'), [])
+
+    def test_limit(self):
+        """Test the number of results is capped"""
+        self.assertEqual(len(self.search('closures', limit=2)), 2)
+
+    def test_other_users_rows_are_not_matched(self):
+        """Test the search is scoped to the current user"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        Note.objects.create(title='Kubernetes', content='Pods', user=other_user)
+
+        self.assertEqual(self.search('kubernetes'), [])
+
+    def test_requires_query(self):
+        """Test a missing q returns 400"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,175 @@
+"""
+Test: Fuzzy Search
+Purpose: Verify typo-tolerant search over notes and flashcards
+Coverage: Trigram index, similarity ranking, index refresh on changes and imports, index size cap,
+user isolation, API
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from flashcards.imports import import_flashcards
+from flashcards.models import Flashcard, FlashcardSet
+from notes.models import Note
+from search.fuzzy import clear_indexes
+from search.trigrams import TrigramIndex, trigrams
+
+User = get_user_model()
+
+
+class TrigramIndexTest(SimpleTestCase):
+    """Test the in-process trigram index"""
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.add(('note', 1), 'Django models', 'Querysets are lazy')
+        self.index.add(('note', 2), 'Flask routing', 'Blueprints')
+        self.index.add(('flashcard', 3), 'What is a queryset?', 'A lazy database query')
+
+    def test_trigrams_match_pg_trgm(self):
+        """Test words are padded like pg_trgm"""
+        self.assertEqual(trigrams('cat'), {'  c', ' ca', 'cat', 'at '})
+
+    def test_finds_misspelled_word(self):
+        """Test a transposed word still matches"""
+        results = self.index.search('djnago', 0.3, 10)
+
+        self.assertEqual([key for key, score in results], [('note', 1)])
+        self.assertAlmostEqual(results[0][1], 3 / 7)
+
+    def test_ranks_closer_matches_first(self):
+        """Test documents matching more query words rank higher"""
+        results = self.index.search('lazy querysets', 0.3, 10)
+
+        self.assertEqual([key for key, score in results], [('note', 1), ('flashcard', 3)])
+
+    def test_no_match_below_threshold(self):
+        """Test unrelated words do not match"""
+        self.assertEqual(self.index.search('xylophone', 0.3, 10), [])
+
+    def test_limit(self):
+        """Test the number of results is capped"""
+        self.assertEqual(len(self.index.search('lazy', 0.3, 1)), 1)
+
+
+class FuzzySearchAPITest(TestCase):
+    """Test the fuzzy search endpoint"""
+
+    url = '/api/search/fuzzy/'
+
+    def setUp(self):
+        cache.clear()
+        clear_indexes()
+        self.client = APIClient(enforce_csrf_checks=False)
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.note = Note.objects.create(
+            title='Django signals', content='Receivers run after save', user=self.user
+        )
+        self.flashcard_set = FlashcardSet.objects.create(name='Python Basics', user=self.user)
+        self.flashcard = Flashcard.objects.create(
+            flashcard_set=self.flashcard_set, front='What does a Django view return?', back='A response'
+        )
+
+    def search(self, text, **params):
+        response = self.client.get(self.url, {'q': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']['results']
+
+    def test_matches_notes_and_cards(self):
+        """Test a misspelled term finds notes and flashcards"""
+        results = self.search('djnago')
+
+        self.assertEqual(
+            {(result['type'], result['id']) for result in results},
+            {('note', self.note.id), ('flashcard', self.flashcard.id)}
+        )
+        card = next(result for result in results if result['type'] == 'flashcard')
+        self.assertEqual(card['flashcard_set_id'], self.flashcard_set.id)
+        self.assertGreater(card['similarity'], 0)
+
+    def test_ranked_by_similarity(self):
+        """Test better matches come first"""
+        results = self.search('recievers save')
+
+        self.assertEqual(results[0]['id'], self.note.id)
+        self.assertEqual(
+            [result['similarity'] for result in results],
+            sorted((result['similarity'] for result in results), reverse=True)
+        )
+
+    def test_index_sees_changes(self):
+        """Test new, edited and deleted rows are picked up by the next search"""
+        self.search('djnago')
+        Note.objects.create(title='Celery tasks', content='Queues', user=self.user)
+        self.flashcard.delete()
+        self.note.title = 'Flask signals'
+        self.note.save()
+
+        self.assertEqual([result['title'] for result in self.search('celry')], ['Celery tasks'])
+        self.assertEqual(self.search('djnago'), [])
+
+    def test_index_is_reused(self):
+        """Test an unchanged account does not rebuild its index"""
+        self.search('djnago')
+
+        with self.assertNumQueries(2):
+            # Only loading the matched rows; the version check is a cache lookup
+            self.search('djnago')
+
+    def test_reviews_keep_the_index(self):
+        """Test reviewing a card does not rebuild the index"""
+        self.search('djnago')
+        self.client.post(
+            reverse('flashcards:flashcard-review', kwargs={'pk': self.flashcard.id}),
+            {'quality': 5}, format='json'
+        )
+        self.flashcard.refresh_from_db()
+        self.flashcard.update_review(4)
+
+        with self.assertNumQueries(2):
+            self.search('djnago')
+
+    def test_imports_refresh_the_index(self):
+        """Test cards inserted in bulk, which send no signals, are found"""
+        self.search('djnago')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_flashcards(self.flashcard_set, [{'front': 'Celery tasks', 'back': 'Queues'}])
+
+        self.assertEqual([result['front'] for result in self.search('celry')], ['Celery tasks'])
+
+    def test_index_size_is_capped(self):
+        """Test a rebuild reads only the most recently updated rows"""
+        Note.objects.create(title='Celery tasks', content='Queues', user=self.user)
+
+        with mock.patch('search.fuzzy.MAX_INDEXED_ROWS', 1):
+            results = self.search('signls celry')
+
+        self.assertEqual([result['title'] for result in results if result['type'] == 'note'], ['Celery tasks'])
+
+    def test_other_users_rows_are_not_matched(self):
+        """Test the search is scoped to the current user"""
+        other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        Note.objects.create(title='Kubernetes', content='Pods', user=other_user)
+
+        self.assertEqual(self.search('kubernets'), [])
+
+    def test_requires_query(self):
+        """Test a missing q returns 400"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,123 @@
+"""
+Trigram Index
+Compact in-memory trigram index for fuzzy search where pg_trgm is unavailable.
+
+Words are split into trigrams the way pg_trgm does it (lower-cased, padded
+with two spaces in front and one behind). Similarity is the share of the
+query word's trigrams found in a document word. This approximates pg_trgm's
+word_similarity(), which takes the best trigram overlap over any extent of
+the document: both agree when the shared trigrams are contiguous in the
+document word, and pg_trgm scores lower when unmatched trigrams sit between
+them.
+The index is two-level. The trigram postings point at the distinct words
+of the corpus, and the word postings point at documents. A lookup only
+touches the postings of the query's trigrams, so it never scores the
+whole corpus.
+"""
+
+import re
+from array import array
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def words(text):
+    """Return the distinct lower-cased words of a text"""
+    return set(WORD_RE.findall(text.lower()))
+
+
+def trigrams(word):
+    """Return the pg_trgm trigrams of one lower-cased word"""
+    padded = f'  {word} '
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Trigram index over the words of a set of documents.
+
+    Documents are identified by a (kind, id) key, for example ('note', 12).
+    Postings are stored as arrays of integers, so the index is a few bytes
+    per distinct word and per word occurrence.
+    """
+
+    def __init__(self):
+        self.word_ids = {}
+        self.word_trigram_counts = array('H')
+        self.trigram_words = {}
+        self.word_documents = []
+        self.documents = []
+
+    def add(self, key, *texts):
+        """Index the words of a document's texts"""
+        document = len(self.documents)
+        self.documents.append(key)
+        found = set()
+        for text in texts:
+            found |= words(text or '')
+        for word in found:
+            self.word_documents[self.word_id(word)].append(document)
+
+    def word_id(self, word):
+        """Return the id of a word, adding it to the vocabulary if needed"""
+        word_id = self.word_ids.get(word)
+        if word_id is None:
+            word_id = len(self.word_ids)
+            self.word_ids[word] = word_id
+            self.word_documents.append(array('I'))
+            word_trigrams = trigrams(word)
+            self.word_trigram_counts.append(min(len(word_trigrams), 0xFFFF))
+            for trigram in word_trigrams:
+                self.trigram_words.setdefault(trigram, array('I')).append(word_id)
+        return word_id
+
+    def similar_words(self, word, threshold):
+        """
+        Find vocabulary words similar to a query word.
+
+        Returns:
+            dict: {word id: similarity} for words at or above the threshold
+        """
+        query_trigrams = trigrams(word)
+        shared = {}
+        for trigram in query_trigrams:
+            for word_id in self.trigram_words.get(trigram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+        return {
+            word_id: count / len(query_trigrams)
+            for word_id, count in shared.items()
+            if count / len(query_trigrams) >= threshold
+        }
+
+    def search(self, text, threshold, limit):
+        """
+        Rank documents by how well they match every word of the query.
+
+        A document's score is the mean, over the query words, of the best
+        similarity of any of its words to that query word.
+
+        Returns:
+            list: (key, score) pairs, best first, at most `limit`
+        """
+        query_words = words(text)
+        if not query_words:
+            return []
+        scores = {}
+        for word in query_words:
+            best = {}
+            for word_id, similarity in self.similar_words(word, threshold).items():
+                for document in self.word_documents[word_id]:
+                    if similarity > best.get(document, 0.0):
+                        best[document] = similarity
+            for document, similarity in best.items():
+                scores[document] = scores.get(document, 0.0) + similarity
+
+        ranked = sorted(
+            (
+                (score / len(query_words), document)
+                for document, score in scores.items()
+                if score / len(query_words) >= threshold
+            ),
+            key=lambda item: (-item[0], item[1])
+        )
+        return [(self.documents[document], score) for score, document in ranked[:limit]]
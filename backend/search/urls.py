@@ -0,0 +1,15 @@
+"""
+URL configuration for Search app.
+"""
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SearchViewSet
+
+app_name = 'search'
+
+router = DefaultRouter()
+router.register(r'search', SearchViewSet, basename='search')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,75 @@
+"""
+Search API Views
+SearchViewSet
+"""
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .fulltext import unified_search
+from .fuzzy import fuzzy_search
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Search across the current user's notes, flashcard sets and flashcards.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_limit(self):
+        """Read the limit query param (default 20, at most 50)"""
+        try:
+            limit = int(self.request.query_params.get('limit', DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            limit = DEFAULT_LIMIT
+        return max(1, min(limit, MAX_LIMIT))
+
+    def get_query(self):
+        """Read the required q query param"""
+        return self.request.query_params.get('q', '').strip()
+
+    def missing_query(self):
+        """400 response for a missing q param"""
+        return Response(
+            {'error': 'The q parameter is required.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def list(self, request):
+        """
+        Ranked full-text search with highlighted snippets.
+        GET /api/search/?q=<text>&limit=<n>
+        """
+        text = self.get_query()
+        if not text:
+            return self.missing_query()
+
+        return Response({
+            'data': {
+                'query': text,
+                'results': unified_search(request.user, text, self.get_limit()),
+            },
+            'status': 'success'
+        })
+
+    @action(detail=False, methods=['get'])
+    def fuzzy(self, request):
+        """
+        Typo-tolerant search, ranked by trigram similarity.
+        GET /api/search/fuzzy/?q=<text>&limit=<n>
+        """
+        text = self.get_query()
+        if not text:
+            return self.missing_query()
+
+        return Response({
+            'data': {
+                'query': text,
+                'results': fuzzy_search(request.user, text, self.get_limit()),
+            },
+            'status': 'success'
+        })
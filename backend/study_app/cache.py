@@ -0,0 +1,245 @@
+"""
+Two-Tier Cache
+A bounded per-process LRU in front of the shared cache (CACHES['default']).
+
+Cached data in this project lives under versioned keys: a change bumps a
+version, which moves readers to a new key, so the value stored under a key
+never changes. Values can therefore be kept in process memory until they are
+evicted or expire. Versions are not: there is no channel telling a worker
+that another one bumped a version, so they are always read from the shared
+cache and every worker sees a bump at once.
+
+The trade-off: a local hit still costs one round trip, for the version, and
+saves only the second one, for the value. That is worth it for the large
+values cached here (serialized pages, lists, forecasts), whose transfer and
+unpickling dominate the lookup, but not for small ones. A version is read
+with one call when it exists and two when it has to be created.
+
+Values are kept pickled, so callers get their own copy and changing it
+cannot leak into later reads. LOCAL_CACHE_MAX_ENTRIES bounds the LRU; 0
+turns the local tier off.
+
+Results that are expensive to recompute and may be served slightly out of
+date, such as study statistics, use stale_while_revalidate() instead: they
+are kept for a short time, then recomputed by one caller while the others
+are served the previous result.
+"""
+
+import inspect
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+def new_version():
+    """
+    Return a fresh version: the current time in nanoseconds.
+
+    Versions only move forward, without reading the previous one, and a
+    version that was evicted from the shared cache never restarts at a value
+    that is still in use.
+    """
+    return time.time_ns()
+
+
+class LocalCache:
+    """Thread-safe LRU of at most max_entries values, each kept up to timeout seconds"""
+
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        if self.max_entries <= 0:
+            return
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class TwoTierCache:
+    """Versioned values, read from process memory before the shared cache"""
+
+    def __init__(self, max_entries=None, timeout=None):
+        self.configure(max_entries, timeout)
+
+    def configure(self, max_entries=None, timeout=None):
+        """Size the local tier, from settings unless given"""
+        if max_entries is None:
+            max_entries = settings.LOCAL_CACHE_MAX_ENTRIES
+        if timeout is None:
+            timeout = settings.LOCAL_CACHE_TIMEOUT
+        self.enabled = max_entries > 0
+        self.values = LocalCache(max_entries, timeout)
+
+    def get_version(self, key):
+        """Return the current value of a version key"""
+        version = cache.get(key)
+        if version is None:
+            version = new_version()
+            if not cache.add(key, version, timeout=None):
+                # Another caller created it first
+                version = cache.get(key, version)
+        return version
+
+    def bump_version(self, key):
+        """
+        Move a version key to a value that has not been used.
+
+        A plain set of the current time, so concurrent bumps need no atomic
+        incr() and none of them can be lost.
+        """
+        cache.set(key, new_version(), timeout=None)
+
+    def get(self, key):
+        """Return a copy of the value cached under a versioned key, or None"""
+        data = self.values.get(key)
+        if data is not None:
+            return pickle.loads(data)
+        value = cache.get(key)
+        if value is not None and self.enabled:
+            self.values.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        return value
+
+    def set(self, key, value, timeout):
+        """Cache a value under a versioned key in both tiers"""
+        cache.set(key, value, timeout)
+        if self.enabled:
+            self.values.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), timeout)
+
+
+two_tier = TwoTierCache()
+
+
+@receiver(setting_changed)
+def reconfigure(setting, **kwargs):
+    if setting in ('LOCAL_CACHE_MAX_ENTRIES', 'LOCAL_CACHE_TIMEOUT'):
+        two_tier.configure()
+
+
+# Backends whose add() is atomic, so it can serve as a lock (locmem only
+# within its process, which is all it is shared by)
+ATOMIC_ADD_BACKENDS = (LocMemCache, BaseMemcachedCache, RedisCache)
+
+
+def has_atomic_add():
+    """Whether the default cache's add() can be used as a lock"""
+    return isinstance(caches[DEFAULT_CACHE_ALIAS], ATOMIC_ADD_BACKENDS)
+
+
+def stale_while_revalidate(key_template, fresh_for, stale_for, lock_timeout=30, version=None):
+    """
+    Cache a function's result in the shared cache, with single-flight refreshes.
+
+    A result is served as is for fresh_for seconds. For stale_for seconds
+    after that, the first caller to take the key's lock (cache.add, so one
+    caller across all workers) recomputes it, while every other caller is
+    served the stale result. When there is no result at all, the other
+    callers wait for the lock holder, up to lock_timeout seconds.
+
+    The lock needs an atomic cache.add(), which the db and file backends do
+    not have. With those, no lock is taken: every caller that finds the
+    result stale or missing recomputes it.
+
+    With version, results are also keyed by a version, so bumping it makes
+    the next caller recompute instead of being served the old result.
+
+    Args:
+        key_template (str): Cache key, formatted with the function's
+            arguments, e.g. 'stats:summary:{user.pk}'
+        fresh_for (int): Seconds a result is served without recomputing
+        stale_for (int): Further seconds a result may be served while it is
+            recomputed
+        lock_timeout (int): Seconds before an abandoned lock is released
+        version (callable): Called with the function's arguments; its result
+            is appended to the key
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = key_template.format(**arguments.arguments)
+            if version is not None:
+                key = f'{key}:{version(**arguments.arguments)}'
+            lock_key = f'{key}:lock'
+
+            entry = cache.get(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+
+            if not has_atomic_add():
+                value = func(*args, **kwargs)
+                cache.set(key, (time.time() + fresh_for, value), fresh_for + stale_for)
+                return value
+
+            token = uuid.uuid4().hex
+            if cache.add(lock_key, token, lock_timeout):
+                try:
+                    value = func(*args, **kwargs)
+                    cache.set(key, (time.time() + fresh_for, value), fresh_for + stale_for)
+                finally:
+                    # The lock may have expired and been taken by another caller
+                    if cache.get(lock_key) == token:
+                        cache.delete(lock_key)
+                return value
+
+            if entry is not None:
+                return entry[1]
+
+            # Another caller is computing the first result; wait for it
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline and cache.get(lock_key) is not None:
+                time.sleep(0.05)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry[1]
+            # The lock was released or expired; the holder may have stored a result
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[1]
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
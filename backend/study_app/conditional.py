@@ -0,0 +1,92 @@
+"""
+Conditional GET
+Strong ETags for list and detail endpoints, answering 304 Not Modified
+before the queryset is serialized.
+
+A view describes the data a response is built from as a version: any value
+that changes whenever the response would, such as the row count and latest
+updated_at of each collection involved, or an object's updated_at. The
+ETag hashes the version with the user and the full request path, so every
+page, filter and field selection has its own tag.
+
+Lists carry no Last-Modified: deleting a row shrinks a list without making
+any timestamp newer.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max, Value
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def collection_version(*querysets):
+    """
+    Return the (row count, latest updated_at) of each queryset, in one query.
+
+    A count changes on insert and delete, and a latest updated_at on insert
+    and update. Updates must set updated_at, which auto_now fields do on
+    save() and queryset updates in this project set explicitly.
+    """
+    stamps = [
+        queryset.order_by().values(collection=Value(index)).annotate(
+            count=Count('id'), last_update=Max('updated_at')
+        ).values_list('collection', 'count', 'last_update')
+        for index, queryset in enumerate(querysets)
+    ]
+    rows = stamps[0].union(*stamps[1:], all=True)
+    return tuple(sorted(rows))
+
+
+def make_etag(request, version):
+    """Build a strong ETag for the current user, request path and version"""
+    key = repr((request.user.pk, request.get_full_path(), version))
+    return '"{}"'.format(hashlib.sha256(key.encode()).hexdigest()[:32])
+
+
+def conditional(version_method):
+    """
+    Make a GET viewset action answer 304 while the client's ETag is current.
+
+    Args:
+        version_method (str): Name of the view method returning the version
+            of the response
+    """
+    def decorator(action):
+        @wraps(action)
+        def wrapper(self, request, *args, **kwargs):
+            etag = make_etag(request, getattr(self, version_method)())
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = action(self, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                # Browsers may keep the response but must revalidate it
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    Versions for conditional list and retrieve actions.
+
+    Views implement get_list_version() and decorate list with
+    @conditional('get_list_version') and retrieve with
+    @conditional('get_detail_version').
+    """
+
+    def get_object(self):
+        # Loaded once per request, for the version and for the response
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def get_list_version(self):
+        raise NotImplementedError
+
+    def get_detail_version(self):
+        """Version of the requested object: its updated_at"""
+        obj = self.get_object()
+        return (obj.pk, obj.updated_at)
@@ -0,0 +1,115 @@
+"""
+Pagination
+Opt-in keyset (cursor) pagination for the large list endpoints.
+
+List endpoints page with PageNumberPagination by default, which counts the
+whole result set and skips OFFSET rows on every page. Views using
+CursorPaginationMixin switch to CursorPagination for ?pagination=cursor:
+each page seeks from the last row of the previous one along the view's
+ordering, so deep pages cost the same as the first. No count is run unless
+the client asks for one with ?count=estimate.
+
+Relevance-ranked results (a search without an explicit ?ordering) have no
+column to seek along, so they keep page numbers even with ?pagination=cursor.
+"""
+
+import json
+
+from django.db import connections
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Result sets up to this size are counted exactly; larger ones are estimated
+EXACT_COUNT_LIMIT = 1000
+
+
+def estimate_count(queryset):
+    """
+    Count a queryset cheaply.
+
+    Counts exactly up to EXACT_COUNT_LIMIT rows. Beyond that, PostgreSQL
+    returns the planner's row estimate; other databases return the limit.
+
+    Returns:
+        int: Exact or estimated number of rows
+    """
+    queryset = queryset.order_by()
+    count = queryset[:EXACT_COUNT_LIMIT + 1].count()
+    if count <= EXACT_COUNT_LIMIT:
+        return count
+
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return EXACT_COUNT_LIMIT
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]['Plan']['Plan Rows']), count)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination along the view's ordering.
+
+    The ordering comes from the view's OrderingFilter, so ?ordering= works as
+    in page mode, except on nullable fields, which cannot be used as a cursor
+    position; those fall back to the view's default ordering.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        field = queryset.model._meta.get_field(ordering[0].lstrip('-'))
+        if field.null:
+            ordering = tuple(view.ordering)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'estimate':
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class CursorPaginationMixin:
+    """
+    Let clients of a list view opt into keyset pagination with ?pagination=cursor.
+
+    Views ordering results by relevance list the query params that trigger it
+    in relevance_query_params; those requests fall back to pagination_class
+    unless they also pass ?ordering.
+    """
+    pagination_query_param = 'pagination'
+    cursor_pagination_class = KeysetPagination
+    relevance_query_params = ()
+
+    def is_ordered_by_relevance(self):
+        params = self.request.query_params
+        if params.get(api_settings.ORDERING_PARAM):
+            return False
+        return any(params.get(param, '').strip() for param in self.relevance_query_params)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if (self.request.query_params.get(self.pagination_query_param) == 'cursor'
+                    and not self.is_ordered_by_relevance()):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
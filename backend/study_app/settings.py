@@ -4,6 +4,7 @@ Django settings for study_app project.
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
     'accounts',
     'notes',
     'flashcards',
+    'backup',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -109,6 +112,61 @@ else:
 AUTH_USER_MODEL = 'accounts.User'
 
 
+# Cache
+# Per-user data (schedule-derived stats, category and tag lists) is cached
+# under versioned keys, and every worker must see the same versions. CACHE_URL
+# picks the backend:
+#   locmem://              per-process memory (the default; one process only)
+#   redis://host:6379/0    shared by every worker (recommended in production)
+#   memcached://host:11211 shared by every worker
+#   db://cache_table       database table; run `manage.py createcachetable`
+#   file:///var/tmp/cache  directory on the local filesystem
+# Only redis and memcached share entries across workers with an atomic add(),
+# so they are required when WEB_CONCURRENCY (the worker count gunicorn reads)
+# is above 1. The db and file backends cull a third of their entries
+# once they hold MAX_ENTRIES, so it is raised from Django's 300 for them.
+
+CACHE_URL = os.environ.get('CACHE_URL') or 'locmem://'
+cache_scheme, _, cache_location = CACHE_URL.partition('://')
+CACHE_BACKENDS = {
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+    'rediss': 'django.core.cache.backends.redis.RedisCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+SHARED_CACHE_SCHEMES = {'redis', 'rediss', 'memcached'}
+if cache_scheme not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f'Unsupported CACHE_URL scheme: {cache_scheme}')
+if cache_scheme.startswith('redis'):
+    cache_location = CACHE_URL
+if cache_scheme not in SHARED_CACHE_SCHEMES and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+    raise ImproperlyConfigured(
+        f'CACHE_URL={cache_scheme}:// cannot be shared safely by several workers; '
+        'use a redis:// or memcached:// CACHE_URL'
+    )
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[cache_scheme],
+        'LOCATION': cache_location or 'study-app',
+        'KEY_PREFIX': 'study_app',
+    }
+}
+if cache_scheme in ('db', 'file'):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 100_000)),
+    }
+
+# Versioned values are also kept in a per-process LRU in front of the shared
+# backend; versions are always read from the backend (see study_app/cache.py).
+# locmem is per-process already, so the local tier is off by default there.
+LOCAL_CACHE_MAX_ENTRIES = int(
+    os.environ.get('LOCAL_CACHE_MAX_ENTRIES', 0 if cache_scheme == 'locmem' else 1000)
+)
+LOCAL_CACHE_TIMEOUT = int(os.environ.get('LOCAL_CACHE_TIMEOUT', 60))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
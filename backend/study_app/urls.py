@@ -9,5 +9,7 @@ urlpatterns = [
     path('api/auth/', include('accounts.urls')),
     path('api/', include('notes.urls')),
     path('api/', include('flashcards.urls')),
+    path('api/', include('backup.urls')),
+    path('api/', include('search.urls')),
 ]
 
@@ -4,7 +4,7 @@
  */
 import React, { useState, useEffect } from 'react';
 import * as studySessionService from '../../services/studySessions';
-import type { StudySession } from '../../types/flashcards';
+import type { StudySession, StudySetTotals, StudyTimeseriesPoint } from '../../types/flashcards';
 import { LoadingSpinner } from '../common/LoadingSpinner';
 import { ErrorMessage } from '../common/ErrorMessage';
 import {
@@ -23,6 +23,7 @@ import styles from './StudyStatistics.module.css';
 
 export function StudyStatistics() {
   const [sessions, setSessions] = useState<StudySession[]>([]);
+  const [sessionCount, setSessionCount] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [overallStats, setOverallStats] = useState<{
@@ -35,9 +36,8 @@ export function StudyStatistics() {
   const [chartData, setChartData] = useState<any[]>([]);
   const [accuracyChartData, setAccuracyChartData] = useState<any[]>([]);
   const [perSetStats, setPerSetStats] = useState<any[]>([]);
-  const [displayedSessions, setDisplayedSessions] = useState<StudySession[]>([]);
   const [page, setPage] = useState(1);
-  const pageSize = 10;
+  const pageSize = 20; // Matches the API's PAGE_SIZE
 
   useEffect(() => {
     loadStatistics();
@@ -47,47 +47,23 @@ export function StudyStatistics() {
     try {
       setLoading(true);
       setError(null);
-      
-      // Load all study sessions
-      const response = await studySessionService.getStudySessions({ page_size: 100 });
-      const allSessions = response.results;
-      setSessions(allSessions);
 
-      // Calculate overall statistics
-      const totalSessions = allSessions.length;
-      const totalCardsStudied = allSessions.reduce((sum, s) => sum + (s.cards_studied || 0), 0);
-      const totalCardsCorrect = allSessions.reduce((sum, s) => sum + (s.cards_correct || 0), 0);
-      const overallAccuracy = totalCardsStudied > 0 
-        ? (totalCardsCorrect / totalCardsStudied) * 100 
-        : 0;
-      
-      // Calculate total study time (sum of durations)
-      const totalStudyTime = allSessions.reduce((sum, s) => {
-        if (s.duration !== undefined && s.duration !== null) {
-          return sum + s.duration;
-        }
-        // If duration not available, estimate from started_at and ended_at
-        if (s.started_at && s.ended_at) {
-          const start = new Date(s.started_at);
-          const end = new Date(s.ended_at);
-          return sum + (end.getTime() - start.getTime()) / (1000 * 60); // minutes
-        }
-        return sum;
-      }, 0);
+      // Totals and chart series are aggregated by the server over every session
+      const [summaryResponse, timeseriesResponse] = await Promise.all([
+        studySessionService.getStudySummary(),
+        studySessionService.getStudyTimeseries({ bucket: 'day', days: 14 }),
+      ]);
+      const summary = summaryResponse.data;
 
       setOverallStats({
-        totalSessions,
-        totalCardsStudied,
-        totalCardsCorrect,
-        overallAccuracy,
-        totalStudyTime
+        totalSessions: summary.sessions,
+        totalCardsStudied: summary.cards_studied,
+        totalCardsCorrect: summary.cards_correct,
+        overallAccuracy: summary.accuracy,
+        totalStudyTime: summary.study_time
       });
-      
-      // Prepare chart data
-      prepareChartData(allSessions);
-      
-      // Set initial displayed sessions
-      setDisplayedSessions(allSessions.slice(0, pageSize));
+
+      prepareChartData(timeseriesResponse.data.results, summary.per_set);
     } catch (err: any) {
       setError(err.message || 'Failed to load statistics');
     } finally {
@@ -95,75 +71,46 @@ export function StudyStatistics() {
     }
   };
 
-  // Update displayed sessions when page changes
+  // Load one page of recent sessions whenever the page changes
   useEffect(() => {
-    const startIndex = (page - 1) * pageSize;
-    const endIndex = startIndex + pageSize;
-    setDisplayedSessions(sessions.slice(startIndex, endIndex));
-  }, [page, sessions]);
+    const loadSessions = async () => {
+      try {
+        const response = await studySessionService.getStudySessions({ page });
+        setSessions(response.results);
+        setSessionCount(response.count);
+      } catch (err: any) {
+        setError(err.message || 'Failed to load study sessions');
+      }
+    };
+    loadSessions();
+  }, [page]);
 
-  const totalPages = Math.ceil(sessions.length / pageSize);
+  const totalPages = Math.ceil(sessionCount / pageSize);
 
   // Prepare data for charts
-  const prepareChartData = (allSessions: StudySession[]) => {
-    // Group sessions by date
-    const sessionsByDate = new Map<string, { cards: number; correct: number; time: number }>();
-    
-    allSessions.forEach(session => {
-      const date = new Date(session.started_at).toLocaleDateString('en-US', {
+  const prepareChartData = (series: StudyTimeseriesPoint[], perSet: StudySetTotals[]) => {
+    const dailyData = series.map(point => ({
+      date: new Date(`${point.period}T00:00:00`).toLocaleDateString('en-US', {
         month: 'short',
         day: 'numeric',
-      });
-      
-      const existing = sessionsByDate.get(date) || { cards: 0, correct: 0, time: 0 };
-      existing.cards += session.cards_studied || 0;
-      existing.correct += session.cards_correct || 0;
-      existing.time += session.duration || 0;
-      sessionsByDate.set(date, existing);
-    });
-
-    // Convert to chart data format
-    const dailyData = Array.from(sessionsByDate.entries())
-      .map(([date, data]) => ({
-        date,
-        cards: data.cards,
-        correct: data.correct,
-        accuracy: data.cards > 0 ? (data.correct / data.cards) * 100 : 0,
-        time: Math.round(data.time),
-      }))
-      .sort((a, b) => new Date(a.date).getTime() - new Date(b.date).getTime())
-      .slice(-14); // Last 14 days
+      }),
+      cards: point.cards_studied,
+      correct: point.cards_correct,
+      accuracy: point.accuracy,
+      time: Math.round(point.study_time),
+    }));
 
     setChartData(dailyData);
     setAccuracyChartData(dailyData);
 
-    // Per-set statistics
-    const setStatsMap = new Map<number, { name: string; sessions: number; cards: number; correct: number }>();
-    
-    allSessions.forEach(session => {
-      if (session.flashcard_set_id) {
-        const existing = setStatsMap.get(session.flashcard_set_id) || {
-          name: session.flashcard_set?.name || 'Unknown',
-          sessions: 0,
-          cards: 0,
-          correct: 0,
-        };
-        existing.sessions += 1;
-        existing.cards += session.cards_studied || 0;
-        existing.correct += session.cards_correct || 0;
-        setStatsMap.set(session.flashcard_set_id, existing);
-      }
-    });
-
-    const perSetData = Array.from(setStatsMap.values())
+    const perSetData = perSet
       .map(set => ({
         name: set.name,
         sessions: set.sessions,
-        cards: set.cards,
-        accuracy: set.cards > 0 ? (set.correct / set.cards) * 100 : 0,
+        cards: set.cards_studied,
+        accuracy: set.accuracy,
       }))
-      .sort((a, b) => b.cards - a.cards)
-      .slice(0, 10); // Top 10 sets
+      .slice(0, 10); // Top 10 sets, already ordered by cards studied
 
     setPerSetStats(perSetData);
   };
@@ -239,14 +186,14 @@ export function StudyStatistics() {
 
       <section className={styles.recentSessions}>
         <h2>Recent Study Sessions</h2>
-        {sessions.length === 0 ? (
+        {sessionCount === 0 ? (
           <div className={styles.emptyState}>
             <p>No study sessions yet. Start studying a flashcard set to see your statistics!</p>
           </div>
         ) : (
           <>
             <div className={styles.sessionsList}>
-              {displayedSessions.map((session) => (
+              {sessions.map((session) => (
                 <div key={session.id} className={styles.sessionCard}>
                   <div className={styles.sessionHeader}>
                     <div>
@@ -85,10 +85,6 @@ describe('useStudySession Hook', () => {
       data: { id: 1, next_review: '2025-01-28T10:00:00Z' },
       status: 'success'
     });
-    (studySessionService.updateStudySession as jest.Mock).mockResolvedValue({
-      data: { id: 1, cards_studied: 1, cards_correct: 1 },
-      status: 'success'
-    });
 
     const { result } = renderHook(() => useStudySession(1), { wrapper });
 
@@ -100,7 +96,11 @@ describe('useStudySession Hook', () => {
       await result.current.recordReview(1, 5);
     });
 
-    expect(flashcardService.reviewFlashcard).toHaveBeenCalledWith(1, 5);
+    // The server counts the review in the session; no separate PATCH
+    expect(flashcardService.reviewFlashcard).toHaveBeenCalledWith(1, 5, 1);
+    expect(studySessionService.updateStudySession).not.toHaveBeenCalled();
+    expect(result.current.session?.cards_studied).toBe(1);
+    expect(result.current.session?.cards_correct).toBe(1);
   });
 
   it('should end a study session', async () => {
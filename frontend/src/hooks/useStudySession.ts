@@ -60,26 +60,18 @@ export function useStudySession(flashcardSetId: number): UseStudySessionResult {
       if (!session) return;
 
       try {
-        // Record review using SM-2 algorithm
-        await flashcardService.reviewFlashcard(flashcardId, quality);
+        // Record review using SM-2 algorithm; the server also increments
+        // the session counters in the same request
+        await flashcardService.reviewFlashcard(flashcardId, quality, session.id);
 
-        // Update session statistics
+        // Mirror the server-side counters locally
         const isCorrect = quality >= 3;
-        const newCardsStudied = session.cards_studied + 1;
-        const newCardsCorrect = session.cards_correct + (isCorrect ? 1 : 0);
-
-        await studySessionService.updateStudySession(session.id, {
-          cards_studied: newCardsStudied,
-          cards_correct: newCardsCorrect
-        });
-
-        // Update local session state
         setSession((prev) =>
           prev
             ? {
                 ...prev,
-                cards_studied: newCardsStudied,
-                cards_correct: newCardsCorrect
+                cards_studied: (prev.cards_studied || 0) + 1,
+                cards_correct: (prev.cards_correct || 0) + (isCorrect ? 1 : 0)
               }
             : null
         );
@@ -217,6 +217,17 @@ describe('Flashcard Service', () => {
         expect(result).toEqual(mockResponse);
       });
 
+      it('should send the study session id when given', async () => {
+        (api.post as jest.Mock).mockResolvedValue({ data: { id: 1 }, status: 'success' });
+
+        await reviewFlashcard(1, 4, 7);
+
+        expect(api.post).toHaveBeenCalledWith('/api/flashcards/1/review/', {
+          quality: 4,
+          session_id: 7
+        });
+      });
+
       it('should throw error if quality is invalid', async () => {
         const error = new Error('Invalid quality');
         (error as any).status = 400;
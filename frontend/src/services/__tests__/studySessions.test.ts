@@ -8,7 +8,9 @@ import {
   updateStudySession,
   endStudySession,
   getStudySessions,
-  getStudySessionStats
+  getStudySessionStats,
+  getStudySummary,
+  getStudyTimeseries
 } from '../studySessions';
 import * as api from '../api';
 
@@ -146,5 +148,41 @@ describe('Study Session Service', () => {
       expect(result).toEqual(mockResponse);
     });
   });
-});
 
+  describe('getStudySummary', () => {
+    it('should fetch the aggregated study summary', async () => {
+      const mockResponse = {
+        data: {
+          sessions: 2,
+          cards_studied: 20,
+          cards_correct: 15,
+          accuracy: 75.0,
+          study_time: 30,
+          per_set: []
+        },
+        status: 'success'
+      };
+      (api.get as jest.Mock).mockResolvedValue(mockResponse);
+
+      const result = await getStudySummary();
+
+      expect(api.get).toHaveBeenCalledWith('/api/stats/summary/');
+      expect(result).toEqual(mockResponse);
+    });
+  });
+
+  describe('getStudyTimeseries', () => {
+    it('should fetch study totals per bucket', async () => {
+      const mockResponse = {
+        data: { bucket: 'week', results: [] },
+        status: 'success'
+      };
+      (api.get as jest.Mock).mockResolvedValue(mockResponse);
+
+      const result = await getStudyTimeseries({ bucket: 'week', days: 84 });
+
+      expect(api.get).toHaveBeenCalledWith('/api/stats/timeseries/', { bucket: 'week', days: 84 });
+      expect(result).toEqual(mockResponse);
+    });
+  });
+});
@@ -85,10 +85,14 @@ export async function deleteFlashcard(flashcardSetId: number, id: number): Promi
   await del(`/api/flashcard-sets/${flashcardSetId}/flashcards/${id}/`);
 }
 
-export async function reviewFlashcard(id: number, quality: number): Promise<{ data: ReviewResponse; status: 'success' }> {
-  const response = await post<{ data: ReviewResponse; status: 'success' }>(`/api/flashcards/${id}/review/`, {
-    quality
-  });
+export async function reviewFlashcard(
+  id: number,
+  quality: number,
+  sessionId?: number
+): Promise<{ data: ReviewResponse; status: 'success' }> {
+  // With a session id the server also counts the review in that study session
+  const body = sessionId === undefined ? { quality } : { quality, session_id: sessionId };
+  const response = await post<{ data: ReviewResponse; status: 'success' }>(`/api/flashcards/${id}/review/`, body);
   return response;
 }
 
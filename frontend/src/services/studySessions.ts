@@ -7,6 +7,8 @@ import { get, post, patch } from './api';
 import type {
   StudySession,
   StudySessionFormData,
+  StudySummary,
+  StudyTimeseries,
   PaginatedResponse
 } from '../types/flashcards';
 
@@ -63,3 +65,15 @@ export async function getStudySessionStats(id: number): Promise<{
   return response;
 }
 
+export async function getStudySummary(): Promise<{ data: StudySummary; status: 'success' }> {
+  const response = await get<{ data: StudySummary; status: 'success' }>('/api/stats/summary/');
+  return response;
+}
+
+export async function getStudyTimeseries(params?: {
+  bucket?: 'day' | 'week';
+  days?: number;
+}): Promise<{ data: StudyTimeseries; status: 'success' }> {
+  const response = await get<{ data: StudyTimeseries; status: 'success' }>('/api/stats/timeseries/', params);
+  return response;
+}
@@ -86,3 +86,28 @@ export interface ReviewResponse {
   updated_at: string;
 }
 
+export interface StudyTotals {
+  sessions: number;
+  cards_studied: number;
+  cards_correct: number;
+  accuracy: number;
+  study_time: number;
+}
+
+export interface StudySetTotals extends StudyTotals {
+  flashcard_set_id: number;
+  name: string;
+}
+
+export interface StudySummary extends StudyTotals {
+  per_set: StudySetTotals[];
+}
+
+export interface StudyTimeseriesPoint extends StudyTotals {
+  period: string;
+}
+
+export interface StudyTimeseries {
+  bucket: 'day' | 'week';
+  results: StudyTimeseriesPoint[];
+}